@@ -0,0 +1,553 @@
+"""
+Benchmarks offline del pipeline (no necesitan red ni servidores reales).
+
+    python bench.py smtp                       # envío contra el SMTP local de prueba
+    python bench.py smtp --fail-rate 0.1       # con 451 transitorios inyectados
+    python bench.py smtp --serve --port 2525   # solo levantar el servidor de prueba
+
+    python bench.py scenarios -k 5             # cada escenario 5 veces contra la réplica local
+    python bench.py scenarios -s 02 -s 10      # solo algunos escenarios
+    python bench.py scenarios --contexts       # aislamiento por contexto en vez de reset
+    python bench.py scenarios --serve          # solo levantar la réplica del sitio
+
+    python bench.py profiles -k 10             # carga de página por perfil de navegador
+    python bench.py profiles --latency 0.1     # con más latencia por recurso
+
+    python bench.py pdf --mb 16                # texto -> PDF con un texto de 16 MB
+
+    python bench.py load -d 60 -c 4            # login/logout + descargas, 4 sesiones, 60 s
+    python bench.py load -s 08:3 -s http:download --http-workers 8 --rate 5
+    python bench.py load --target https://staging.example -s 08
+
+Los resultados (eventos JSONL, resumen y trace.json por iteración) quedan en
+outputs/bench/runs/<fecha>/.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from email.message import EmailMessage
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from core import events  # noqa: E402
+from core.contexts import CONTEXTS_ENV  # noqa: E402
+from core.driver_pool import DriverPool, install_pool  # noqa: E402
+from core.load import HTTP, HTTP_FLOWS, LoadRunner, http_task, load_report, scenario_task  # noqa: E402
+from core.mailer import Mailer, SmtpSettings, deliver  # noqa: E402
+from core.paths import new_run_dir, use_output_dir  # noqa: E402
+from core.pdf import TextPdf  # noqa: E402
+from core.profiles import PROFILE_ENV, PROFILES, declared_profile  # noqa: E402
+from core.registry import discover  # noqa: E402
+from core.site import BASE_URL_ENV  # noqa: E402
+from core.site_standin import SiteStandIn  # noqa: E402
+from core.smtp_standin import SmtpStandIn  # noqa: E402
+from core.stats import Summary  # noqa: E402
+from core.streams import scenario_tag  # noqa: E402
+from core.tracing import TRACE_NAME, command_stats, read_trace, render_table, tracing  # noqa: E402
+
+BENCH_DIR = REPO_ROOT / "outputs" / "bench"
+
+
+def serve_forever(server, banner: str) -> None:
+    print(banner + " (Ctrl+C para salir)")
+    server.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+# =========================
+# smtp
+# =========================
+def _message(mail_to: str, i: int, payload: bytes) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = "bench@localhost"
+    msg["To"] = mail_to
+    msg["Subject"] = f"bench {i}"
+    msg.set_content("bench")
+    msg.add_attachment(payload, maintype="application", subtype="octet-stream", filename=f"p{i}.bin")
+    return msg
+
+
+def bench_smtp(args: argparse.Namespace) -> int:
+    server = SmtpStandIn(port=args.port, latency=args.latency, fail_rate=args.fail_rate,
+                         drop_rate=args.drop_rate, seed=args.seed)
+    if args.serve:
+        host, port = server.address
+        serve_forever(server, f"SMTP de prueba en {host}:{port}. "
+                              f"Usa SMTP_HOST={host} SMTP_PORT={port} SMTP_STARTTLS=0")
+        print(server.stats)
+        return 0
+
+    payload = os.urandom(args.size_kb * 1024)
+    groups = [f"grupo{g}@localhost" for g in range(args.groups)]
+    total = args.messages * len(groups)
+
+    with server:
+        host, port = server.address
+        settings = SmtpSettings(host=host, port=port, user="bench", password="bench",
+                                starttls=False, retries=args.retries, backoff=args.backoff)
+
+        # Antes: una conexión (connect + login) por mensaje, todo en serie
+        t0 = time.perf_counter()
+        baseline_errors = 0
+        for g in groups:
+            for i in range(args.messages):
+                try:
+                    with Mailer(settings, report=None) as mailer:
+                        mailer.send(_message(g, i, payload))
+                except Exception:
+                    baseline_errors += 1
+        baseline = time.perf_counter() - t0
+        before = server.stats.connections
+
+        # Ahora: una conexión por grupo, grupos en paralelo
+        t0 = time.perf_counter()
+        reports = deliver(groups, lambda g: (_message(g, i, payload) for i in range(args.messages)),
+                          settings, workers=args.workers, report=None)
+        pooled = time.perf_counter() - t0
+
+    mb = total * len(payload) / 1_048_576
+    print(f"{total} mensajes de {args.size_kb} KB a {len(groups)} grupo(s) "
+          f"(latencia {args.latency * 1000:.0f} ms, 451 {args.fail_rate:.0%}, cortes {args.drop_rate:.0%})")
+    print(f"  conexión por mensaje: {baseline:6.2f}s  {total / baseline:7.1f} msg/s  "
+          f"{mb / baseline:6.1f} MB/s  conexiones={before}  errores={baseline_errors}")
+    print(f"  conexión por grupo:   {pooled:6.2f}s  {total / pooled:7.1f} msg/s  "
+          f"{mb / pooled:6.1f} MB/s  conexiones={sum(r.connects for r in reports)}  "
+          f"reintentos={sum(r.attempts - r.sent for r in reports)}  "
+          f"errores={sum(1 for r in reports if not r.ok)}")
+    for r in reports:
+        if not r.ok:
+            print(f"  - {r.describe()}")
+    print(f"  servidor: {server.stats}")
+    return 0
+
+
+# =========================
+# scenarios
+# =========================
+def load_events(path: Path) -> list[dict]:
+    with path.open("r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def report_scenarios(records: list[dict]) -> dict:
+    """Agrupa el log de eventos por escenario: wall time, launch/lease/reset y pasos."""
+    per: dict[str, dict] = defaultdict(lambda: {
+        "wall": [], "ok": 0, "runs": 0, "errors": [], "launch": [], "lease": [], "reset": [],
+        "steps": defaultdict(list),
+    })
+    for r in records:
+        name = r.get("scenario")
+        if name is None:
+            continue
+        d = per[name]
+        ev = r["event"]
+        if ev == "bench_iteration":
+            d["runs"] += 1
+            d["wall"].append(r["duration"])
+            if r["ok"]:
+                d["ok"] += 1
+            elif r.get("error"):
+                d["errors"].append(r["error"])
+        elif ev == "driver_lease":
+            if r["launch"] > 0:
+                d["launch"].append(r["launch"])
+            d["lease"].append(r["lease"])
+            d["reset"].append(r["reset"])
+        elif ev == "step":
+            d["steps"][r["step"]].append(r["duration"])
+
+    out = {}
+    for name, d in per.items():
+        out[name] = {
+            "runs": d["runs"],
+            "ok": d["ok"],
+            "wall": Summary.of(d["wall"]),
+            "launch": Summary.of(d["launch"]),
+            "lease": Summary.of(d["lease"]),
+            "reset": Summary.of(d["reset"]),
+            "steps": {step: Summary.of(v) for step, v in d["steps"].items()},
+            "errors": d["errors"][:3],
+        }
+    return out
+
+
+def bench_scenarios(args: argparse.Namespace) -> int:
+    site = SiteStandIn(port=args.port, latency=args.latency, jitter=args.jitter,
+                       dynamic_delay=args.dynamic_delay, success_rate=args.success_rate, seed=args.seed)
+    if args.serve:
+        serve_forever(site, f"Réplica del sitio en {site.base_url}. Usa {BASE_URL_ENV}={site.base_url}")
+        return 0
+
+    scenarios = [sc for sc in discover().values()
+                 if not args.scenario or any(f in sc.name for f in args.scenario)]
+    scenarios = [sc for sc in scenarios if sc.entry is not None]
+    if not scenarios:
+        print("No hay escenarios que coincidan.")
+        return 2
+
+    bench_dir = new_run_dir(BENCH_DIR)
+    event_log = events.EventLog(bench_dir / "events.jsonl")
+    events.install(event_log)
+    # --cold: un Chrome nuevo por iteración (mide el launch cada vez)
+    pool = DriverPool(size=1, report=None, reuse=not args.cold)
+    install_pool(pool)
+    os.environ[BASE_URL_ENV] = site.base_url
+    if args.contexts:
+        os.environ[CONTEXTS_ENV] = "1"
+
+    print(f"Réplica en {site.base_url} (latencia {args.latency * 1000:.0f} ms, "
+          f"carga dinámica {args.dynamic_delay:g}s); {len(scenarios)} escenario(s) x {args.repeat}")
+    try:
+        with site:
+            for sc in scenarios:
+                for k in range(1, args.repeat + 1):
+                    out_dir = bench_dir / sc.path.stem / f"{k:02d}"
+                    t0 = time.perf_counter()
+                    error = ""
+                    quiet = open(os.devnull, "w") if not args.verbose else None
+                    try:
+                        with use_output_dir(out_dir), scenario_tag(sc.name), tracing(sc.name) as trace, \
+                                contextlib.redirect_stdout(quiet or sys.stdout):
+                            try:
+                                sc.run()
+                            finally:
+                                if trace.spans:
+                                    trace.write(out_dir / TRACE_NAME)
+                    except Exception as e:
+                        error = f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"
+                    finally:
+                        if quiet is not None:
+                            quiet.close()
+                    duration = time.perf_counter() - t0
+                    events.emit("bench_iteration", scenario=sc.name, iteration=k,
+                                duration=round(duration, 6), ok=not error, error=error)
+                    print(f"  {sc.name} #{k}: {'OK' if not error else 'FAIL'} {duration:.2f}s"
+                          + (f" ({error})" if error else ""))
+    finally:
+        pool.close()
+        events.install(None)
+        event_log.close()
+
+    report = report_scenarios(load_events(bench_dir / "events.jsonl"))
+    print()
+    for sc in scenarios:
+        r = report.get(sc.name)
+        if r is None:
+            continue
+        print(f"{sc.name}: {r['ok']}/{r['runs']} OK  wall {r['wall'].fmt()}")
+        print(f"    driver: launch {r['launch'].fmt()}  lease {r['lease'].fmt('ms', 1000, 1)}  "
+              f"reset {r['reset'].fmt('ms', 1000, 1)}")
+        for step, summ in r["steps"].items():
+            print(f"    {step:<16} {summ.fmt('ms', 1000, 0)}")
+        for err in r["errors"]:
+            print(f"    ! {err}")
+        traces = [e for p in sorted((bench_dir / sc.path.stem).glob(f"*/{TRACE_NAME}")) for e in read_trace(p)]
+        for line in render_table(command_stats(traces), limit=args.top):
+            print(f"    {line}")
+
+    summary_path = bench_dir / "summary.json"
+    summary_path.write_text(json.dumps(report, default=lambda o: o.__dict__, indent=1), encoding="utf-8")
+    print(f"\nResumen: {summary_path}")
+    return 0 if all(r["ok"] == r["runs"] for r in report.values()) else 1
+
+
+# =========================
+# profiles
+# =========================
+PROFILE_PAGES = ["/", "/checkboxes", "/nested_frames", "/large", "/windows"]
+
+_NAV_TIMING_JS = """
+const nav = performance.getEntriesByType('navigation')[0];
+const res = performance.getEntriesByType('resource');
+return [nav ? nav.domContentLoadedEventEnd : 0, nav ? nav.loadEventEnd : 0,
+        res.length, res.reduce((a, r) => a + (r.transferSize || 0), 0)];
+"""
+
+
+def bench_profiles(args: argparse.Namespace) -> int:
+    site = SiteStandIn(port=args.port, latency=args.latency, seed=args.seed)
+    names = args.profile or list(PROFILES)
+    os.environ.pop(PROFILE_ENV, None)  # aquí se comparan los perfiles: nada los fuerza
+    bench_dir = new_run_dir(BENCH_DIR)
+    report: dict[str, dict] = {}
+
+    print(f"Réplica con {args.latency * 1000:.0f} ms por respuesta; {len(PROFILE_PAGES)} página(s) x {args.repeat}")
+    with site:
+        for name in names:
+            pool = DriverPool(size=1, report=None)
+            try:
+                with pool.lease(profile=name) as driver:
+                    driver.get(site.base_url + "/")  # calentar (primer render, DNS, conexión)
+                    per_page = {}
+                    for page in PROFILE_PAGES:
+                        wall, dcl, load, kb, count = [], [], [], [], []
+                        for _ in range(args.repeat):
+                            t0 = time.perf_counter()
+                            driver.get(site.base_url + page)
+                            wall.append(time.perf_counter() - t0)
+                            d, lo, n, size = driver.execute_script(_NAV_TIMING_JS)
+                            dcl.append(d / 1000)
+                            load.append(lo / 1000)
+                            count.append(n)
+                            kb.append(size / 1024)
+                        per_page[page] = {"get": Summary.of(wall), "dcl": Summary.of(dcl), "load": Summary.of(load),
+                                          "resources": sum(count) / len(count), "kb": sum(kb) / len(kb)}
+            finally:
+                pool.close()
+            report[name] = per_page
+
+            print(f"\n{name} (launch {pool.stats.launches[0]:.2f}s)" if pool.stats.launches else f"\n{name}")
+            for page, r in per_page.items():
+                print(f"  {page:<16} get {r['get'].fmt('ms', 1000, 0)}  load p50={r['load'].p50 * 1000:6.0f} ms  "
+                      f"recursos={r['resources']:.0f} ({r['kb']:.0f} KB)")
+
+    summary_path = bench_dir / "profiles.json"
+    summary_path.write_text(json.dumps(report, default=lambda o: o.__dict__, indent=1), encoding="utf-8")
+    print(f"\nResumen: {summary_path}")
+    return 0
+
+
+# =========================
+# pdf
+# =========================
+def _sample_text(path: Path, size: int, seed: int) -> int:
+    """Texto de ~size bytes: líneas de largo variable, con acentos, paréntesis y alguna muy larga."""
+    import random
+    rnd = random.Random(seed)
+    words = ["línea", "descarga", "(zip)", "evidencia", "año", "archivo\\ruta", "x" * 40, "ok"]
+    written = 0
+    with path.open("w", encoding="utf-8", newline="\n") as f:
+        i = 0
+        while written < size:
+            n = 300 if i % 97 == 0 else rnd.randint(0, 14)
+            line = f"{i:07d} " + " ".join(rnd.choice(words) for _ in range(n)) + "\n"
+            f.write(line)
+            written += len(line.encode("utf-8"))
+            i += 1
+    return written
+
+
+def bench_pdf(args: argparse.Namespace) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "input.txt"
+        size = _sample_text(src, int(args.mb * 1_048_576), args.seed)
+        print(f"Texto de entrada: {size / 1_048_576:.1f} MB")
+        for compress in (True, False):
+            times = []
+            for i in range(args.repeat):
+                out = Path(tmp) / f"out_{int(compress)}.pdf"
+                tracemalloc.start()
+                t0 = time.perf_counter()
+                with src.open("r", encoding="utf-8") as f, TextPdf(out, compress=compress) as pdf:
+                    for line in f:
+                        pdf.write_line(line)
+                times.append(time.perf_counter() - t0)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            s = Summary.of(times)
+            print(f"  {'FlateDecode' if compress else 'sin comprimir':<13} p50={s.p50:6.2f}s  "
+                  f"{size / 1_048_576 / s.p50:6.1f} MB/s  páginas={pdf.pages}  líneas={pdf.lines}  "
+                  f"salida={out.stat().st_size / 1_048_576:6.1f} MB  pico Python={peak / 1024:7.0f} KB")
+    return 0
+
+
+# =========================
+# load
+# =========================
+DEFAULT_MIX = ["08", "06"]  # login/logout y descargas
+
+
+def parse_mix(specs: list[str], http_workers: int) -> list:
+    """
+    "08:3" -> escenarios cuyo nombre contiene "08", con peso 3;
+    "http:download:2" -> flujo HTTP sin navegador, con peso 2.
+    """
+    scenarios = [sc for sc in discover().values() if sc.entry is not None]
+    tasks = []
+    for spec in specs or DEFAULT_MIX:
+        name, _, weight = spec.rpartition(":")
+        if not name or not weight.replace(".", "", 1).isdigit():
+            name, weight = spec, "1"
+        if name.startswith("http:"):
+            tasks.append(http_task(name, float(weight)))
+            continue
+        matched = [sc for sc in scenarios if name in sc.name]
+        if not matched:
+            raise ValueError(f"Ningún escenario coincide con {name!r}")
+        tasks.extend(scenario_task(sc, float(weight)) for sc in matched)
+    if http_workers > 0 and not any(t.kind == HTTP for t in tasks):
+        tasks.append(http_task("http:download"))
+    return tasks
+
+
+def bench_load(args: argparse.Namespace) -> int:
+    try:
+        tasks = parse_mix(args.scenario, args.http_workers)
+    except ValueError as e:
+        print(e)
+        return 2
+
+    site = None
+    if args.target:
+        os.environ[BASE_URL_ENV] = args.target
+    else:
+        site = SiteStandIn(port=args.port, latency=args.latency, jitter=args.jitter,
+                           dynamic_delay=args.dynamic_delay, success_rate=args.success_rate, seed=args.seed)
+        os.environ[BASE_URL_ENV] = site.base_url
+    if args.contexts:
+        os.environ[CONTEXTS_ENV] = "1"
+
+    bench_dir = new_run_dir(BENCH_DIR)
+    event_log = events.EventLog(bench_dir / "events.jsonl")
+    events.install(event_log)
+    sessions = args.sessions or args.concurrency
+    browser_tasks = [t for t in tasks if t.kind != HTTP]
+    pool = DriverPool(size=sessions, report=None) if browser_tasks else None
+    if pool is not None:
+        install_pool(pool)
+
+    mix = ", ".join(f"{t.name}x{t.weight:g}" for t in tasks)
+    mode = f"{args.rate:g} llegadas/s" if args.rate > 0 else "lazo cerrado"
+    browser = f"{args.concurrency} hilo(s) de navegador con {sessions} sesión(es)" if pool else "sin navegador"
+    print(f"Carga contra {os.environ[BASE_URL_ENV]} durante {args.duration:g}s ({mode}); "
+          f"{browser}, {args.http_workers} hilo(s) HTTP\n  mezcla: {mix}")
+    runner = LoadRunner(tasks, args.duration, concurrency=args.concurrency if browser_tasks else 0,
+                        http_workers=args.http_workers, rate=args.rate, out_dir=bench_dir / "iterations",
+                        keep_outputs=args.keep_outputs, seed=args.seed)
+    try:
+        with site or contextlib.nullcontext():
+            if pool is not None:
+                # Sesiones lanzadas antes de largar el reloj: el launch no entra en la medición
+                heaviest = max(browser_tasks, key=lambda t: t.weight)
+                pool.warm(declared_profile(discover()[heaviest.name].path))
+            quiet = open(os.devnull, "w") if not args.verbose else None
+            try:
+                with contextlib.redirect_stdout(quiet or sys.stdout):
+                    stats = runner.run()
+            finally:
+                if quiet is not None:
+                    quiet.close()
+    finally:
+        if pool is not None:
+            pool.close()
+        events.install(None)
+        event_log.close()
+
+    report = load_report(load_events(bench_dir / "events.jsonl"), window=args.window)
+    print(f"\n{stats.describe()}")
+    for task, n in sorted(stats.per_task.items()):
+        print(f"  {task}: {n}")
+    print(f"\nPor ventana de {args.window:g}s (latencia de iteración desde la llegada):")
+    for line in report.render():
+        print(f"  {line}")
+
+    summary_path = bench_dir / "load.json"
+    summary_path.write_text(json.dumps({"stats": stats, "report": report.to_dict()},
+                                       default=lambda o: o.__dict__, indent=1), encoding="utf-8")
+    print(f"\nResumen: {summary_path}")
+    return 0 if not stats.errors else 1
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmarks offline del pipeline.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("smtp", help="Envío de correo contra un SMTP local de prueba.")
+    p.add_argument("--serve", action="store_true", help="Solo levantar el servidor de prueba.")
+    p.add_argument("--port", type=int, default=0, help="Puerto (0 = cualquiera libre).")
+    p.add_argument("--messages", type=int, default=20, help="Mensajes por grupo.")
+    p.add_argument("--groups", type=int, default=3, help="Grupos de destinatarios.")
+    p.add_argument("--size-kb", type=int, default=256, help="Tamaño del adjunto.")
+    p.add_argument("--workers", type=int, default=4, help="Grupos enviados a la vez.")
+    p.add_argument("--latency", type=float, default=0.005, help="Segundos por respuesta del servidor.")
+    p.add_argument("--fail-rate", type=float, default=0.0, help="Probabilidad de 451 al terminar DATA.")
+    p.add_argument("--drop-rate", type=float, default=0.0, help="Probabilidad de cortar la conexión.")
+    p.add_argument("--retries", type=int, default=4)
+    p.add_argument("--backoff", type=float, default=0.05, help="Primer reintento (s); se duplica.")
+    p.add_argument("--seed", type=int, default=1)
+    p.set_defaults(func=bench_smtp)
+
+    p = sub.add_parser("scenarios", help="Cada escenario K veces contra la réplica local del sitio.")
+    p.add_argument("--serve", action="store_true", help="Solo levantar la réplica del sitio.")
+    p.add_argument("--port", type=int, default=0, help="Puerto (0 = cualquiera libre).")
+    p.add_argument("-k", "--repeat", type=int, default=5, help="Iteraciones por escenario.")
+    p.add_argument("-s", "--scenario", action="append", default=[],
+                   help="Filtrar por nombre (substring); se puede repetir.")
+    p.add_argument("--latency", type=float, default=0.02, help="Segundos por respuesta HTTP.")
+    p.add_argument("--jitter", type=float, default=0.0, help="± segundos aleatorios por respuesta.")
+    p.add_argument("--dynamic-delay", type=float, default=1.0,
+                   help="Duración del 'Loading...' de dynamic_loading (5 s en el sitio real).")
+    p.add_argument("--success-rate", type=float, default=0.5, help="Probabilidad de 'Action successful'.")
+    p.add_argument("--cold", action="store_true", help="Chrome nuevo en cada iteración (sin reuso del pool).")
+    p.add_argument("--contexts", action="store_true",
+                   help="Cada iteración en un contexto de navegador nuevo (Target.createBrowserContext).")
+    p.add_argument("-v", "--verbose", action="store_true", help="Mostrar la salida de los escenarios.")
+    p.add_argument("--top", type=int, default=6, help="Comandos WebDriver a mostrar por escenario.")
+    p.add_argument("--seed", type=int, default=1)
+    p.set_defaults(func=bench_scenarios)
+
+    p = sub.add_parser("profiles", help="Tiempo de carga de página con cada perfil de navegador.")
+    p.add_argument("--port", type=int, default=0, help="Puerto de la réplica (0 = cualquiera libre).")
+    p.add_argument("-k", "--repeat", type=int, default=5, help="Cargas por página y perfil.")
+    p.add_argument("-p", "--profile", action="append", default=[], choices=list(PROFILES),
+                   help="Perfiles a medir (default: todos); se puede repetir.")
+    p.add_argument("--latency", type=float, default=0.05, help="Segundos por respuesta HTTP (también recursos).")
+    p.add_argument("--seed", type=int, default=1)
+    p.set_defaults(func=bench_profiles)
+
+    p = sub.add_parser("pdf", help="Texto -> PDF (páginas, compresión, memoria) con un texto grande.")
+    p.add_argument("--mb", type=float, default=8, help="Tamaño del texto de entrada.")
+    p.add_argument("-k", "--repeat", type=int, default=3, help="Iteraciones por variante.")
+    p.add_argument("--seed", type=int, default=1)
+    p.set_defaults(func=bench_pdf)
+
+    p = sub.add_parser("load", help="Mezcla de escenarios como carga sintética durante un tiempo fijo.")
+    p.add_argument("-s", "--scenario", action="append", default=[],
+                   help="Escenario (substring) o flujo HTTP (" + ", ".join(HTTP_FLOWS) + ") con peso "
+                        "opcional, p. ej. 08:3; se puede repetir (default: " + " ".join(DEFAULT_MIX) + ").")
+    p.add_argument("-d", "--duration", type=float, default=60, help="Segundos de carga.")
+    p.add_argument("-c", "--concurrency", type=int, default=2, help="Hilos de navegador.")
+    p.add_argument("--sessions", type=int, default=0, help="Sesiones de Chrome en el pool (default: --concurrency).")
+    p.add_argument("--http-workers", type=int, default=0, help="Hilos para los flujos HTTP sin navegador.")
+    p.add_argument("--rate", type=float, default=0.0,
+                   help="Llegadas por segundo (Poisson); 0 = cada hilo encadena iteraciones.")
+    p.add_argument("--window", type=float, default=5.0, help="Segundos por ventana del reporte.")
+    p.add_argument("--target", default="", help="URL base del sitio (default: la réplica local).")
+    p.add_argument("--port", type=int, default=0, help="Puerto de la réplica (0 = cualquiera libre).")
+    p.add_argument("--latency", type=float, default=0.02, help="Segundos por respuesta HTTP de la réplica.")
+    p.add_argument("--jitter", type=float, default=0.0, help="± segundos aleatorios por respuesta.")
+    p.add_argument("--dynamic-delay", type=float, default=1.0, help="Duración del 'Loading...' de dynamic_loading.")
+    p.add_argument("--success-rate", type=float, default=0.5, help="Probabilidad de 'Action successful'.")
+    p.add_argument("--contexts", action="store_true",
+                   help="Cada iteración en un contexto de navegador nuevo (Target.createBrowserContext).")
+    p.add_argument("--keep-outputs", action="store_true", help="Conservar screenshots/descargas de cada iteración.")
+    p.add_argument("-v", "--verbose", action="store_true", help="Mostrar la salida de los escenarios.")
+    p.add_argument("--seed", type=int, default=1)
+    p.set_defaults(func=bench_load)
+
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
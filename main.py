@@ -1,12 +1,20 @@
 from __future__ import annotations
 
 import os
+import shutil
 import sys
-import mimetypes
-import smtplib
+import argparse
+import contextvars
+import threading
+import time
 import traceback
+from collections import deque
 from pathlib import Path
 from datetime import datetime
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 
 from email.message import EmailMessage
 from email.utils import formatdate
@@ -37,6 +45,11 @@ SCRIPT_ORDER = [
     "13_secure_file_downloader.py",
 ]
 
+# Dependencias entre scripts: con --jobs > 1 un script no arranca hasta que
+# terminen (OK o FAIL) los que declare aquí. Solo ordenan, no condicionan.
+# Ejemplo: "13_secure_file_downloader.py": ["06_file_download.py"],
+SCRIPT_DEPENDS: dict[str, list[str]] = {}
+
 # Extensiones / rutas que NO se adjuntan (para no mandar código/repo)
 EXCLUDE_EXTS = {
     ".py", ".pyc",
@@ -46,10 +59,65 @@ EXCLUDE_EXTS = {
 }
 EXCLUDE_DIR_NAMES = {".git", "venv", ".venv", "__pycache__"}
 
+# Utilidades compartidas con los escenarios (src/core)
+sys.path.insert(0, str(SRC_DIR))
+from core.driver_pool import DriverPool, SESSION_ENV, export_session, install_pool, track_drivers  # noqa: E402
+from core.paths import new_run_dir, use_output_dir  # noqa: E402
+from core.manifest import collect_run_artifacts, register_artifact  # noqa: E402
+from core.retention import apply_retention  # noqa: E402
+from core.profiles import declared_profile  # noqa: E402
+from core.contexts import CONTEXTS_ENV, contexts_enabled  # noqa: E402
+from core.packaging import DEFAULT_PART_BYTES, PackageReport, package_artifacts  # noqa: E402
+from core.mailer import SmtpSettings, deliver, recipient_groups  # noqa: E402
+from core.registry import Scenario, discover  # noqa: E402
+from core.watchdog import Budgets, KILL_GRACE, KillReport, TIMEOUT_EXIT, Watchdog, driver_pids  # noqa: E402
+from core import events  # noqa: E402
+from core.streams import TaggedStream, pump_lines, scenario_tag  # noqa: E402
+from core.tracing import TRACE_FILE_ENV, TRACE_NAME, tracing, write_run_report  # noqa: E402
+from core.results_sink import FORMATS, RESULTS_MANAGED_ENV, merge_results  # noqa: E402
+from core.cache import CacheEntry, ResultCache, scenario_key, shared_inputs_digest, ttl_hours  # noqa: E402
+
+# runner(script_path, output_dir) -> (exit_code, error_text)
+Runner = Callable[[Path, Path], tuple[int, str]]
+
+
+_print_lock = threading.Lock()
+
+
+# stdout real: las líneas de escenarios se escriben aquí aunque sys.stdout esté etiquetado
+_REAL_STDOUT = sys.stdout
+
+# sys.stdout / sys.stderr etiquetados mientras corren escenarios en proceso
+TAGGED_STREAMS: list[TaggedStream] = []
+
 
 def log(msg: str) -> None:
     ts = datetime.now().strftime("%H:%M:%S")
-    print(f"[{ts}] {msg}", flush=True)
+    with _print_lock:
+        print(f"[{ts}] {msg}", flush=True)
+
+
+def emit_line(scenario: str, stream: str, line: str) -> None:
+    """Una línea de salida de un escenario: a consola con su nombre y al log de eventos."""
+    with _print_lock:
+        _REAL_STDOUT.write(f"[{scenario}] {line}\n")
+        _REAL_STDOUT.flush()
+    events.emit("output", scenario=scenario, stream=stream, line=line)
+
+
+# Escenarios cortados por el watchdog en esta corrida (van al resumen del correo)
+KILLS: list[KillReport] = []
+
+
+def record_kill(report: KillReport) -> None:
+    KILLS.append(report)
+    log(f"⏱️ Watchdog: {report.describe()}")
+    events.emit("watchdog_kill", scenario=report.scenario, budget=report.budget,
+                pids=report.pids, rss_freed=report.rss_freed)
+
+
+# Escenarios que con --incremental se tomaron de la caché (van al resumen del correo)
+CACHED: dict[str, CacheEntry] = {}
 
 
 def ensure_outputs_folder() -> None:
@@ -63,17 +131,45 @@ def validate_scripts() -> list[Path]:
         if not p.exists():
             raise FileNotFoundError(f"No existe el script esperado: {p}")
         scripts.append(p)
+
+    names = set(SCRIPT_ORDER)
+    for name, deps in SCRIPT_DEPENDS.items():
+        for dep in [name, *deps]:
+            if dep not in names:
+                raise ValueError(f"SCRIPT_DEPENDS referencia un script desconocido: {dep}")
+        for dep in deps:
+            if SCRIPT_ORDER.index(dep) >= SCRIPT_ORDER.index(name):
+                # Exigir que la dependencia vaya antes en SCRIPT_ORDER evita ciclos
+                # y mantiene válido el modo secuencial.
+                raise ValueError(f"{name} depende de {dep}, que está después en SCRIPT_ORDER")
     return scripts
 
 
-def run_script(script_path: Path) -> tuple[int, str]:
+def run_script(script_path: Path, output_dir: Path = OUTPUTS_DIR,
+               pool: DriverPool | None = None, budget: float = 0) -> tuple[int, str]:
     """
     Ejecuta un script en un subproceso para aislar drivers/sesiones.
+    Con `pool`, el subproceso usa una sesión de Chrome ya lanzada en vez de abrir otra.
+    Con `budget` > 0, si tarda más se mata el subproceso junto con su Chrome/chromedriver.
     Retorna (exit_code, error_text).
     """
     env = os.environ.copy()
     env["PROJECT_ROOT"] = str(REPO_ROOT)
-    env["OUTPUT_DIR"] = str(OUTPUTS_DIR)
+    env["OUTPUT_DIR"] = str(output_dir)
+    # Sin esto python bufferiza stdout al ir a un pipe y no se ve nada hasta el final
+    env["PYTHONUNBUFFERED"] = "1"
+    env["PYTHONIOENCODING"] = "utf-8"
+    # El subproceso traza sus comandos WebDriver y los deja en su carpeta
+    env[TRACE_FILE_ENV] = str(output_dir / TRACE_NAME)
+
+    lease = None
+    if pool is not None:
+        try:
+            lease = pool.acquire(profile=declared_profile(script_path))
+            env[SESSION_ENV] = export_session(lease[0])
+        except Exception as e:
+            # Sin sesión del pool el script lanza su propio Chrome, como antes
+            log(f"⚠️ Pool no disponible para {script_path.name}: {type(e).__name__}: {e}")
 
     # Si estás usando Chrome portable, recomiendo setear esto antes de correr:
     # env["CHROME_BIN"] = r"C:\ruta\chrome.exe"
@@ -83,38 +179,273 @@ def run_script(script_path: Path) -> tuple[int, str]:
 
     cmd = [sys.executable, str(script_path)]
     log(f"Ejecutando: {script_path.name}")
-    p = subprocess.run(
-        cmd,
-        cwd=str(REPO_ROOT),
-        env=env,
-        text=True,
-        capture_output=True,
-    )
-
-    # Para que quede registro, imprimimos stdout/stderr del script
-    if p.stdout.strip():
-        print(p.stdout, end="" if p.stdout.endswith("\n") else "\n", flush=True)
+    # stdout/stderr se muestran en vivo, línea por línea, con el nombre del script;
+    # de stderr solo se guardan las últimas líneas para el texto de error
+    stderr_tail: deque[str] = deque(maxlen=200)
+    try:
+        p = subprocess.Popen(
+            cmd,
+            cwd=str(REPO_ROOT),
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            bufsize=1,
+        )
+        readers = [
+            pump_lines(p.stdout, script_path.name, "stdout", emit_line),
+            pump_lines(p.stderr, script_path.name, "stderr", emit_line, tail=stderr_tail),
+        ]
+        # El Chrome prestado por el pool no cuelga del subproceso: se agrega aparte
+        pids = lambda: [p.pid] + (driver_pids(lease[0]) if lease is not None else [])  # noqa: E731
+        with Watchdog(script_path.name, budget, pids, on_kill=record_kill) as wd:
+            p.wait()
+        for t in readers:
+            t.join()
+    finally:
+        if lease is not None:
+            try:
+                pool.release(*lease)
+            except Exception as e:
+                # Devolver la sesión no debe tapar el resultado del script
+                log(f"⚠️ No se pudo devolver la sesión de {script_path.name}: {type(e).__name__}: {e}")
+
+    if wd.report is not None:
+        return TIMEOUT_EXIT, wd.report.describe()
 
     if p.returncode != 0:
-        err = p.stderr.strip() if p.stderr else "(sin stderr)"
-        if err:
-            print(err, flush=True)
+        err = "\n".join(stderr_tail).strip() or "(sin stderr)"
         return p.returncode, err
 
     return 0, ""
 
 
-def iter_output_files() -> list[Path]:
+def run_inprocess(scenario: Scenario, output_dir: Path = OUTPUTS_DIR, budget: float = 0) -> tuple[int, str]:
     """
-    Recolecta todo lo de outputs/ recursivo, excluyendo carpetas y extensiones no deseadas.
+    Corre el main() del escenario en este mismo intérprete.
+    Las sesiones de Chrome salen del pool instalado con install_pool().
+    Con `budget` > 0 corre en un hilo aparte: si tarda más se mata el Chrome
+    que tenga prestado (los comandos de WebDriver empiezan a fallar y el
+    escenario termina) y, si KILL_GRACE segundos después sigue trabado en
+    Python, el hilo se abandona y se reporta el timeout.
+    Retorna (exit_code, error_text) igual que run_script().
+    """
+    log(f"Ejecutando: {scenario.name} (en proceso)")
+    wd = None
+    outcome: list[BaseException | None] = []
+
+    def body() -> None:
+        try:
+            scenario.run()
+        except BaseException as e:
+            outcome.append(e)
+        else:
+            outcome.append(None)
+
+    try:
+        with use_output_dir(output_dir), track_drivers() as drivers, \
+                scenario_tag(scenario.name, *TAGGED_STREAMS), traced(scenario.name, output_dir):
+            pids = lambda: [pid for d in list(drivers) for pid in driver_pids(d)]  # noqa: E731
+            with Watchdog(scenario.name, budget, pids, on_kill=record_kill) as wd:
+                if budget > 0:
+                    # Hilo daemon: si hay que abandonarlo no frena la salida del proceso
+                    worker = threading.Thread(target=contextvars.copy_context().run, args=(body,),
+                                              name=f"scenario-{scenario.name}", daemon=True)
+                    worker.start()
+                    worker.join(budget + KILL_GRACE)
+                else:
+                    body()
+        if not outcome:
+            report = wd.report or KillReport(scenario.name, budget)
+            report.abandoned = True
+            log(f"⏱️ Watchdog: {report.describe()}")
+            events.emit("watchdog_abandon", scenario=scenario.name, budget=budget)
+            return TIMEOUT_EXIT, report.describe()
+        if outcome[0] is not None:
+            raise outcome[0]
+    except SystemExit as e:
+        if wd is not None and wd.report is not None:
+            return TIMEOUT_EXIT, wd.report.describe()
+        if e.code in (None, 0):
+            return 0, ""
+        code = e.code if isinstance(e.code, int) else 1
+        return code, str(e.code)
+    except Exception:
+        if wd is not None and wd.report is not None:
+            return TIMEOUT_EXIT, wd.report.describe()
+        err = traceback.format_exc().strip()
+        for line in err.splitlines():
+            emit_line(scenario.name, "stderr", line)
+        return 1, err
+    return 0, ""
+
+
+@contextmanager
+def traced(name: str, output_dir: Path) -> Iterator[None]:
+    """Traza de comandos WebDriver del escenario -> <output_dir>/trace.json (aunque falle)."""
+    with tracing(name) as trace:
+        try:
+            yield
+        finally:
+            if trace.spans:
+                trace.write(output_dir / TRACE_NAME)
+
+
+def make_runner(subprocess_mode: bool, pool: DriverPool | None, budgets: Budgets) -> Runner:
+    """
+    Por defecto los escenarios corren en proceso; los que no exponen main()
+    (o todos, con --subprocess) corren en un subproceso como antes.
+    """
+    if subprocess_mode:
+        return lambda script_path, output_dir: run_script(
+            script_path, output_dir, pool, budgets.for_script(script_path.name)
+        )
+
+    if pool is not None:
+        install_pool(pool)
+    scenarios = discover(SRC_DIR)
+
+    # Importar todo antes de abrir hilos; un import roto se reporta al correrlo
+    for sc in scenarios.values():
+        try:
+            sc.load()
+        except Exception:
+            pass
+
+    def runner(script_path: Path, output_dir: Path) -> tuple[int, str]:
+        sc = scenarios.get(script_path.name)
+        try:
+            has_entry = sc is not None and sc.entry is not None
+        except Exception:
+            has_entry = True  # que run_inprocess() reporte el error de import
+        budget = budgets.for_script(script_path.name)
+        if not has_entry:
+            return run_script(script_path, output_dir, pool, budget)
+        return run_inprocess(sc, output_dir, budget)
+
+    return runner
+
+
+def plan_incremental(scripts: list[Path], ttl: float) -> tuple[ResultCache, dict[str, tuple[str, CacheEntry | None]]]:
+    """
+    Clave de caché de cada script y su entrada vigente, si la hay. Se calcula
+    una vez antes de correr: lo que cambie durante la corrida no cuenta.
+    """
+    cache = ResultCache(ttl=ttl)
+    pruned = cache.prune()
+    shared = shared_inputs_digest()
+    plan = {}
+    for s in scripts:
+        key = scenario_key(s, shared)
+        plan[s.name] = (key, cache.lookup(key))
+    hits = sum(1 for _, entry in plan.values() if entry is not None)
+    log(f"Incremental: {hits} de {len(scripts)} escenario(s) sin cambios (caché de {ttl:g} h"
+        + (f", {pruned} entrada(s) vencida(s) borrada(s))" if pruned else ")"))
+    return cache, plan
+
+
+def cached_runner(runner: Runner, cache: ResultCache, plan: dict[str, tuple[str, CacheEntry | None]],
+                  run_dir: Path) -> Runner:
+    """
+    Con --incremental: si el script tiene entrada vigente se copian sus
+    artefactos a la corrida en vez de correrlo; si corre y sale OK, se guarda.
+    """
+    def run(script_path: Path, output_dir: Path) -> tuple[int, str]:
+        key, entry = plan[script_path.name]
+        if entry is not None:
+            try:
+                entry.restore(output_dir)
+            except OSError as e:
+                log(f"⚠️ No se pudo reusar la caché de {script_path.name} ({type(e).__name__}: {e}); se corre.")
+                shutil.rmtree(output_dir, ignore_errors=True)
+            else:
+                CACHED[script_path.name] = entry
+                log(f"♻️ Sin cambios, se reusa: {entry.describe()}")
+                events.emit("scenario_cached", scenario=script_path.name, key=key,
+                            source_run=entry.run_dir, age_hours=round(entry.age_hours, 3))
+                return 0, ""
+
+        code, err = runner(script_path, output_dir)
+        if code == 0:
+            try:
+                cache.store(key, script_path.name, output_dir, run_dir)
+            except OSError as e:
+                log(f"⚠️ No se pudo guardar {script_path.name} en la caché: {type(e).__name__}: {e}")
+        return code, err
+
+    return run
+
+
+def run_one(runner: Runner, script_path: Path, output_dir: Path) -> tuple[int, str]:
+    """runner() + eventos scenario_start / scenario_end para medir duraciones."""
+    events.emit("scenario_start", scenario=script_path.name, output_dir=str(output_dir))
+    t0 = time.perf_counter()
+    code, err = 1, ""
+    try:
+        code, err = runner(script_path, output_dir)
+        return code, err
+    finally:
+        events.emit("scenario_end", scenario=script_path.name, exit_code=code,
+                    duration=round(time.perf_counter() - t0, 6))
+
+
+def run_scripts(scripts: list[Path], run_dir: Path, jobs: int = 1,
+                runner: Runner = run_script) -> dict[str, tuple[int, str]]:
+    """
+    Corre los scripts y retorna {nombre: (exit_code, error_text)}.
+    Cada script escribe en <run_dir>/<nombre_script>/.
+
+    jobs == 1: uno tras otro, en el orden recibido.
+    jobs > 1: hasta `jobs` escenarios a la vez, respetando SCRIPT_DEPENDS.
+    """
+    results: dict[str, tuple[int, str]] = {}
+
+    if jobs <= 1:
+        for s in scripts:
+            results[s.name] = run_one(runner, s, run_dir / s.stem)
+        return results
+
+    pending = list(scripts)
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        while pending or running:
+            # Lanzar todo lo que ya tenga sus dependencias terminadas
+            for s in list(pending):
+                if len(running) >= jobs:
+                    break
+                if all(dep in results for dep in SCRIPT_DEPENDS.get(s.name, [])):
+                    pending.remove(s)
+                    fut = executor.submit(run_one, runner, s, run_dir / s.stem)
+                    running[fut] = s
+
+            if not running:
+                # No debería pasar: validate_scripts() descarta ciclos
+                raise RuntimeError("Dependencias sin resolver: " + ", ".join(s.name for s in pending))
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                s = running.pop(fut)
+                try:
+                    results[s.name] = fut.result()
+                except Exception as e:
+                    results[s.name] = (1, f"{type(e).__name__}: {e}")
+
+    return results
+
+
+def iter_output_files(run_dir: Path) -> list[Path]:
+    """
+    Artefactos que registraron los escenarios de esta corrida (manifest.jsonl
+    de cada outputs/runs/<corrida>/<escenario>/), excluyendo carpetas y
+    extensiones no deseadas. No recorre el resto de outputs/.
     """
     files: list[Path] = []
-    if not OUTPUTS_DIR.exists():
-        return files
 
-    for p in OUTPUTS_DIR.rglob("*"):
-        if p.is_dir():
-            continue
+    for artifact in collect_run_artifacts(run_dir):
+        p = artifact.path
 
         # Excluir directorios “prohibidos” si por alguna razón están adentro
         if any(part in EXCLUDE_DIR_NAMES for part in p.parts):
@@ -131,19 +462,39 @@ def iter_output_files() -> list[Path]:
     return files
 
 
-def build_email(attachments: list[Path], summary: str) -> EmailMessage:
+def mail_part_bytes() -> int:
+    """Tope por correo (MAIL_PART_MB, antes de base64)."""
+    raw = os.getenv("MAIL_PART_MB", "").strip()
+    return int(float(raw) * 1_048_576) if raw else DEFAULT_PART_BYTES
+
+
+def package_attachments(files: list[Path], run_dir: Path) -> PackageReport:
+    """
+    Empaqueta los artefactos en zips por partes dentro de la corrida
+    (outputs/runs/<corrida>/_correo/). Nada se carga entero a memoria.
+    """
+    return package_artifacts(files, root=run_dir, dest_dir=run_dir / "_correo",
+                             part_bytes=mail_part_bytes())
+
+
+def build_email(attachment: Path | None, summary: str, part: int = 1, total: int = 1,
+                mail_to: str | None = None) -> EmailMessage:
     """
     Arma el correo usando variables de entorno.
+    Un correo por parte: `attachment` es el zip de esa parte (o None si no hay archivos).
+    `mail_to` permite mandarlo a un grupo de MAIL_TO en vez de a todos.
     """
     # Requeridos
-    mail_to = os.getenv("MAIL_TO", "").strip()
+    mail_to = (mail_to if mail_to is not None else os.getenv("MAIL_TO", "")).strip()
     mail_from = os.getenv("MAIL_FROM", "").strip()
-    smtp_user = os.getenv("SMTP_USER", "").strip()  # puede ser igual a MAIL_FROM
     subject = os.getenv("MAIL_SUBJECT", "").strip() or "Entrega automática - outputs Selenium"
 
     if not mail_to or not mail_from:
         raise RuntimeError("Falta MAIL_TO o MAIL_FROM en variables de entorno.")
 
+    if total > 1:
+        subject = f"{subject} ({part}/{total})"
+
     msg = EmailMessage()
     msg["From"] = mail_from
     msg["To"] = mail_to
@@ -153,58 +504,194 @@ def build_email(attachments: list[Path], summary: str) -> EmailMessage:
     body = (
         "Entrega automática generada por main.py.\n\n"
         f"Resumen:\n{summary}\n\n"
-        f"Archivos adjuntos: {len(attachments)}\n"
-        f"Timestamp: {datetime.now().isoformat(timespec='seconds')}\n"
+        f"Parte {part} de {total}"
+        + (f": {attachment.name}" if attachment is not None else " (sin adjuntos)")
+        + f"\nTimestamp: {datetime.now().isoformat(timespec='seconds')}\n"
     )
     msg.set_content(body)
 
-    for f in attachments:
-        ctype, encoding = mimetypes.guess_type(str(f))
-        if ctype is None or encoding is not None:
-            ctype = "application/octet-stream"
-        maintype, subtype = ctype.split("/", 1)
+    if attachment is not None:
+        # Una parte está acotada por MAIL_PART_MB: leerla entera es memoria acotada
         msg.add_attachment(
-            f.read_bytes(),
-            maintype=maintype,
-            subtype=subtype,
-            filename=f.name,
+            attachment.read_bytes(),
+            maintype="application",
+            subtype="zip",
+            filename=attachment.name,
         )
 
     return msg
 
 
-def send_email(msg: EmailMessage) -> None:
+def send_email(parts: list[Path | None], summary: str) -> None:
     """
-    Envía correo SMTP (TLS). Credenciales por variables de entorno.
+    Envía todas las partes a cada grupo de MAIL_TO ("a, b; c" = 2 grupos).
+    Una conexión SMTP autenticada por grupo, grupos en paralelo, reintentos
+    ante errores 4xx. Credenciales por variables de entorno.
     """
-    smtp_host = os.getenv("SMTP_HOST", "").strip()
-    smtp_port = int(os.getenv("SMTP_PORT", "587").strip())
-    smtp_user = os.getenv("SMTP_USER", "").strip()
-    smtp_pass = os.getenv("SMTP_PASS", "").strip()
-
-    if not smtp_host or not smtp_user or not smtp_pass:
-        raise RuntimeError("Faltan SMTP_HOST/SMTP_USER/SMTP_PASS en variables de entorno.")
-
-    log("Enviando correo…")
-    with smtplib.SMTP(smtp_host, smtp_port, timeout=60) as server:
-        server.ehlo()
-        server.starttls()
-        server.ehlo()
-        server.login(smtp_user, smtp_pass)
-        server.send_message(msg)
+    groups = recipient_groups(os.getenv("MAIL_TO", ""))
+    if not groups or not os.getenv("MAIL_FROM", "").strip():
+        raise RuntimeError("Falta MAIL_TO o MAIL_FROM en variables de entorno.")
+    settings = SmtpSettings.from_env()
+
+    def messages_for(group: str):
+        # Se arma de a un mensaje: solo una parte en memoria por grupo
+        for i, part in enumerate(parts, start=1):
+            yield build_email(part, summary, part=i, total=len(parts), mail_to=group)
+
+    log(f"Enviando {len(parts)} correo(s) a {len(groups)} grupo(s)…")
+    reports = deliver(groups, messages_for, settings, report=log)
+    failed = [r for r in reports if not r.ok]
+    if failed:
+        raise RuntimeError("; ".join(r.describe() for r in failed))
     log("Correo enviado correctamente ✅")
 
 
-def main() -> int:
+def report_commands(run_dir: Path) -> None:
+    """Histogramas de comandos WebDriver de la corrida (wd_commands.json) + top en el log."""
+    try:
+        lines = write_run_report(run_dir, run_dir / "wd_commands.json")
+    except Exception as e:
+        log(f"⚠️ No se pudo armar el reporte de comandos: {type(e).__name__}: {e}")
+        return
+    if lines:
+        log("Comandos WebDriver (por tiempo total):")
+        for line in lines:
+            log(f"  {line}")
+
+
+def collect_results(run_dir: Path, fmt: str) -> None:
+    """
+    Junta las hojas de resultados de los escenarios en run_dir/_resultados/
+    (un solo libro para la corrida) y lo registra para el correo.
+    """
+    out_dir = run_dir / "_resultados"
+    try:
+        with events.phase("results", format=fmt):
+            written = merge_results(run_dir, out_dir, fmt)
+            with use_output_dir(out_dir):
+                for p in written:
+                    register_artifact(p)
+    except Exception as e:
+        log(f"⚠️ No se pudieron juntar los resultados: {type(e).__name__}: {e}")
+        return
+    if written:
+        log(f"Resultados ({fmt}): {', '.join(p.name for p in written)}")
+
+
+def cleanup_outputs(run_dir: Path) -> None:
+    """Retención incremental de outputs/ (nunca borra la corrida actual)."""
+    try:
+        with events.phase("retention"):
+            report = apply_retention(OUTPUTS_DIR, current_run=run_dir)
+        log(f"Retención: {report.describe()}")
+        events.emit("retention", runs_deleted=report.runs_deleted, bytes_freed=report.bytes_freed,
+                    legacy_deleted=report.legacy_deleted, runs_kept=report.runs_kept,
+                    bytes_kept=report.bytes_kept)
+    except Exception as e:
+        # La limpieza nunca debe tumbar la corrida
+        log(f"⚠️ Retención falló: {type(e).__name__}: {e}")
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Corre los escenarios de src/ y envía outputs/ por correo.")
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=1,
+        help="Cantidad de escenarios en paralelo (default: 1, secuencial).",
+    )
+    parser.add_argument(
+        "--no-pool",
+        action="store_true",
+        help="No reutilizar sesiones de Chrome: cada script lanza la suya.",
+    )
+    parser.add_argument(
+        "--subprocess",
+        action="store_true",
+        help="Correr cada script en su propio python (aislamiento total, más lento).",
+    )
+    parser.add_argument(
+        "--no-retention",
+        action="store_true",
+        help="No borrar corridas viejas de outputs/ al terminar (ver config/retention.yml).",
+    )
+    parser.add_argument(
+        "--contexts",
+        action="store_true",
+        default=contexts_enabled(),
+        help="Cada escenario en un contexto de navegador nuevo (incógnito) dentro del Chrome del pool.",
+    )
+    parser.add_argument(
+        "--results-format",
+        choices=FORMATS,
+        default=os.getenv("RESULTS_FORMAT", "xlsx"),
+        help="Formato del libro de resultados de la corrida (default: xlsx; parquet requiere pyarrow).",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="No correr los escenarios sin cambios desde su última corrida OK: se reusan sus artefactos.",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=ttl_hours(),
+        help="Horas que vale un resultado de la caché con --incremental (default: CACHE_TTL_HOURS o 24).",
+    )
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs debe ser >= 1")
+    return args
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Corre el pipeline en una carpeta propia (outputs/runs/<fecha_hora>/) con
+    su log de eventos (events.jsonl) y, si los escenarios corren en proceso,
+    con su salida etiquetada por nombre.
+    """
+    args = parse_args(argv)
+
+    ensure_outputs_folder()
+    run_dir = new_run_dir(OUTPUTS_DIR)
+    event_log = events.EventLog(run_dir / "events.jsonl")
+    events.install(event_log)
+
+    saved = sys.stdout, sys.stderr
+    if not args.subprocess:
+        TAGGED_STREAMS[:] = [
+            TaggedStream(sys.stdout, "stdout", emit_line),
+            TaggedStream(sys.stderr, "stderr", emit_line),
+        ]
+        sys.stdout, sys.stderr = TAGGED_STREAMS
+
+    events.emit("run_start", run_dir=str(run_dir), jobs=args.jobs,
+                subprocess=args.subprocess, pool=not args.no_pool)
+    code = 1
+    try:
+        code = run_pipeline(args, run_dir)
+        return code
+    finally:
+        if not args.no_retention:
+            cleanup_outputs(run_dir)
+        events.emit("run_end", exit_code=code)
+        sys.stdout, sys.stderr = saved
+        TAGGED_STREAMS.clear()
+        events.install(None)
+        event_log.close()
+
+
+def run_pipeline(args: argparse.Namespace, run_dir: Path) -> int:
     """
     Flujo:
-      1) Prepara outputs/
-      2) Corre scripts
-      3) Adjunta todo outputs/
+      1) Prepara outputs/runs/<corrida>/
+      2) Corre scripts en proceso (o en subprocesos con --subprocess;
+         en paralelo si --jobs > 1)
+      3) Adjunta lo que registraron en sus manifiestos
       4) Envía correo al final
     """
     log("Iniciando ejecución del pipeline…")
-    ensure_outputs_folder()
+    log(f"Carpeta de la corrida: {run_dir}")
 
     # Nota: aquí NO detectamos Chrome instalado.
     # Si tus scripts dependen de Chrome portable, debes setear CHROME_BIN/CHROMEDRIVER_BIN
@@ -216,11 +703,55 @@ def main() -> int:
 
     scripts = validate_scripts()
 
+    # Los escenarios solo escriben sus spools; el libro se arma al final (también en subprocesos)
+    os.environ[RESULTS_MANAGED_ENV] = "1"
+
+    if args.contexts:
+        # Lo leen lease_driver() en proceso y en los subprocesos
+        os.environ[CONTEXTS_ENV] = "1"
+        log("Aislamiento por contexto de navegador (Target.createBrowserContext).")
+
+    if args.jobs > 1:
+        log(f"Modo paralelo: {args.jobs} escenarios a la vez.")
+
+    cache, plan = plan_incremental(scripts, args.cache_ttl) if args.incremental else (None, {})
+    to_run = sum(1 for s in scripts if plan.get(s.name, (None, None))[1] is None)
+
+    pool = None
+    if not to_run:
+        log("Todos los escenarios salen de la caché: no se lanza Chrome.")
+    elif not args.no_pool:
+        # Una sesión por worker; se lanzan en paralelo antes de empezar
+        pool = DriverPool(size=min(args.jobs, to_run), report=log)
+        try:
+            with events.phase("pool_warm"):
+                pool.warm()
+        except Exception as e:
+            log(f"⚠️ No se pudo precalentar el pool: {type(e).__name__}: {e}")
+    elif not args.subprocess:
+        # En proceso siempre hay pool; sin reuso equivale a un Chrome por escenario
+        pool = DriverPool(size=args.jobs, report=log, reuse=False)
+
+    try:
+        runner = make_runner(args.subprocess, pool, Budgets.load())
+        if cache is not None:
+            runner = cached_runner(runner, cache, plan, run_dir)
+        with events.phase("scenarios"):
+            outcomes = run_scripts(scripts, run_dir, jobs=args.jobs, runner=runner)
+    finally:
+        if pool is not None:
+            log(f"Pool de Chrome: {pool.stats.summary()}")
+            pool.close()
+
+    report_commands(run_dir)
+    collect_results(run_dir, args.results_format)
+
+    # El resumen siempre sale en el orden de SCRIPT_ORDER
     results: list[tuple[str, int]] = []
     failures: list[str] = []
 
     for s in scripts:
-        code, err = run_script(s)
+        code, err = outcomes[s.name]
         results.append((s.name, code))
         if code != 0:
             failures.append(f"{s.name} (exit={code})")
@@ -230,13 +761,21 @@ def main() -> int:
     # Correo SIEMPRE al final
     # =========================
     log("Preparando archivos para correo…")
-    files = iter_output_files()
-    log(f"Adjuntando {len(files)} archivos…")
+    with events.phase("collect"):
+        files = iter_output_files(run_dir)
+    log(f"Empaquetando {len(files)} archivos…")
+    with events.phase("package", files=len(files)):
+        package = package_attachments(files, run_dir)
+    log(f"Adjuntos: {package.describe()}")
+    for name in package.oversized:
+        log(f"⚠️ {name} supera MAIL_PART_MB por sí solo; va en una parte propia.")
 
     summary_lines = []
     summary_lines.append("Ejecución de scripts:")
     for name, code in results:
         status = "OK" if code == 0 else f"FAIL({code})"
+        if name in CACHED:
+            status += " (caché)"
         summary_lines.append(f"- {name}: {status}")
 
     if failures:
@@ -245,11 +784,26 @@ def main() -> int:
     else:
         summary_lines.append("\nSin fallos.")
 
+    summary_lines.append(f"\nAdjuntos: {package.describe()}")
+    if package.duplicates:
+        summary_lines.append("Duplicados (mismo contenido, se adjunta solo el original):")
+        summary_lines.extend([f"- {dup} = {orig}" for dup, orig in package.duplicates])
+
+    if CACHED:
+        summary_lines.append(f"\nSin cambios, reusados de la caché ({len(CACHED)}):")
+        summary_lines.extend([f"- {e.describe()}" for e in CACHED.values()])
+
+    if KILLS:
+        freed = sum(k.rss_freed for k in KILLS) / 1_048_576
+        summary_lines.append(f"\nWatchdog: {len(KILLS)} escenario(s) cortados por tiempo, {freed:.1f} MB liberados:")
+        summary_lines.extend([f"- {k.describe()}" for k in KILLS])
+
     summary = "\n".join(summary_lines)
 
     try:
-        msg = build_email(files, summary)
-        send_email(msg)
+        parts = [p.path for p in package.parts] or [None]
+        with events.phase("email", attachments=len(files), parts=len(parts)):
+            send_email(parts, summary)
     except Exception as e:
         log("❌ Error enviando correo.")
         print(str(e), flush=True)
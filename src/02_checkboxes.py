@@ -1,46 +1,72 @@
 from pathlib import Path
 from datetime import datetime
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
 
+from core.paths import outputs_dir
+from core.driver_pool import lease_driver
+from core.batch import Batch
+from core.fanout import RESULT_HEADER, fan_out, goto, load_dataset, until
+from core import waits as EC
+from core.results_sink import results_sheet
+from core.screenshots import evidence
+from core.site import site_url
+from core.events import step
+
+
+# Estados a probar (config/datasets/checkboxes.yml), repartidos entre varias pestañas
+DATASET = "checkboxes"
+COLUMNS = ["first", "second"]
 
-BASE_DIR = Path(__file__).resolve().parent.parent
-OUTPUTS_DIR = BASE_DIR / "outputs"
-OUTPUTS_DIR.mkdir(exist_ok=True)
 
 def stamp(prefix: str, ext: str) -> Path:
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    return OUTPUTS_DIR / f"{ts}_002_{prefix}.{ext}"
+    return outputs_dir() / f"{ts}_002_{prefix}.{ext}"
+
+
+def set_boxes(driver, row: dict):
+    wanted = (bool(row["first"]), bool(row["second"]))
+
+    yield goto(site_url("/checkboxes"))
+    boxes = yield until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, "input[type='checkbox']")))
+
+    # Leer estado + click en un solo viaje
+    batch = Batch(driver)
+    first = batch.set_checked(boxes[0], wanted[0])
+    second = batch.set_checked(boxes[1], wanted[1])
+    batch.run()
+
+    got = (bool(first.value), bool(second.value))
+    if got != wanted:
+        raise RuntimeError(f"Los checkboxes quedaron en {got}, se pidió {wanted}")
+    return f"{got[0]}/{got[1]}"
 
-opts = Options()
-opts.add_argument("--start-maximized")
 
-driver = webdriver.Chrome(options=opts)
-wait = WebDriverWait(driver, 10)
+def main() -> None:
+    rows = load_dataset(DATASET)
 
-try:
-    driver.get("https://the-internet.herokuapp.com/checkboxes")
+    with lease_driver() as driver, evidence() as shots:
+        with step("marcar"):
+            report = fan_out(driver, rows, set_boxes)
 
-    boxes = wait.until(
-        EC.presence_of_all_elements_located((By.CSS_SELECTOR, "input[type='checkbox']"))
-    )
+        with step("exportar"):
+            with results_sheet("Checkboxes", header=COLUMNS + RESULT_HEADER) as sheet:
+                sheet.extend(report.sheet_rows(COLUMNS))
 
-    # Objetivo: marcar 1 y desmarcar 2
-    if not boxes[0].is_selected():
-        boxes[0].click()
+        with step("evidencia"):
+            # La pestaña de la sesión quedó con la última fila que le tocó: solo el formulario
+            forms = driver.find_elements(By.ID, "checkboxes")
+            shot = shots.capture(driver, stamp("checkboxes_ok", "png"), element=forms[0] if forms else None)
 
-    if boxes[1].is_selected():
-        boxes[1].click()
+        print("OK:" if not report.failed else "CON ERRORES:", report.describe())
+        for r in report.failed:
+            print(f" - fila {r.index + 1} {r.row}: {r.error}")
+        print("EVIDENCIA:", shot)
+        print("RESULTADOS:", sheet.path)
 
-    shot = stamp("checkboxes_ok", "png")
-    driver.save_screenshot(str(shot))
+        if report.failed:
+            raise RuntimeError(f"{len(report.failed)} de {len(report.results)} combinaciones fallaron")
 
-    print("OK: checkbox 1 marcado, checkbox 2 desmarcado")
-    print("EVIDENCIA:", shot)
 
-finally:
-    driver.quit()
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,44 @@
 from pathlib import Path
 from datetime import datetime
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
 
+from core.paths import outputs_dir
+from core.driver_pool import lease_driver
+from core.waits import EventWait
+from core import waits as EC
+from core.screenshots import evidence
+from core.site import site_url
+from core.events import step
 
-BASE_DIR = Path(__file__).resolve().parent.parent
-OUTPUTS_DIR = BASE_DIR / "outputs"
-OUTPUTS_DIR.mkdir(exist_ok=True)
 
 def stamp(prefix: str, ext: str) -> Path:
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    return OUTPUTS_DIR / f"{ts}_003_{prefix}.{ext}"
+    return outputs_dir() / f"{ts}_003_{prefix}.{ext}"
 
-opts = Options()
-opts.add_argument("--start-maximized")
 
-driver = webdriver.Chrome(options=opts)
-wait = WebDriverWait(driver, 10)
+def main() -> None:
+    with lease_driver() as driver, evidence() as shots:
+        wait = EventWait(driver, 10)
 
-try:
-    driver.get("https://the-internet.herokuapp.com/context_menu")
+        with step("abrir"):
+            driver.get(site_url("/context_menu"))
 
-    box = wait.until(EC.presence_of_element_located((By.ID, "hot-spot")))
+            box = wait.until(EC.presence_of_element_located((By.ID, "hot-spot")))
 
-    ActionChains(driver).context_click(box).perform()
+        with step("menu_contextual"):
+            ActionChains(driver).context_click(box).perform()
 
-    alert = wait.until(EC.alert_is_present())
-    alert.accept()
+            alert = wait.until(EC.alert_is_present())
+            alert.accept()
 
-    shot = stamp("context_menu_ok", "png")
-    driver.save_screenshot(str(shot))
+        with step("evidencia"):
+            shot = shots.capture(driver, stamp("context_menu_ok", "png"))
 
-    print("OK: context menu ejecutado y alerta aceptada")
-    print("EVIDENCIA:", shot)
+        print("OK: context menu ejecutado y alerta aceptada")
+        print("EVIDENCIA:", shot)
 
-finally:
-    driver.quit()
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,66 @@
 from pathlib import Path
 from datetime import datetime
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait, Select
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.support.ui import Select
 
+from core.paths import outputs_dir
+from core.driver_pool import lease_driver
+from core.fanout import RESULT_HEADER, fan_out, goto, load_dataset, until
+from core import waits as EC
+from core.results_sink import results_sheet
+from core.screenshots import evidence
+from core.site import site_url
+from core.events import step
+
+
+# Opciones a probar (config/datasets/dropdown.yml), repartidas entre varias pestañas
+DATASET = "dropdown"
+COLUMNS = ["value", "expected"]
 
-BASE_DIR = Path(__file__).resolve().parent.parent
-OUTPUTS_DIR = BASE_DIR / "outputs"
-OUTPUTS_DIR.mkdir(exist_ok=True)
 
 def stamp(prefix: str, ext: str) -> Path:
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    return OUTPUTS_DIR / f"{ts}_004_{prefix}.{ext}"
+    return outputs_dir() / f"{ts}_004_{prefix}.{ext}"
+
+
+def select_option(driver, row: dict):
+    yield goto(site_url("/dropdown"))
+    dd = yield until(EC.element_to_be_clickable((By.ID, "dropdown")))
+
+    select = Select(dd)
+    select.select_by_value(str(row["value"]))
+    selected = select.first_selected_option.text.strip()
+    if selected != str(row["expected"]):
+        raise RuntimeError(f"Quedó seleccionada {selected!r}, se esperaba {row['expected']!r}")
+    return selected
+
+
+def main() -> None:
+    rows = load_dataset(DATASET)
 
-opts = Options()
-opts.add_argument("--start-maximized")
+    with lease_driver() as driver, evidence() as shots:
+        with step("seleccionar"):
+            report = fan_out(driver, rows, select_option)
 
-driver = webdriver.Chrome(options=opts)
-wait = WebDriverWait(driver, 10)
+        with step("exportar"):
+            with results_sheet("Dropdown", header=COLUMNS + RESULT_HEADER) as sheet:
+                sheet.extend(report.sheet_rows(COLUMNS))
 
-try:
-    driver.get("https://the-internet.herokuapp.com/dropdown")
+        with step("evidencia"):
+            # La pestaña de la sesión quedó con la última opción que le tocó
+            dds = driver.find_elements(By.ID, "dropdown")
+            shot = shots.capture(driver, stamp("dropdown_options", "png"), element=dds[0] if dds else None)
 
-    dd = wait.until(EC.element_to_be_clickable((By.ID, "dropdown")))
-    Select(dd).select_by_value("2")
+        print("OK:" if not report.failed else "CON ERRORES:", report.describe())
+        for r in report.failed:
+            print(f" - opción {r.row.get('value')}: {r.error}")
+        print("EVIDENCIA:", shot)
+        print("RESULTADOS:", sheet.path)
 
-    shot = stamp("dropdown_option_2", "png")
-    driver.save_screenshot(str(shot))
+        if report.failed:
+            raise RuntimeError(f"{len(report.failed)} de {len(report.results)} opciones fallaron")
 
-    print("OK: opción 2 seleccionada")
-    print("EVIDENCIA:", shot)
 
-finally:
-    driver.quit()
+if __name__ == "__main__":
+    main()
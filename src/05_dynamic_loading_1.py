@@ -1,42 +1,42 @@
 from pathlib import Path
 from datetime import datetime
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
 
+from core.paths import outputs_dir
+from core.driver_pool import lease_driver
+from core.waits import EventWait
+from core import waits as EC
+from core.screenshots import evidence
+from core.site import site_url
+from core.events import step
 
-BASE_DIR = Path(__file__).resolve().parent.parent
-OUTPUTS_DIR = BASE_DIR / "outputs"
-OUTPUTS_DIR.mkdir(exist_ok=True)
 
 def stamp(prefix: str) -> Path:
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    return OUTPUTS_DIR / f"{ts}_005_dynamic_loading_1_{prefix}.png"
+    return outputs_dir() / f"{ts}_005_dynamic_loading_1_{prefix}.png"
 
 
-opts = Options()
-opts.add_argument("--start-maximized")
+def main() -> None:
+    with lease_driver() as driver, evidence() as shots:
+        wait = EventWait(driver, 15)
 
-driver = webdriver.Chrome(options=opts)
-wait = WebDriverWait(driver, 15)
+        with step("abrir"):
+            driver.get(site_url("/dynamic_loading/1"))
 
-try:
-    driver.get("https://the-internet.herokuapp.com/dynamic_loading/1")
+        with step("carga_dinamica"):
+            start_btn = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "#start button")))
+            start_btn.click()
 
-    start_btn = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "#start button")))
-    start_btn.click()
+            hello = wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, "#finish h4")))
+            assert hello.text.strip() == "Hello World!", f"Texto inesperado: {hello.text!r}"
 
-    hello = wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, "#finish h4")))
-    assert hello.text.strip() == "Hello World!", f"Texto inesperado: {hello.text!r}"
+        with step("evidencia"):
+            shot = shots.capture(driver, stamp("hello_world"), element=hello)
 
-    shot = stamp("hello_world")
-    driver.save_screenshot(str(shot))
+        print("OK: Dynamic Loading 1 -> Hello World!")
+        print("EVIDENCIA:", shot)
 
-    print("OK: Dynamic Loading 1 -> Hello World!")
-    print("EVIDENCIA:", shot)
 
-finally:
-    driver.quit()
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,71 @@
-from pathlib import Path
-from datetime import datetime
-import time
-
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-
-BASE_DIR = Path(__file__).resolve().parent.parent
-DOWNLOADS_DIR = BASE_DIR / "outputs" / "downloads"
-DOWNLOADS_DIR.mkdir(parents=True, exist_ok=True)
-
-opts = Options()
-opts.add_argument("--start-maximized")
-prefs = {
-    "download.default_directory": str(DOWNLOADS_DIR),
-    "download.prompt_for_download": False,
-    "safebrowsing.enabled": True
-}
-opts.add_experimental_option("prefs", prefs)
-
-driver = webdriver.Chrome(options=opts)
-wait = WebDriverWait(driver, 15)
-
-try:
-    driver.get("https://the-internet.herokuapp.com/download")
-
-    # Toma el primer archivo disponible
-    link = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "#content a")))
-    filename = link.text.strip()
-    link.click()
-
-    # Espera activa a que el archivo exista (sin sleep fijo)
-    target = DOWNLOADS_DIR / filename
-    wait.until(lambda d: target.exists())
-
-    print("OK: archivo descargado")
-    print("EVIDENCIA:", target)
-
-finally:
-    driver.quit()
+
+from core.paths import downloads_dir
+from core.driver_pool import lease_driver
+from core.waits import EventWait
+from core.downloads import watch_downloads
+from core.batch import Batch
+from core.http_download import download_all, download_mode, fetch, fetch_all, session_from_driver
+from core.packaging import file_sha256
+from core import waits as EC
+from core.manifest import register_artifact
+from core.site import site_url
+from core.events import step
+
+
+def main() -> None:
+    download_dir = downloads_dir()
+
+    with lease_driver(download_dir=download_dir) as driver:
+        wait = EventWait(driver, 15)
+
+        with step("abrir"):
+            driver.get(site_url("/download"))
+
+        with step("descargar"):
+            wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "#content a")))
+
+            # Links de la lista (URL absoluto + texto) en un solo viaje: el primero
+            # siempre, todos con DOWNLOAD_ALL=1
+            batch = Batch(driver)
+            link = batch.find((By.CSS_SELECTOR, "#content a"))
+            href = batch.prop(link, "href")
+            name = batch.text(link)
+            every = download_all()
+            if every:
+                hrefs = batch.prop(batch.find_all((By.CSS_SELECTOR, "#content a")), "href")
+            batch.run()
+
+            mode = download_mode()
+            fetched = []
+            if mode in ("http", "both"):
+                # Directo por HTTP con la sesión del navegador
+                # ("both": a una subcarpeta, así el click de Chrome no los pisa)
+                http_dir = download_dir / "http" if mode == "both" else download_dir
+                session = session_from_driver(driver)
+                if every:
+                    fetched = fetch_all(session, hrefs.value, http_dir, workers=4)
+                else:
+                    fetched = [fetch(session, href.value, http_dir)]
+                failed = [f for f in fetched if not f.ok]
+                if failed:
+                    raise RuntimeError("Descargas fallidas: " + "; ".join(f.describe() for f in failed))
+                for f in fetched:
+                    register_artifact(f.path, kind="download")
+                    print("DESCARGA (http):", f.describe())
+
+            if mode in ("browser", "both"):
+                # Camino del navegador (y verificación en "both"): click en el primer archivo
+                filename = name.value.strip()
+                with watch_downloads(driver, download_dir) as downloads:
+                    link.value.click()
+                    download = downloads.wait(filename, timeout=15)
+                register_artifact(download.path, kind="download")
+                print("DESCARGA (navegador):", download.describe())
+                if fetched and file_sha256(download.path) != fetched[0].sha256:
+                    raise RuntimeError(f"{filename}: el archivo del navegador no coincide con el de HTTP")
+
+        print(f"OK: {max(len(fetched), 1)} archivo(s) descargado(s) ({mode})")
+
+if __name__ == "__main__":
+    main()
@@ -4,83 +4,131 @@ from pathlib import Path
 from datetime import datetime
 import yaml
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
+
+from core.paths import outputs_dir
+from core.driver_pool import lease_driver
+from core.waits import EventWait
+from core.batch import Batch
+from core.fanout import RESULT_HEADER, fan_out, goto, load_dataset, submit, until
+from core import waits as EC
+from core.results_sink import results_sheet
+from core.screenshots import evidence
+from core.site import site_url
+from core.events import step
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 CONFIG_DIR = BASE_DIR / "config"
-OUTPUTS_DIR = BASE_DIR / "outputs"
-
-OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
 
 CRED_FILE = CONFIG_DIR / "credentials.yml"
 
+# Combinaciones usuario/clave con el mensaje esperado (config/datasets/credentials.csv).
+# Cada una corre en su propio contexto de navegador: la sesión de una no le llega a otra.
+DATASET = "credentials"
+COLUMNS = ["username", "expected"]  # la clave no va a los resultados
+LOGIN_OK = "You logged into a secure area!"
+
 
 def timestamp():
     return datetime.now().strftime("%Y%m%d_%H%M%S")
 
 
-# Leer credenciales desde YAML
-if not CRED_FILE.exists():
-    raise FileNotFoundError(f"No existe el archivo: {CRED_FILE}")
+def load_credentials() -> tuple[str, str]:
+    # Leer credenciales desde YAML
+    if not CRED_FILE.exists():
+        raise FileNotFoundError(f"No existe el archivo: {CRED_FILE}")
+
+    with CRED_FILE.open("r", encoding="utf-8") as f:
+        creds = yaml.safe_load(f)
+
+    username = creds.get("username")
+    password = creds.get("password")
+
+    if not username or not password:
+        raise ValueError("El archivo YAML debe contener username y password")
+
+    return username, password
+
+
+def try_login(driver, row: dict):
+    yield goto(site_url("/login"))
+    yield until(EC.element_to_be_clickable((By.CSS_SELECTOR, "button[type='submit']")))
+
+    batch = Batch(driver)
+    batch.set_value(batch.find((By.ID, "username")), row["username"] or "")
+    batch.set_value(batch.find((By.ID, "password")), row["password"] or "")
+    batch.run()
+
+    yield submit((By.CSS_SELECTOR, "button[type='submit']"))
+    flash = yield until(EC.visibility_of_element_located((By.ID, "flash")))
+    message = flash.text.replace("×", "").strip()
+    if row["expected"] not in message:
+        raise RuntimeError(f"Mensaje {message!r}, se esperaba {row['expected']!r}")
+    return message
 
-with CRED_FILE.open("r", encoding="utf-8") as f:
-    creds = yaml.safe_load(f)
 
-username = creds.get("username")
-password = creds.get("password")
+def main() -> None:
+    username, password = load_credentials()
+    out_dir = outputs_dir()
 
-if not username or not password:
-    raise ValueError("El archivo YAML debe contener username y password")
+    with lease_driver() as driver, evidence() as shots:
+        wait = EventWait(driver, 15)
 
+        with step("abrir"):
+            driver.get(site_url("/login"))
 
-opts = Options()
-opts.add_argument("--start-maximized")
+        with step("login"):
+            wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "button[type='submit']")))
 
-driver = webdriver.Chrome(options=opts)
-wait = WebDriverWait(driver, 15)
+            # Completar los dos campos en un solo viaje; el submit es un click real
+            batch = Batch(driver)
+            batch.set_value(batch.find((By.ID, "username")), username)
+            batch.set_value(batch.find((By.ID, "password")), password)
+            batch.click(batch.find((By.CSS_SELECTOR, "button[type='submit']")), native=True)
+            batch.run()
 
-try:
-    driver.get("https://the-internet.herokuapp.com/login")
+            flash = wait.until(EC.visibility_of_element_located((By.ID, "flash")))
+            message = flash.text
 
-    user_input = wait.until(EC.visibility_of_element_located((By.ID, "username")))
-    pass_input = wait.until(EC.visibility_of_element_located((By.ID, "password")))
-    login_btn = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "button[type='submit']")))
+            if "You logged into a secure area!" not in message:
+                raise RuntimeError("Login fallido")
 
-    user_input.clear()
-    user_input.send_keys(username)
+        with step("evidencia"):
+            screenshot_login = shots.capture(driver, out_dir / f"{timestamp()}_008_login_ok.png")
+        print("OK: login correcto")
+        print("EVIDENCIA:", screenshot_login)
 
-    pass_input.clear()
-    pass_input.send_keys(password)
+        with step("logout"):
+            logout_btn = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "a[href='/logout']")))
+            logout_btn.click()
 
-    login_btn.click()
+            flash_logout = wait.until(EC.visibility_of_element_located((By.ID, "flash")))
+            if "You logged out of the secure area!" not in flash_logout.text:
+                raise RuntimeError("Logout fallido")
 
-    flash = wait.until(EC.visibility_of_element_located((By.ID, "flash")))
-    message = flash.text
+        with step("evidencia"):
+            screenshot_logout = shots.capture(driver, out_dir / f"{timestamp()}_008_logout_ok.png")
+        print("OK: logout correcto")
+        print("EVIDENCIA:", screenshot_logout)
 
-    if "You logged into a secure area!" not in message:
-        raise RuntimeError("Login fallido")
+        with step("credenciales"):
+            # El dataset + la cuenta de credentials.yml (que tiene que seguir entrando)
+            rows = load_dataset(DATASET) + [{"username": username, "password": password, "expected": LOGIN_OK}]
+            report = fan_out(driver, rows, try_login, isolate=True)
 
-    screenshot_login = OUTPUTS_DIR / f"{timestamp()}_008_login_ok.png"
-    driver.save_screenshot(str(screenshot_login))
-    print("OK: login correcto")
-    print("EVIDENCIA:", screenshot_login)
+        with step("exportar"):
+            with results_sheet("Credenciales", header=COLUMNS + RESULT_HEADER) as sheet:
+                sheet.extend(report.sheet_rows(COLUMNS))
 
-    logout_btn = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "a[href='/logout']")))
-    logout_btn.click()
+        print("OK:" if not report.failed else "CON ERRORES:", report.describe())
+        for r in report.failed:
+            print(f" - usuario {r.row.get('username')!r}: {r.error}")
+        print("RESULTADOS:", sheet.path)
 
-    flash_logout = wait.until(EC.visibility_of_element_located((By.ID, "flash")))
-    if "You logged out of the secure area!" not in flash_logout.text:
-        raise RuntimeError("Logout fallido")
+        if report.failed:
+            raise RuntimeError(f"{len(report.failed)} de {len(report.results)} combinaciones fallaron")
 
-    screenshot_logout = OUTPUTS_DIR / f"{timestamp()}_008_logout_ok.png"
-    driver.save_screenshot(str(screenshot_logout))
-    print("OK: logout correcto")
-    print("EVIDENCIA:", screenshot_logout)
 
-finally:
-    driver.quit()
+if __name__ == "__main__":
+    main()
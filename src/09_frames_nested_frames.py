@@ -1,71 +1,73 @@
 # 09_frames_nested_frames.py
-from pathlib import Path
 from datetime import datetime
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
 
-from openpyxl import Workbook
+from core.paths import outputs_dir
+from core.driver_pool import lease_driver
+from core.waits import EventWait
+from core import waits as EC
+from core.screenshots import evidence
+from core.site import site_url
+from core.results_sink import results_sheet
+from core.events import step
+
+
+# Solo lee texto: headless, sin imágenes ni fuentes (ver core.profiles)
+PROFILE = "throughput"
 
-BASE_DIR = Path(__file__).resolve().parent.parent
-OUTPUTS_DIR = BASE_DIR / "outputs"
-OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
 
 def run_tag():
     # mismo estilo que tus evidencias: fecha_hora + consecutivo
     return datetime.now().strftime("%Y%m%d_%H%M%S") + "_009"
 
-opts = Options()
-opts.add_argument("--start-maximized")
-
-driver = webdriver.Chrome(options=opts)
-wait = WebDriverWait(driver, 15)
-
-try:
-    driver.get("https://the-internet.herokuapp.com/nested_frames")
-
-    # 1) Ir al frame BOTTOM y obtener texto
-    wait.until(EC.presence_of_element_located((By.TAG_NAME, "frameset")))
-    driver.switch_to.frame("frame-bottom")
-
-    body = wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-    bottom_text = body.text.strip()
-
-    # 2) Highlight visual del texto (en el frame BOTTOM)
-    driver.execute_script(
-        """
-        const el = arguments[0];
-        el.style.background = '#fff3a0';
-        el.style.border = '3px solid #ff3b30';
-        el.style.padding = '10px';
-        el.style.borderRadius = '8px';
-        """,
-        body
-    )
-
-    tag = run_tag()
-
-    # 3) Screenshot con highlight
-    img_path = OUTPUTS_DIR / f"{tag}_frames_bottom_highlight.png"
-    driver.save_screenshot(str(img_path))
-
-    # 4) Exportar a Excel el texto BOTTOM
-    xlsx_path = OUTPUTS_DIR / f"{tag}_frames_bottom.xlsx"
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "BOTTOM"
-    ws["A1"] = "Texto (BOTTOM)"
-    ws["A2"] = bottom_text
-    wb.save(str(xlsx_path))
-
-    print("OK: BOTTOM extraído y exportado")
-    print("TEXTO:", bottom_text)
-    print("EVIDENCIAS:")
-    print(" -", img_path)
-    print(" -", xlsx_path)
-
-finally:
-    driver.quit()
+
+def main() -> None:
+    out_dir = outputs_dir()
+
+    with lease_driver(profile=PROFILE) as driver, evidence() as shots:
+        wait = EventWait(driver, 15)
+
+        with step("abrir"):
+            driver.get(site_url("/nested_frames"))
+
+        with step("extraer"):
+            # 1) Ir al frame BOTTOM y obtener texto
+            wait.until(EC.presence_of_element_located((By.TAG_NAME, "frameset")))
+            driver.switch_to.frame("frame-bottom")
+
+            body = wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+            bottom_text = body.text.strip()
+
+            # 2) Highlight visual del texto (en el frame BOTTOM)
+            driver.execute_script(
+                """
+                const el = arguments[0];
+                el.style.background = '#fff3a0';
+                el.style.border = '3px solid #ff3b30';
+                el.style.padding = '10px';
+                el.style.borderRadius = '8px';
+                """,
+                body
+            )
+
+        tag = run_tag()
+
+        with step("evidencia"):
+            # 3) Screenshot con highlight (pantalla completa: el recorte no sirve dentro de un frame)
+            img_path = shots.capture(driver, out_dir / f"{tag}_frames_bottom_highlight.png")
+
+        with step("exportar"):
+            # 4) Texto BOTTOM a la hoja del escenario (libro de resultados de la corrida)
+            with results_sheet("BOTTOM", header=["Texto (BOTTOM)"]) as sheet:
+                sheet.append([bottom_text])
+
+        print("OK: BOTTOM extraído y exportado")
+        print("TEXTO:", bottom_text)
+        print("EVIDENCIAS:")
+        print(" -", img_path)
+        print(" - hoja BOTTOM:", sheet.path)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,74 +1,74 @@
 from pathlib import Path
 from datetime import datetime
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 
-from openpyxl import Workbook
+from core.paths import outputs_dir
+from core.driver_pool import lease_driver
+from core.waits import EventWait
+from core.extract import extract_table, extract_tree, TextIndex
+from core import waits as EC
+from core.screenshots import evidence
+from core.site import site_url
+from core.results_sink import results_sheet
+from core.events import step
 
 
 # ========= Config base (mismo estilo que traes) =========
-BASE_DIR = Path(__file__).resolve().parent.parent
-OUTPUTS_DIR = BASE_DIR / "outputs"
-OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
+URL_PATH = "/large"
 
-RUN_TS = datetime.now().strftime("%Y%m%d_%H%M%S")
-OUT_XLSX = OUTPUTS_DIR / f"{RUN_TS}_010_large_deep_dom_12_1.xlsx"
-OUT_PNG = OUTPUTS_DIR / f"{RUN_TS}_010_large_deep_dom_evidence.png"
+# Solo lee texto: headless, sin imágenes ni fuentes (ver core.profiles)
+PROFILE = "throughput"
 
-URL = "https://the-internet.herokuapp.com/large"
 
+def main() -> None:
+    out_dir = outputs_dir()
 
-def build_driver() -> webdriver.Chrome:
-    opts = webdriver.ChromeOptions()
-    opts.add_argument("--start-maximized")
-    # Nota: NO mobile emulation (no lo necesitamos aquí)
-    return webdriver.Chrome(options=opts)
+    run_ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    out_png = out_dir / f"{run_ts}_010_large_deep_dom_evidence.png"
 
+    with lease_driver(profile=PROFILE) as driver, evidence() as shots:
+        wait = EventWait(driver, 20)
 
-driver = build_driver()
-wait = WebDriverWait(driver, 20)
+        with step("abrir"):
+            driver.get(site_url(URL_PATH))
 
-try:
-    driver.get(URL)
+            # La tabla está al final del documento: cuando aparece su última fila, ya cargó todo
+            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "#large-table tbody tr:last-child td")))
 
-    # Espera a que exista al menos un "12.1" en la página
-    wait.until(EC.presence_of_element_located((By.XPATH, "//*[normalize-space(.)='12.1']")))
+        with step("extraer"):
+            # Lista anidada y tabla completas, una pasada por cada una; las búsquedas por texto
+            # se hacen en Python (no con XPath sobre todo el DOM)
+            siblings = extract_tree(driver, (By.CSS_SELECTOR, "#siblings"))
+            table = extract_table(driver, (By.CSS_SELECTOR, "#large-table"))
 
-    # 1) 12.1 de la LISTA (normalmente es <li>)
-    list_121 = wait.until(
-        EC.presence_of_element_located((By.XPATH, "//ul//li[normalize-space(.)='12.1']"))
-    ).text.strip()
+            # 1) 12.1 de la LISTA (<li>)
+            list_hits = TextIndex(siblings).rows("12.1")
+            list_hits = list_hits[list_hits["tag"] == "li"]
+            if list_hits.empty:
+                raise RuntimeError("No encontré 12.1 en la lista")
+            list_121 = list_hits["text"].iloc[0]
 
-    # 2) 12.1 de la TABLA (normalmente es <td>)
-    table_121 = wait.until(
-        EC.presence_of_element_located((By.XPATH, "//table//td[normalize-space(.)='12.1']"))
-    ).text.strip()
+            # 2) 12.1 de la TABLA (<td>)
+            cell = TextIndex(table).first("12.1")
+            if cell is None:
+                raise RuntimeError("No encontré 12.1 en la tabla")
+            table_121 = table.at[cell]
 
-    # Evidencia visual (screenshot)
-    driver.save_screenshot(str(OUT_PNG))
+        with step("evidencia"):
+            # Evidencia visual (screenshot)
+            out_png = shots.capture(driver, out_png)
 
-    # Export a Excel con ambos valores
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Large&DeepDOM"
+        with step("exportar"):
+            # Ambos valores a la hoja del escenario (libro de resultados de la corrida)
+            with results_sheet("Large&DeepDOM", header=["Fuente", "Valor"]) as sheet:
+                sheet.append(["Lista", list_121])
+                sheet.append(["Tabla", table_121])
 
-    ws["A1"] = "Fuente"
-    ws["B1"] = "Valor"
+        print("OK: extraído 12.1 (lista y tabla) y exportado a resultados")
+        print("EVIDENCIA:", out_png)
+        print("RESULTADOS:", sheet.path)
 
-    ws["A2"] = "Lista"
-    ws["B2"] = list_121
 
-    ws["A3"] = "Tabla"
-    ws["B3"] = table_121
-
-    wb.save(str(OUT_XLSX))
-
-    print("OK: extraído 12.1 (lista y tabla) y exportado a Excel")
-    print("EVIDENCIA PNG:", OUT_PNG)
-    print("EVIDENCIA XLSX:", OUT_XLSX)
-
-finally:
-    driver.quit()
+if __name__ == "__main__":
+    main()
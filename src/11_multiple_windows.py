@@ -1,63 +1,70 @@
 # 11_multiple_windows.py
-from pathlib import Path
 from datetime import datetime
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
 
+from core.paths import outputs_dir
+from core.driver_pool import lease_driver
+from core.waits import EventWait
+from core import waits as EC
+from core.manifest import register_artifact
+from core.screenshots import evidence
+from core.site import site_url
+from core.events import step
 
-BASE_DIR = Path(__file__).resolve().parent.parent
-OUTPUTS_DIR = BASE_DIR / "outputs"
-OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
 
-TS = datetime.now().strftime("%Y%m%d_%H%M%S")
 TASK = "011_multiple_windows"
 
-TXT_PATH = OUTPUTS_DIR / f"{TS}_{TASK}_new_window_text.txt"
-PNG_PATH = OUTPUTS_DIR / f"{TS}_{TASK}_evidence.png"
+URL_PATH = "/windows"
 
-URL = "https://the-internet.herokuapp.com/windows"
+# Solo lee texto: headless, sin imágenes ni fuentes (ver core.profiles)
+PROFILE = "throughput"
 
 
-opts = Options()
-opts.add_argument("--start-maximized")
+def main() -> None:
+    out_dir = outputs_dir()
 
-driver = webdriver.Chrome(options=opts)
-wait = WebDriverWait(driver, 20)
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    txt_path = out_dir / f"{ts}_{TASK}_new_window_text.txt"
+    png_path = out_dir / f"{ts}_{TASK}_evidence.png"
 
-try:
-    driver.get(URL)
+    with lease_driver(profile=PROFILE) as driver, evidence() as shots:
+        wait = EventWait(driver, 20)
 
-    original = driver.current_window_handle
+        with step("abrir"):
+            driver.get(site_url(URL_PATH))
 
-    # Click en "Click Here" para abrir nueva ventana
-    click_here = wait.until(EC.element_to_be_clickable((By.LINK_TEXT, "Click Here")))
-    click_here.click()
+        original = driver.current_window_handle
 
-    # Esperar a que exista una segunda ventana
-    wait.until(lambda d: len(d.window_handles) == 2)
+        with step("nueva_ventana"):
+            # Click en "Click Here" para abrir nueva ventana
+            click_here = wait.until(EC.element_to_be_clickable((By.LINK_TEXT, "Click Here")))
+            click_here.click()
 
-    new_handle = [h for h in driver.window_handles if h != original][0]
-    driver.switch_to.window(new_handle)
+            # Esperar a que exista una segunda ventana
+            wait.until(EC.number_of_windows_to_be(2))
 
-    # Extraer texto de la nueva ventana (normalmente h3 = "New Window")
-    header = wait.until(EC.presence_of_element_located((By.TAG_NAME, "h3")))
-    text = header.text.strip()
+            new_handle = [h for h in driver.window_handles if h != original][0]
+            driver.switch_to.window(new_handle)
 
-    # Evidencia visual
-    driver.save_screenshot(str(PNG_PATH))
+            # Extraer texto de la nueva ventana (normalmente h3 = "New Window")
+            header = wait.until(EC.presence_of_element_located((By.TAG_NAME, "h3")))
+            text = header.text.strip()
 
-    # Exportar texto a .txt (UTF-8)
-    TXT_PATH.write_text(text + "\n", encoding="utf-8")
+        with step("evidencia"):
+            # Evidencia visual
+            png_path = shots.capture(driver, png_path)
 
-    print("OK: texto extraído de New Window")
-    print("TEXTO:", text)
-    print("EVIDENCIAS:")
-    print(" -", TXT_PATH)
-    print(" -", PNG_PATH)
+        # Exportar texto a .txt (UTF-8)
+        txt_path.write_text(text + "\n", encoding="utf-8")
+        register_artifact(txt_path)
 
-finally:
-    driver.quit()
+        print("OK: texto extraído de New Window")
+        print("TEXTO:", text)
+        print("EVIDENCIAS:")
+        print(" -", txt_path)
+        print(" -", png_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,57 +1,65 @@
 # src/12_notification_message.py
-from pathlib import Path
 from datetime import datetime
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import StaleElementReferenceException
 
-BASE_DIR = Path(__file__).resolve().parent.parent
-OUTPUTS_DIR = BASE_DIR / "outputs"
-OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
+from core.paths import outputs_dir
+from core.driver_pool import lease_driver
+from core.waits import EventWait
+from core import waits as EC
+from core.screenshots import evidence
+from core.site import site_url
+from core.events import step
 
-TS = datetime.now().strftime("%Y%m%d_%H%M%S")
 TASK = "012_notification_message"
-PNG_PATH = OUTPUTS_DIR / f"{TS}_{TASK}_success.png"
 
-URL = "https://the-internet.herokuapp.com/notification_message_rendered"
+# El mensaje es aleatorio ("Action unsuccesful" a veces): reintentar, pero no para siempre
+MAX_INTENTOS = 25
 
-opts = Options()
-opts.add_argument("--start-maximized")
+URL_PATH = "/notification_message_rendered"
 
-driver = webdriver.Chrome(options=opts)
-wait = WebDriverWait(driver, 20)
 
-try:
-    driver.get(URL)
+def main() -> None:
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    png_path = outputs_dir() / f"{ts}_{TASK}_success.png"
 
-    intentos = 0
-    while True:
-        intentos += 1
+    with lease_driver() as driver, evidence() as shots:
+        wait = EventWait(driver, 20)
 
-        # Re-encontrar el link en cada intento (evita stale tras refresh)
-        link = wait.until(EC.element_to_be_clickable((By.LINK_TEXT, "Click here")))
+        with step("abrir"):
+            driver.get(site_url(URL_PATH))
 
-        try:
-            link.click()
-        except StaleElementReferenceException:
-            # El DOM cambió justo al click; reintenta el ciclo
-            continue
+        intentos = 0
+        while True:
+            intentos += 1
+            if intentos > MAX_INTENTOS:
+                raise RuntimeError(f"Sin 'Action successful' tras {MAX_INTENTOS} intentos")
 
-        # Esperar a que exista el mensaje y leerlo
-        flash = wait.until(EC.presence_of_element_located((By.ID, "flash")))
-        msg = flash.text.strip()
+            with step("intento"):
+                # Re-encontrar el link en cada intento (evita stale tras refresh)
+                link = wait.until(EC.element_to_be_clickable((By.LINK_TEXT, "Click here")))
 
-        if "Action successful" in msg:
-            driver.save_screenshot(str(PNG_PATH))
-            print("OK: notificación exitosa")
-            print("INTENTOS:", intentos)
-            print("MENSAJE:", msg)
-            print("EVIDENCIA:", PNG_PATH)
-            break
+                try:
+                    link.click()
+                except StaleElementReferenceException:
+                    # El DOM cambió justo al click; reintenta el ciclo
+                    continue
 
-finally:
-    driver.quit()
+                # Esperar a que exista el mensaje y leerlo
+                flash = wait.until(EC.presence_of_element_located((By.ID, "flash")))
+                msg = flash.text.strip()
+
+            if "Action successful" in msg:
+                with step("evidencia"):
+                    # Solo el mensaje
+                    png_path = shots.capture(driver, png_path, element=flash)
+                print("OK: notificación exitosa")
+                print("INTENTOS:", intentos)
+                print("MENSAJE:", msg)
+                print("EVIDENCIA:", png_path)
+                break
+
+
+if __name__ == "__main__":
+    main()
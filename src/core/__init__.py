@@ -0,0 +1,6 @@
+"""
+Utilidades compartidas por main.py y los escenarios de src/.
+
+Los scripts NN_*.py se ejecutan con src/ en sys.path, así que importan
+directamente `from core.paths import ...`.
+"""
@@ -0,0 +1,247 @@
+"""
+Operaciones de WebDriver agrupadas en un solo execute_script.
+
+Cada is_selected(), click(), clear(), send_keys() o .text es un viaje a
+chromedriver; con una conexión lenta (o remota) eso domina el tiempo de un
+paso. Batch junta operaciones de buscar/leer/actuar y las corre de una vez
+dentro de la página, con resultados estructurados:
+
+    b = Batch(driver)
+    links = b.find_all((By.CSS_SELECTOR, "#content a"))
+    names = b.text(links)
+    b.run()                       # un solo round trip
+    names.value                   # ['a.txt', 'b.zip', ...]
+    links.value[0]                # WebElement
+
+Las acciones en JS generan eventos sintéticos (click(), input/change). Si la
+página necesita eventos reales de usuario (teclado, click confiable), se
+pide native=True: esa operación se hace con el comando normal de WebDriver
+y el batch se parte en tramos antes y después de ella.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+from selenium.common.exceptions import JavascriptException, NoSuchElementException
+from selenium.webdriver.remote.webelement import WebElement
+
+from core.waits import _normalize
+
+
+# arguments: ops, prev (resultados de tramos anteriores). Devuelve los resultados de este tramo.
+_BATCH_JS = r"""
+const [ops, prev] = arguments;
+const out = prev.slice();
+
+function resolve(r) {
+  if (r === null || r === undefined) return null;
+  if (r.el !== undefined) return r.el;
+  let v = out[r.ref];
+  if (r.k !== null && r.k !== undefined) v = v ? v[r.k] : undefined;
+  return v;
+}
+function each(x, f) { return Array.isArray(x) ? x.map(f) : (x ? f(x) : null); }
+function need(el, op) {
+  if (!el) throw new Error("no such element: " + op.op);
+  return el;
+}
+function find(using, value, root, all) {
+  const base = root || document;
+  let els;
+  switch (using) {
+    case "css selector": els = Array.from(base.querySelectorAll(value)); break;
+    case "xpath": {
+      const snap = document.evaluate(value, base, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+      els = [];
+      for (let i = 0; i < snap.snapshotLength; i++) els.push(snap.snapshotItem(i));
+      break;
+    }
+    case "link text":
+      els = Array.from(base.querySelectorAll("a")).filter(a => (a.innerText || "").trim() === value); break;
+    case "partial link text":
+      els = Array.from(base.querySelectorAll("a")).filter(a => (a.innerText || "").includes(value)); break;
+    case "tag name": els = Array.from(base.getElementsByTagName(value)); break;
+    default: throw new Error("locator no soportado: " + using);
+  }
+  return all ? els : (els[0] || null);
+}
+function fire(el, type) { el.dispatchEvent(new Event(type, {bubbles: true})); }
+
+for (const op of ops) {
+  let v = null;
+  try {
+    switch (op.op) {
+      case "find": {
+        v = find(op.using, op.value, resolve(op.root), op.all);
+        if (!op.all && !v) throw new Error("no such element: " + op.using + "=" + op.value);
+        break;
+      }
+      case "text": v = each(resolve(op.target), el => (el.innerText || "")); break;
+      case "attr": v = each(resolve(op.target), el => el.getAttribute(op.name)); break;
+      case "prop": v = each(resolve(op.target), el => el[op.name]); break;
+      case "click": { const el = need(resolve(op.target), op); el.click(); v = true; break; }
+      case "set_checked": {
+        const el = need(resolve(op.target), op);
+        if (el.checked !== op.value) el.click();
+        v = el.checked;
+        break;
+      }
+      case "set_value": {
+        const el = need(resolve(op.target), op);
+        el.focus();
+        el.value = op.value;
+        fire(el, "input");
+        fire(el, "change");
+        v = el.value;
+        break;
+      }
+      default: throw new Error("operación desconocida: " + op.op);
+    }
+  } catch (e) {
+    // Cortar aquí: las acciones que siguen (p. ej. un submit) no deben correr
+    out.push({__batch_error: String(e && e.message || e), index: out.length});
+    break;
+  }
+  out.push(v);
+}
+return out.slice(prev.length);
+"""
+
+
+class BatchError(JavascriptException):
+    pass
+
+
+@dataclass
+class Ref:
+    """Resultado (futuro) de una operación; `value` queda disponible después de run()."""
+    batch: "Batch"
+    index: int
+    key: int | None = None
+
+    def __getitem__(self, key: int) -> "Ref":
+        return Ref(self.batch, self.index, key)
+
+    @property
+    def value(self) -> Any:
+        if self.batch.results is None:
+            raise RuntimeError("Batch.run() todavía no se ejecutó")
+        v = self.batch.results[self.index]
+        return v[self.key] if self.key is not None else v
+
+    def as_arg(self) -> dict:
+        return {"ref": self.index, "k": self.key}
+
+
+Target = "Ref | WebElement"
+
+
+def _target(t: Target | None) -> dict | None:
+    if t is None:
+        return None
+    return t.as_arg() if isinstance(t, Ref) else {"el": t}
+
+
+class Batch:
+    def __init__(self, driver) -> None:
+        self.driver = driver
+        self.ops: list[dict] = []
+        self.results: list[Any] | None = None
+
+    def _add(self, op: dict) -> Ref:
+        self.ops.append(op)
+        return Ref(self, len(self.ops) - 1)
+
+    # ---------- localizar ----------
+    def find(self, locator: tuple[str, str], root: Target | None = None) -> Ref:
+        """Como find_element: si no existe, run() lanza NoSuchElementException."""
+        using, value = _normalize(locator)
+        return self._add({"op": "find", "using": using, "value": value, "root": _target(root), "all": False})
+
+    def find_all(self, locator: tuple[str, str], root: Target | None = None) -> Ref:
+        using, value = _normalize(locator)
+        return self._add({"op": "find", "using": using, "value": value, "root": _target(root), "all": True})
+
+    # ---------- leer (elemento o lista de elementos) ----------
+    def text(self, target: Target) -> Ref:
+        """innerText (≈ WebElement.text, que también es el texto visible)."""
+        return self._add({"op": "text", "target": _target(target)})
+
+    def attr(self, target: Target, name: str) -> Ref:
+        return self._add({"op": "attr", "target": _target(target), "name": name})
+
+    def prop(self, target: Target, name: str) -> Ref:
+        """Propiedad DOM: "checked" (≈ is_selected), "value", "disabled"..."""
+        return self._add({"op": "prop", "target": _target(target), "name": name})
+
+    # ---------- actuar ----------
+    def click(self, target: Target, native: bool = False) -> Ref:
+        return self._add({"op": "click", "target": _target(target), "native": native})
+
+    def set_checked(self, target: Target, checked: bool, native: bool = False) -> Ref:
+        """Marca/desmarca haciendo click solo si hace falta. Resultado: estado final."""
+        return self._add({"op": "set_checked", "target": _target(target), "value": checked, "native": native})
+
+    def set_value(self, target: Target, text: str, native: bool = False) -> Ref:
+        """
+        Reemplaza el valor (≈ clear() + send_keys()). En JS dispara input/change;
+        con native=True escribe tecla por tecla como un usuario.
+        """
+        return self._add({"op": "set_value", "target": _target(target), "value": text, "native": native})
+
+    # ---------- ejecutar ----------
+    def run(self) -> list[Any]:
+        """
+        Ejecuta todo: un execute_script por cada tramo entre operaciones nativas.
+        Lanza NoSuchElementException / BatchError en la primera operación que falle.
+        """
+        results: list[Any] = []
+        segment: list[dict] = []
+        for op in self.ops:
+            if op.get("native"):
+                results.extend(self._run_js(segment, results))
+                segment = []
+                results.append(self._run_native(op, results))
+            else:
+                segment.append(op)
+        results.extend(self._run_js(segment, results))
+        self.results = results
+        return results
+
+    def _run_js(self, ops: list[dict], prev: list[Any]) -> list[Any]:
+        if not ops:
+            return []
+        out = self.driver.execute_script(_BATCH_JS, ops, prev)
+        for v in out:
+            if isinstance(v, dict) and "__batch_error" in v:
+                msg = v["__batch_error"]
+                if msg.startswith("no such element"):
+                    raise NoSuchElementException(f"batch op {v['index']}: {msg}")
+                raise BatchError(f"batch op {v['index']}: {msg}")
+        return out
+
+    def _run_native(self, op: dict, prev: list[Any]) -> Any:
+        target = op["target"]
+        if "el" in target:
+            el = target["el"]
+        else:
+            el = prev[target["ref"]]
+            if target["k"] is not None:
+                el = el[target["k"]]
+        if el is None:
+            raise NoSuchElementException(f"batch op {len(prev)}: {op['op']} sin elemento")
+        if op["op"] == "click":
+            el.click()
+            return True
+        if op["op"] == "set_checked":
+            if el.is_selected() != op["value"]:
+                el.click()
+            # El estado real tras el click (como v = el.checked en JS), no el pedido
+            return el.is_selected()
+        if op["op"] == "set_value":
+            el.clear()
+            el.send_keys(op["value"])
+            return op["value"]
+        raise BatchError(f"{op['op']} no tiene versión nativa")
+
@@ -0,0 +1,186 @@
+"""
+Caché de resultados por contenido para corridas incrementales.
+
+main.py --incremental no vuelve a correr un escenario si nada de lo que
+usa cambió desde su última corrida en verde: copia a la corrida actual lo
+que dejó aquella (manifest.jsonl, screenshots, descargas, hojas de
+resultados) y lo marca como OK (caché).
+
+La clave es un sha256 de:
+- el código del script y de src/core/,
+- CHROME_VERSION.txt,
+- los archivos de config/ (credentials.yml, datasets, timeouts, ...),
+- el URL base del sitio y las variables de entorno que cambian el
+  comportamiento de los escenarios (perfil, modo de descarga, formato de
+  screenshots, ...).
+
+Cada entrada vive en outputs/cache/<clave>/ (entry.json + files/) y vence
+a las CACHE_TTL_HOURS horas (default 24): pasado ese tiempo el escenario
+corre igual aunque nada haya cambiado. Los archivos se copian con hard
+links cuando se puede, así restaurar no duplica los bytes.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from core.contexts import CONTEXTS_ENV
+from core.http_download import DOWNLOAD_ALL_ENV, DOWNLOAD_MODE_ENV
+from core.paths import BASE_DIR
+from core.profiles import PROFILE_ENV
+from core.screenshots import FORMAT_ENV, MAX_WIDTH_ENV, QUALITY_ENV
+from core.site import base_url
+from core.tracing import TRACE_NAME
+
+
+CACHE_DIR = BASE_DIR / "outputs" / "cache"
+TTL_ENV = "CACHE_TTL_HOURS"
+DEFAULT_TTL_HOURS = 24.0
+
+ENTRY_NAME = "entry.json"
+FILES_DIR = "files"
+
+CORE_DIR = BASE_DIR / "src" / "core"
+CONFIG_DIR = BASE_DIR / "config"
+CHROME_VERSION_FILE = BASE_DIR / "CHROME_VERSION.txt"
+
+# No se guardan: la traza de comandos es de aquella corrida, no de esta
+NOT_CACHED = (TRACE_NAME,)
+
+# Entorno que cambia lo que hace o lo que deja un escenario
+KEY_ENV_VARS = (PROFILE_ENV, DOWNLOAD_MODE_ENV, DOWNLOAD_ALL_ENV, CONTEXTS_ENV, FORMAT_ENV, QUALITY_ENV,
+                MAX_WIDTH_ENV, "CHROME_BIN", "CHROMEDRIVER_BIN")
+
+
+def ttl_hours() -> float:
+    return float(os.getenv(TTL_ENV) or DEFAULT_TTL_HOURS)
+
+
+def _hash_files(h: "hashlib._Hash", root: Path, files: list[Path]) -> None:
+    for p in files:
+        h.update(p.relative_to(root).as_posix().encode() + b"\0")
+        h.update(hashlib.sha256(p.read_bytes()).digest())
+
+
+def _tree(folder: Path, pattern: str = "*") -> list[Path]:
+    if not folder.is_dir():
+        return []
+    return sorted(p for p in folder.rglob(pattern) if p.is_file() and "__pycache__" not in p.parts)
+
+
+def shared_inputs_digest() -> str:
+    """Lo que comparten todos los escenarios: src/core, Chrome, config/, URL base y entorno."""
+    h = hashlib.sha256()
+    _hash_files(h, BASE_DIR, _tree(CORE_DIR, "*.py"))
+    _hash_files(h, BASE_DIR, [p for p in [CHROME_VERSION_FILE] if p.is_file()])
+    _hash_files(h, BASE_DIR, _tree(CONFIG_DIR))
+    h.update(base_url().encode() + b"\0")
+    for name in KEY_ENV_VARS:
+        h.update(f"{name}={os.getenv(name, '')}\0".encode())
+    return h.hexdigest()
+
+
+def scenario_key(script_path: Path, shared: str | None = None) -> str:
+    h = hashlib.sha256()
+    h.update(Path(script_path).name.encode() + b"\0")
+    h.update(hashlib.sha256(Path(script_path).read_bytes()).digest())
+    h.update((shared or shared_inputs_digest()).encode())
+    return h.hexdigest()
+
+
+def _link_or_copy(src: str, dst: str) -> str:
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+    return dst
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    scenario: str
+    created: float
+    run_dir: str  # carpeta de la corrida que la generó
+    path: Path
+
+    @property
+    def age_hours(self) -> float:
+        return (time.time() - self.created) / 3600
+
+    def describe(self) -> str:
+        return f"{self.scenario}: de {Path(self.run_dir).name} (hace {self.age_hours:.1f} h)"
+
+    def restore(self, output_dir: Path) -> None:
+        """Copia (hard links) los artefactos guardados a la carpeta del escenario en esta corrida."""
+        shutil.copytree(self.path / FILES_DIR, output_dir, copy_function=_link_or_copy, dirs_exist_ok=True)
+
+
+class ResultCache:
+    def __init__(self, root: Path = CACHE_DIR, ttl: float | None = None) -> None:
+        """ttl en horas (default: CACHE_TTL_HOURS)."""
+        self.root = root
+        self.ttl = (ttl if ttl is not None else ttl_hours()) * 3600
+
+    def _read(self, folder: Path) -> CacheEntry | None:
+        try:
+            data = json.loads((folder / ENTRY_NAME).read_text(encoding="utf-8"))
+            return CacheEntry(data["key"], data["scenario"], data["created"], data["run_dir"], folder)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def lookup(self, key: str) -> CacheEntry | None:
+        """Entrada vigente para `key` (None si no hay o ya venció)."""
+        entry = self._read(self.root / key)
+        if entry is None or time.time() - entry.created > self.ttl:
+            return None
+        return entry
+
+    def store(self, key: str, scenario: str, output_dir: Path, run_dir: Path) -> CacheEntry:
+        """
+        Guarda lo que dejó un escenario en verde. Reemplaza las entradas
+        anteriores del mismo escenario (otra versión del código o de config).
+        """
+        folder = self.root / key
+        tmp = self.root / f".{key}.part"
+        shutil.rmtree(tmp, ignore_errors=True)
+        shutil.copytree(output_dir, tmp / FILES_DIR, copy_function=_link_or_copy,
+                        ignore=shutil.ignore_patterns(*NOT_CACHED))
+        created = time.time()
+        (tmp / ENTRY_NAME).write_text(json.dumps({
+            "key": key, "scenario": scenario, "created": round(created, 3), "run_dir": str(run_dir),
+        }, indent=1), encoding="utf-8")
+        shutil.rmtree(folder, ignore_errors=True)
+        os.replace(tmp, folder)
+
+        for other in self.entries():
+            if other.scenario == scenario and other.key != key:
+                shutil.rmtree(other.path, ignore_errors=True)
+        return CacheEntry(key, scenario, created, str(run_dir), folder)
+
+    def entries(self) -> list[CacheEntry]:
+        if not self.root.is_dir():
+            return []
+        found = (self._read(p) for p in self.root.iterdir() if p.is_dir() and not p.name.startswith("."))
+        return [e for e in found if e is not None]
+
+    def prune(self) -> int:
+        """Borra las entradas vencidas (y restos de escrituras cortadas). Retorna cuántas."""
+        removed = 0
+        if not self.root.is_dir():
+            return removed
+        now = time.time()
+        for p in self.root.iterdir():
+            entry = self._read(p) if p.is_dir() else None
+            if entry is None or now - entry.created > self.ttl:
+                if p.is_dir():
+                    shutil.rmtree(p, ignore_errors=True)
+                else:
+                    p.unlink(missing_ok=True)
+                removed += 1
+        return removed
@@ -0,0 +1,127 @@
+"""
+Contextos de navegador aislados (como ventanas de incógnito) en un solo Chrome.
+
+reset_session() limpia cookies y storage a mano, pero solo lo que conoce;
+aislar de verdad significaba lanzar otro Chrome. Con CDP se crea un
+contexto nuevo (Target.createBrowserContext) en milisegundos: cookies,
+storage, caché y credenciales propias, y al cerrarlo se descarta entero
+con todas sus pestañas:
+
+    with isolated_context(driver) as ctx:
+        driver.get(...)               # la sesión ya trabaja en la pestaña del contexto
+    # contexto cerrado: el login / Basic Auth no pasan al siguiente
+
+lease_driver() lo hace con cada escenario si BROWSER_CONTEXTS=1 (main.py
+--contexts). Un escenario también puede abrir uno por caso de prueba, o
+varias pestañas aisladas a la vez con new_context_tab() (core.fanout).
+"""
+from __future__ import annotations
+
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+from selenium.common.exceptions import WebDriverException
+
+from core import events, tracing
+from core.driver_pool import driver_profile, set_download_dir, set_extra_headers
+from core.profiles import get_profile
+
+
+CONTEXTS_ENV = "BROWSER_CONTEXTS"
+
+
+def contexts_enabled() -> bool:
+    return (os.getenv(CONTEXTS_ENV) or "").strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass
+class BrowserContext:
+    id: str
+    target_id: str
+    duration: float = 0.0  # lo que tardó en abrirse (s)
+
+
+def new_context_tab(driver, url: str = "about:blank") -> BrowserContext:
+    """
+    Contexto nuevo con una pestaña en `url`, sin cambiar la ventana actual de la sesión.
+    En chromedriver el handle de una ventana es el id de su target: ctx.target_id
+    sirve para driver.switch_to.window().
+    """
+    start = time.time()
+    t0 = time.perf_counter()
+    ctx_id = driver.execute_cdp_cmd("Target.createBrowserContext", {})["browserContextId"]
+    try:
+        target = driver.execute_cdp_cmd("Target.createTarget", {"url": url, "browserContextId": ctx_id})["targetId"]
+    except WebDriverException:
+        driver.execute_cdp_cmd("Target.disposeBrowserContext", {"browserContextId": ctx_id})
+        raise
+    ctx = BrowserContext(ctx_id, target, time.perf_counter() - t0)
+    tracing.add_span("createBrowserContext", "command", start, ctx.duration, context=ctx_id)
+    events.emit("browser_context", action="open", context=ctx_id, duration=round(ctx.duration, 6))
+    return ctx
+
+
+def prepare_tab(driver) -> None:
+    """
+    Lo que el perfil configura por CDP (Network.setBlockedURLs, ...) vale solo
+    para la pestaña donde se mandó: hay que repetirlo en cada pestaña nueva.
+    """
+    get_profile(driver_profile(driver) or None).prepare(driver)
+
+
+def dispose_context(driver, ctx: BrowserContext) -> None:
+    """Descarta el contexto con todas sus pestañas (la sesión no puede estar parada en una de ellas)."""
+    start = time.time()
+    t0 = time.perf_counter()
+    driver.execute_cdp_cmd("Target.disposeBrowserContext", {"browserContextId": ctx.id})
+    duration = time.perf_counter() - t0
+    tracing.add_span("disposeBrowserContext", "command", start, duration, context=ctx.id)
+    events.emit("browser_context", action="close", context=ctx.id, duration=round(duration, 6))
+
+
+def open_context(driver, download_dir: Path | None = None) -> BrowserContext:
+    """
+    Crea un contexto con una pestaña en blanco y deja la sesión en esa pestaña.
+    Las demás pestañas se cierran: el escenario ve una sola ventana, como siempre.
+    """
+    ctx = new_context_tab(driver)
+    try:
+        for handle in driver.window_handles:
+            if handle != ctx.target_id:
+                driver.switch_to.window(handle)
+                driver.close()
+        driver.switch_to.window(ctx.target_id)
+        prepare_tab(driver)
+    except WebDriverException:
+        dispose_context(driver, ctx)
+        raise
+    driver.wd_browser_context = ctx.id
+    if download_dir is not None:
+        set_download_dir(driver, download_dir)
+    return ctx
+
+
+def close_context(driver, ctx: BrowserContext) -> None:
+    """
+    Vuelve a una pestaña en blanco del contexto por defecto y descarta el
+    contexto (con sus pestañas, popups, cookies y storage).
+    """
+    home = driver.execute_cdp_cmd("Target.createTarget", {"url": "about:blank"})["targetId"]
+    driver.switch_to.window(home)
+    driver.wd_browser_context = None
+    dispose_context(driver, ctx)
+    # Los headers extra iban con la pestaña del contexto; que no queden anotados en el driver
+    set_extra_headers(driver, {})
+
+
+@contextmanager
+def isolated_context(driver, download_dir: Path | None = None) -> Iterator[BrowserContext]:
+    ctx = open_context(driver, download_dir)
+    try:
+        yield ctx
+    finally:
+        close_context(driver, ctx)
@@ -0,0 +1,374 @@
+"""
+Descargas terminadas por evento, no por polling del disco.
+
+`target.exists()` puede dar True con el archivo a medio escribir, y mirar
+.crdownload + stat() cada medio segundo llega tarde. DownloadWatcher se
+suscribe a los eventos de DevTools (Browser.downloadWillBegin /
+downloadProgress) y avisa apenas Chrome termina, con bytes y throughput:
+
+    with watch_downloads(driver, download_dir) as downloads:
+        link.click()
+        download = downloads.wait("some-file.txt", timeout=30)
+    download.path, download.total_bytes, download.throughput
+
+Modos, en orden de preferencia:
+- "cdp": conexión propia a DevTools (trio, como bidi_connection de selenium).
+  Chrome guarda la descarga con su guid (allowAndName) y al completar se
+  renombra al nombre sugerido: el nombre final nunca existe a medias.
+- "inotify" (Linux): avisa cuando Chrome renombra el .crdownload al nombre final.
+- "poll": existe, sin .crdownload y con el tamaño estable, cada FALLBACK_POLL.
+
+Hay que entrar al watcher antes del click (los eventos no se repiten).
+"""
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import struct
+import sys
+import threading
+import time
+import urllib.request
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+from urllib.parse import unquote, urlparse
+
+from selenium.common.exceptions import TimeoutException
+
+from core import events, tracing
+from core.driver_pool import browser_context_id, set_download_dir
+
+
+FALLBACK_POLL = 0.05
+
+# Cuánto esperar la conexión a DevTools antes de pasar al siguiente modo
+CDP_CONNECT_TIMEOUT = 5.0
+
+PARTIAL_SUFFIXES = (".crdownload", ".tmp", ".part")
+
+
+@dataclass
+class Download:
+    name: str
+    url: str = ""
+    guid: str = ""
+    path: Path | None = None
+    total_bytes: int = 0
+    received_bytes: int = 0
+    state: str = "inProgress"  # "inProgress" | "completed" | "canceled"
+    started: float = 0.0  # monotonic
+    finished: float = 0.0
+
+    @property
+    def done(self) -> bool:
+        return self.state != "inProgress"
+
+    @property
+    def duration(self) -> float:
+        return max((self.finished or time.monotonic()) - self.started, 0.0)
+
+    @property
+    def throughput(self) -> float:
+        """bytes/s recibidos hasta ahora (o en total, si terminó)."""
+        d = self.duration
+        return self.received_bytes / d if d > 0 else 0.0
+
+    def matches(self, name: str) -> bool:
+        return name in (self.name, unquote(Path(urlparse(self.url).path).name))
+
+    def describe(self) -> str:
+        return (f"{self.name}: {self.received_bytes / 1024:.1f} KB en {self.duration:.2f}s "
+                f"({self.throughput / 1_048_576:.2f} MB/s, {self.state})")
+
+
+class DownloadWatcher:
+    def __init__(self, driver, download_dir: Path, modes: tuple[str, ...] = ("cdp", "inotify", "poll"),
+                 report: Callable[[str], None] | None = None) -> None:
+        self.driver = driver
+        self.download_dir = Path(download_dir)
+        self.modes = modes
+        self.report = report
+        self.mode = ""
+        self._downloads: dict[str, Download] = {}
+        self._returned: set[str] = set()
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._snapshot: set[str] = set()
+        # cdp
+        self._trio_token = None
+        self._cancel_scope = None
+        # inotify
+        self._fd = -1
+
+    # ---------- ciclo de vida ----------
+    def __enter__(self) -> "DownloadWatcher":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def start(self) -> str:
+        self.download_dir.mkdir(parents=True, exist_ok=True)
+        self._snapshot = {p.name for p in self.download_dir.iterdir()}
+        for mode in self.modes:
+            try:
+                if mode == "cdp":
+                    self._start_cdp()
+                elif mode == "inotify":
+                    self._start_inotify()
+                self.mode = mode
+                break
+            except Exception as e:
+                if self.report:
+                    self.report(f"Descargas: modo {mode} no disponible ({type(e).__name__}: {e})")
+        else:
+            self.mode = "poll"
+        return self.mode
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self.mode == "cdp" and self._trio_token is not None:
+            # Chrome vuelve a guardar con el nombre normal y sin eventos
+            try:
+                set_download_dir(self.driver, self.download_dir)
+            except Exception:
+                pass
+            try:
+                import trio
+                trio.from_thread.run_sync(self._cancel_scope.cancel, trio_token=self._trio_token)
+            except Exception:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    # ---------- espera ----------
+    def wait(self, name: str | None = None, timeout: float = 60.0) -> Download:
+        """
+        Espera a que termine la descarga `name` (nombre sugerido o del URL; None:
+        la primera que no se haya devuelto antes). Lanza TimeoutException o, si
+        Chrome la cancela, RuntimeError.
+        """
+        start = time.time()
+        t0 = time.perf_counter()
+        deadline = time.monotonic() + timeout
+        ok = False
+        try:
+            while True:
+                with self._cond:
+                    if self.mode in ("inotify", "poll"):
+                        self._scan_disk()
+                    found = self._find(name)
+                    if found is not None and found.done:
+                        self._returned.add(found.guid or found.name)
+                        break
+                    if self.mode == "cdp" and not self._thread.is_alive():
+                        raise RuntimeError("Se cortó la conexión a DevTools esperando la descarga")
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        what = name or "una descarga"
+                        raise TimeoutException(f"{what} no terminó en {timeout}s ({self.mode})")
+                    self._cond.wait(min(remaining, FALLBACK_POLL) if self.mode == "poll" else remaining)
+            if found.state != "completed":
+                raise RuntimeError(f"Descarga cancelada: {found.name}")
+            ok = True
+        finally:
+            tracing.add_span(f"download({name or '*'})", "wait", start, time.perf_counter() - t0,
+                             mode=self.mode, ok=ok)
+        events.emit("download", name=found.name, bytes=found.total_bytes, duration=round(found.duration, 6),
+                    throughput=round(found.throughput), mode=self.mode)
+        return found
+
+    def progress(self) -> list[Download]:
+        with self._cond:
+            return list(self._downloads.values())
+
+    def _find(self, name: str | None) -> Download | None:
+        for key, d in self._downloads.items():
+            if key in self._returned:
+                continue
+            if name is None or d.matches(name):
+                return d
+        return None
+
+    def _update(self, key: str, **fields) -> Download:
+        with self._cond:
+            d = self._downloads.get(key)
+            if d is None:
+                d = self._downloads[key] = Download(name=fields.pop("name", key), started=time.monotonic())
+            for k, v in fields.items():
+                setattr(d, k, v)
+            if d.done and not d.finished:
+                d.finished = time.monotonic()
+            self._cond.notify_all()
+            return d
+
+    # ---------- cdp ----------
+    def _cdp_details(self) -> tuple[str, str]:
+        caps = self.driver.capabilities
+        address = (caps.get("goog:chromeOptions") or caps.get("ms:edgeOptions") or {}).get("debuggerAddress")
+        if not address:
+            raise RuntimeError("la sesión no expone debuggerAddress")
+        with urllib.request.urlopen(f"http://{address}/json/version", timeout=CDP_CONNECT_TIMEOUT) as r:
+            data = json.loads(r.read())
+        version = data["Browser"].split("/", 1)[1].split(".", 1)[0]
+        return version, data["webSocketDebuggerUrl"]
+
+    def _start_cdp(self) -> None:
+        import trio  # noqa: F401  (dependencia de selenium para CDP; si falta, se usa otro modo)
+        from selenium.webdriver.common.bidi import cdp
+
+        version, ws_url = self._cdp_details()
+        ready = threading.Event()
+        error: list[BaseException] = []
+
+        def run() -> None:
+            try:
+                trio.run(self._cdp_main, cdp, version, ws_url, ready)
+            except BaseException as e:  # noqa: BLE001 - se informa a start()
+                error.append(e)
+            finally:
+                ready.set()
+                # Si la conexión se cae, wait() no se queda esperando eventos que no van a llegar
+                with self._cond:
+                    self._cond.notify_all()
+
+        self._thread = threading.Thread(target=run, name="downloads-cdp", daemon=True)
+        self._thread.start()
+        if not ready.wait(CDP_CONNECT_TIMEOUT) or error:
+            self._stop.set()
+            raise error[0] if error else TimeoutError("sin respuesta de DevTools")
+
+    async def _cdp_main(self, cdp, version: str, ws_url: str, ready: threading.Event) -> None:
+        import trio
+
+        devtools = cdp.import_devtools(version)
+        self._trio_token = trio.lowlevel.current_trio_token()
+        with trio.CancelScope() as scope:
+            self._cancel_scope = scope
+            async with cdp.open_cdp(ws_url) as conn:
+                context = browser_context_id(self.driver)
+                await conn.execute(devtools.browser.set_download_behavior(
+                    behavior="allowAndName", download_path=str(self.download_dir), events_enabled=True,
+                    browser_context_id=devtools.browser.BrowserContextID(context) if context else None,
+                ))
+                ready.set()
+                listener = conn.listen(devtools.browser.DownloadWillBegin, devtools.browser.DownloadProgress,
+                                       buffer_size=256)
+                async for event in listener:
+                    if isinstance(event, devtools.browser.DownloadWillBegin):
+                        self._update(event.guid, name=event.suggested_filename, url=event.url, guid=event.guid)
+                    else:
+                        self._on_cdp_progress(event)
+
+    def _on_cdp_progress(self, event) -> None:
+        fields = {"total_bytes": int(event.total_bytes), "received_bytes": int(event.received_bytes)}
+        if event.state == "completed":
+            d = self._downloads.get(event.guid)
+            name = d.name if d is not None else event.guid
+            # allowAndName: el archivo se llama como el guid; se pasa al nombre sugerido ya completo
+            final = self.download_dir / name
+            try:
+                os.replace(self.download_dir / event.guid, final)
+            except OSError:
+                final = self.download_dir / event.guid
+            fields["path"] = final
+        self._update(event.guid, state=event.state, **fields)
+
+    # ---------- inotify ----------
+    _IN_MODIFY = 0x002
+    _IN_CLOSE_WRITE = 0x008
+    _IN_MOVED_TO = 0x080
+    _IN_CREATE = 0x100
+    _EVENT = struct.Struct("iIII")
+
+    def _start_inotify(self) -> None:
+        if not sys.platform.startswith("linux"):
+            raise RuntimeError("inotify solo existe en Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        fd = libc.inotify_init1(os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        mask = self._IN_MODIFY | self._IN_CLOSE_WRITE | self._IN_MOVED_TO | self._IN_CREATE
+        if libc.inotify_add_watch(fd, os.fsencode(self.download_dir), mask) < 0:
+            err = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(err, "inotify_add_watch")
+        self._fd = fd
+        self._thread = threading.Thread(target=self._inotify_loop, name="downloads-inotify", daemon=True)
+        self._thread.start()
+
+    def _inotify_loop(self) -> None:
+        while not self._stop.is_set():
+            readable, _, _ = select.select([self._fd], [], [], 0.2)
+            if not readable:
+                continue
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except OSError:
+                return
+            pos = 0
+            while pos + self._EVENT.size <= len(data):
+                _, mask, _, length = self._EVENT.unpack_from(data, pos)
+                pos += self._EVENT.size
+                name = data[pos:pos + length].rstrip(b"\0").decode(errors="replace")
+                pos += length
+                if name:
+                    self._on_fs_event(name, mask)
+
+    def _on_fs_event(self, name: str, mask: int) -> None:
+        partial = next((s for s in PARTIAL_SUFFIXES if name.endswith(s)), None)
+        if partial:
+            final = name[: -len(partial)]
+            try:
+                received = (self.download_dir / name).stat().st_size
+            except OSError:
+                return
+            self._update(final, received_bytes=received)
+        elif mask & (self._IN_MOVED_TO | self._IN_CLOSE_WRITE):
+            self._complete_on_disk(name)
+
+    # ---------- disco (inotify y poll) ----------
+    def _complete_on_disk(self, name: str) -> bool:
+        path = self.download_dir / name
+        if name.startswith(".") or any(path.with_name(name + s).exists() for s in PARTIAL_SUFFIXES):
+            return False
+        try:
+            size = path.stat().st_size
+        except OSError:
+            return False
+        self._update(name, path=path, total_bytes=size, received_bytes=size, state="completed")
+        return True
+
+    def _scan_disk(self) -> None:
+        """Archivos nuevos desde start(); en modo poll, completos si el tamaño no cambia entre dos lecturas."""
+        for p in self.download_dir.iterdir():
+            name = p.name
+            if name in self._snapshot or name.endswith(PARTIAL_SUFFIXES):
+                continue
+            d = self._downloads.get(name)
+            if d is not None and d.done:
+                continue
+            if self.mode == "inotify":
+                self._complete_on_disk(name)
+                continue
+            try:
+                size = p.stat().st_size
+            except OSError:
+                continue
+            if d is not None and d.received_bytes == size and size > 0:
+                self._complete_on_disk(name)
+            else:
+                self._update(name, received_bytes=size)
+
+
+def watch_downloads(driver, download_dir: Path, **kwargs) -> DownloadWatcher:
+    return DownloadWatcher(driver, download_dir, **kwargs)
@@ -0,0 +1,503 @@
+"""
+Pool de sesiones de Chrome ya lanzadas.
+
+Lanzar Chrome + chromedriver cuesta 1-3 s por escenario. El pool mantiene
+N sesiones vivas: un escenario toma una (lease), la usa y la devuelve. Al
+devolverla se limpian cookies, storage, headers extra, ventanas y la
+carpeta de descargas, así el siguiente escenario la recibe "como nueva".
+
+Uso desde un escenario:
+
+    with lease_driver(download_dir=DOWNLOADS_DIR, profile="throughput") as driver:
+        driver.get(...)
+
+Las sesiones del pool son de un perfil (core.profiles): un préstamo recibe
+una libre de su perfil, o se lanza una nueva (cerrando una libre de otro
+perfil si el pool está lleno). Si todas están prestadas, el préstamo espera
+hasta DRIVER_ACQUIRE_TIMEOUT segundos (default 600) y después falla.
+
+- Script suelto (python src/NN.py): pool local de 1 sesión, se cierra al salir.
+- Desde main.py: main.py es dueño del pool y le pasa al subproceso la sesión
+  por DRIVER_SESSION; el script se conecta a ella sin lanzar otro Chrome.
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterator
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.remote_connection import ChromeRemoteConnection
+from selenium.webdriver.chrome.service import Service
+
+from core import events
+from core.profiles import Profile, get_profile
+from core.tracing import TRACE_FILE_ENV, current_trace, instrument, tracing
+
+
+# Variable de entorno con la sesión prestada por main.py (JSON url/session_id)
+SESSION_ENV = "DRIVER_SESSION"
+
+# Segundos que acquire() espera una sesión libre con el pool lleno antes de rendirse
+ACQUIRE_TIMEOUT_ENV = "DRIVER_ACQUIRE_TIMEOUT"
+DEFAULT_ACQUIRE_TIMEOUT = 600.0
+
+
+def acquire_timeout() -> float:
+    return float(os.getenv(ACQUIRE_TIMEOUT_ENV) or DEFAULT_ACQUIRE_TIMEOUT)
+
+
+def default_options(profile: Profile | None = None) -> Options:
+    """Opciones de Chrome del perfil (por defecto, el de BROWSER_PROFILE o "evidence")."""
+    return (profile or get_profile()).options()
+
+
+def launch_driver(options: Options | None = None) -> webdriver.Chrome:
+    service = Service(os.environ["CHROMEDRIVER_BIN"]) if os.getenv("CHROMEDRIVER_BIN") else Service()
+    return webdriver.Chrome(service=service, options=options or default_options())
+
+
+def driver_profile(driver: webdriver.Remote) -> str:
+    return getattr(driver, "wd_profile", "")
+
+
+@dataclass
+class LeaseTimings:
+    """Tiempos (segundos) de un préstamo. launch > 0 solo si hubo que lanzar Chrome."""
+    launch: float = 0.0
+    lease: float = 0.0
+    reset: float = 0.0
+    discarded: bool = False
+    profile: str = ""
+
+    def describe(self) -> str:
+        txt = f"{self.profile}: " if self.profile else ""
+        txt += f"launch={self.launch:.2f}s lease={self.lease:.2f}s reset={self.reset:.2f}s"
+        return txt + (" (sesión descartada)" if self.discarded else "")
+
+
+@dataclass
+class PoolStats:
+    launches: list[float] = field(default_factory=list)
+    leases: list[LeaseTimings] = field(default_factory=list)
+
+    def summary(self) -> str:
+        n = len(self.leases)
+        if not n:
+            return "pool sin préstamos"
+        total_launch = sum(self.launches)
+        total_lease = sum(t.lease for t in self.leases)
+        total_reset = sum(t.reset for t in self.leases)
+        return (
+            f"{n} préstamos, {len(self.launches)} lanzamientos de Chrome "
+            f"(launch total={total_launch:.2f}s, lease total={total_lease:.2f}s, "
+            f"reset total={total_reset:.2f}s)"
+        )
+
+
+def reset_session(driver: webdriver.Remote) -> None:
+    """
+    Deja la sesión limpia para el siguiente escenario.
+    Lanza WebDriverException si la sesión ya no responde.
+    """
+    # Alertas abiertas bloquean cualquier otro comando
+    try:
+        driver.switch_to.alert.dismiss()
+    except WebDriverException:
+        pass
+
+    # Cerrar ventanas extra y quedarse con la primera
+    handles = driver.window_handles
+    for h in handles[1:]:
+        driver.switch_to.window(h)
+        driver.close()
+    driver.switch_to.window(handles[0])
+    driver.switch_to.default_content()
+
+    # Storage del origen actual (antes de salir de la página)
+    try:
+        driver.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+        origin = driver.execute_script("return location.origin")
+        if origin and origin != "null":
+            driver.execute_cdp_cmd("Storage.clearDataForOrigin", {
+                "origin": origin,
+                "storageTypes": "local_storage,session_storage,indexeddb,websql,cache_storage,service_workers",
+            })
+    except WebDriverException:
+        pass
+
+    driver.get("about:blank")
+
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    set_extra_headers(driver, {})
+    driver.execute_cdp_cmd("Browser.setDownloadBehavior", {"behavior": "default"})
+
+
+def set_download_dir(driver: webdriver.Remote, download_dir: Path) -> None:
+    download_dir.mkdir(parents=True, exist_ok=True)
+    params = {"behavior": "allow", "downloadPath": str(download_dir)}
+    if browser_context_id(driver):
+        params["browserContextId"] = browser_context_id(driver)
+    driver.execute_cdp_cmd("Browser.setDownloadBehavior", params)
+
+
+def browser_context_id(driver: webdriver.Remote) -> str | None:
+    """Contexto aislado en el que trabaja la sesión (core.contexts), o None si es el de siempre."""
+    return getattr(driver, "wd_browser_context", None)
+
+
+def set_extra_headers(driver: webdriver.Remote, headers: dict[str, str]) -> None:
+    """
+    Headers que Chrome agrega a todas las requests (p. ej. Basic Auth sin popup).
+    Se recuerdan en el driver porque Chrome no permite leerlos de vuelta
+    (los usa http_download para pedir archivos con la misma sesión).
+    """
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setExtraHTTPHeaders", {"headers": headers})
+    driver.wd_extra_headers = dict(headers)
+
+
+def extra_headers(driver: webdriver.Remote) -> dict[str, str]:
+    return dict(getattr(driver, "wd_extra_headers", {}))
+
+
+class DriverPool:
+    """
+    Hasta `size` sesiones de Chrome vivas. Thread-safe: varios hilos pueden
+    pedir sesiones a la vez (main.py con --jobs).
+    Con reuse=False cada sesión se cierra al devolverla (un Chrome por escenario).
+    `size` cuenta las sesiones de todos los perfiles juntas.
+    """
+
+    def __init__(self, size: int = 1, options_factory: Callable[[Profile], Options] = default_options,
+                 report: Callable[[str], None] | None = print, reuse: bool = True) -> None:
+        if size < 1:
+            raise ValueError("El pool necesita al menos 1 sesión")
+        self.size = size
+        self.reuse = reuse
+        self.options_factory = options_factory
+        self.report = report
+        self.stats = PoolStats()
+        # Sesiones libres por perfil; _cond avisa cuando se libera una sesión o un cupo
+        self._idle: dict[str, list[webdriver.Chrome]] = defaultdict(list)
+        self._all: list[webdriver.Chrome] = []
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._pending = 0
+        self._closed = False
+
+    def _launch(self, profile: Profile) -> webdriver.Chrome:
+        """Lanza una sesión para un cupo ya reservado en _pending."""
+        t0 = time.perf_counter()
+        try:
+            driver = launch_driver(self.options_factory(profile))
+            driver.wd_profile = profile.name
+            profile.prepare(driver)
+        except Exception:
+            with self._cond:
+                self._pending -= 1
+                self._cond.notify_all()
+            raise
+        elapsed = time.perf_counter() - t0
+        with self._lock:
+            self._pending -= 1
+            self.stats.launches.append(elapsed)
+            self._all.append(driver)
+        self._report(f"Chrome ({profile.name}) lanzado en {elapsed:.2f}s")
+        events.emit("driver_launch", duration=round(elapsed, 6), profile=profile.name)
+        return driver
+
+    def _reserve(self) -> bool:
+        """Reserva un cupo para lanzar una sesión nueva (llamar con _lock tomado)."""
+        if len(self._all) + self._pending < self.size:
+            self._pending += 1
+            return True
+        return False
+
+    def _report(self, msg: str) -> None:
+        if self.report:
+            self.report(f"[pool] {msg}")
+
+    def warm(self, profile: str | None = None) -> None:
+        """Lanza en paralelo (con el perfil `profile`) las sesiones que falten hasta llegar a `size`."""
+        prof = get_profile(profile)
+        with self._lock:
+            missing = 0
+            while self._reserve():
+                missing += 1
+        errors: list[Exception] = []
+
+        def _one() -> None:
+            try:
+                driver = self._launch(prof)
+            except Exception as e:
+                errors.append(e)
+            else:
+                self._put_idle(driver)
+
+        threads = [threading.Thread(target=_one) for _ in range(missing)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        if errors:
+            raise errors[0]
+
+    def _put_idle(self, driver: webdriver.Chrome) -> None:
+        with self._cond:
+            self._idle[driver_profile(driver)].append(driver)
+            self._cond.notify_all()
+
+    def acquire(self, download_dir: Path | None = None,
+                profile: str | None = None) -> tuple[webdriver.Chrome, LeaseTimings]:
+        if self._closed:
+            raise RuntimeError("El pool ya fue cerrado")
+        prof = get_profile(profile)
+        timings = LeaseTimings(profile=prof.name)
+        t0 = time.perf_counter()
+
+        driver = evicted = None
+        must_launch = False
+        deadline = time.monotonic() + acquire_timeout()
+        with self._cond:
+            while True:
+                idle = self._idle[prof.name]
+                if idle:
+                    driver = idle.pop()
+                    break
+                if self._reserve():
+                    must_launch = True
+                    break
+                # Pool lleno: una sesión libre de otro perfil se cierra y su cupo se usa para este
+                others = next((lst for lst in self._idle.values() if lst), None)
+                if others:
+                    evicted = others.pop(0)
+                    self._all.remove(evicted)
+                    self._pending += 1
+                    must_launch = True
+                    break
+                # Todas las sesiones están prestadas: esperar a que vuelva una
+                if self._closed:
+                    raise RuntimeError("El pool ya fue cerrado")
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(
+                        f"Sin sesión libre del pool tras {acquire_timeout():g}s "
+                        f"({len(self._all)} prestadas, perfil {prof.name})")
+                self._cond.wait(remaining)
+        if evicted is not None:
+            self._report(f"Chrome ({driver_profile(evicted)}) cerrado para lanzar uno {prof.name}")
+            try:
+                evicted.quit()
+            except Exception:
+                pass
+        if must_launch:
+            t_launch = time.perf_counter()
+            driver = self._launch(prof)
+            timings.launch = time.perf_counter() - t_launch
+
+        try:
+            if download_dir is not None:
+                set_download_dir(driver, download_dir)
+        except Exception:
+            self.discard(driver)
+            raise
+        timings.lease = time.perf_counter() - t0 - timings.launch
+        return driver, timings
+
+    def release(self, driver: webdriver.Chrome, timings: LeaseTimings) -> None:
+        t0 = time.perf_counter()
+        if not self.reuse:
+            self.discard(driver)
+        else:
+            try:
+                reset_session(driver)
+                get_profile(driver_profile(driver)).prepare(driver)
+            except Exception:
+                # Sesión rota (Chrome caído, chromedriver muerto por el watchdog -> MaxRetryError
+                # de urllib3, timeout...): se descarta y se lanza otra cuando haga falta
+                timings.discarded = True
+                self.discard(driver)
+            else:
+                self._put_idle(driver)
+            timings.reset = time.perf_counter() - t0
+        with self._lock:
+            self.stats.leases.append(timings)
+        self._report(timings.describe())
+        events.emit("driver_lease", launch=round(timings.launch, 6), lease=round(timings.lease, 6),
+                    reset=round(timings.reset, 6), discarded=timings.discarded, profile=timings.profile)
+
+    def discard(self, driver: webdriver.Chrome) -> None:
+        with self._cond:
+            if driver in self._all:
+                self._all.remove(driver)
+            self._cond.notify_all()
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    @contextmanager
+    def lease(self, download_dir: Path | None = None, profile: str | None = None) -> Iterator[webdriver.Chrome]:
+        driver, timings = self.acquire(download_dir, profile)
+        try:
+            yield driver
+        finally:
+            self.release(driver, timings)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            drivers = list(self._all)
+            self._all.clear()
+            self._idle.clear()
+        for d in drivers:
+            try:
+                d.quit()
+            except Exception:
+                pass
+
+
+# =========================
+# Sesiones entre procesos
+# =========================
+def export_session(driver: webdriver.Chrome) -> str:
+    """Serializa la sesión para pasarla a un subproceso por DRIVER_SESSION."""
+    return json.dumps({"url": driver.service.service_url, "session_id": driver.session_id})
+
+
+class AttachedChrome(webdriver.Remote):
+    """
+    Sesión de Chrome que pertenece a otro proceso (el pool de main.py).
+    quit() solo suelta la conexión: cerrar y limpiar la sesión es trabajo del dueño.
+    """
+
+    def __init__(self, url: str, session_id: str) -> None:
+        self._attach_session_id = session_id
+        super().__init__(command_executor=ChromeRemoteConnection(url), options=Options())
+
+    def start_session(self, capabilities: dict) -> None:
+        self.session_id = self._attach_session_id
+        self.caps = {}
+
+    def execute_cdp_cmd(self, cmd: str, cmd_args: dict) -> dict:
+        return self.execute("executeCdpCommand", {"cmd": cmd, "params": cmd_args})["value"]
+
+    def quit(self) -> None:
+        self.command_executor.close()
+
+
+def attach_session(info: str) -> AttachedChrome:
+    data = json.loads(info)
+    return AttachedChrome(data["url"], data["session_id"])
+
+
+_local_pool: DriverPool | None = None
+_local_lock = threading.Lock()
+
+_tracked: ContextVar[list | None] = ContextVar("tracked_drivers", default=None)
+
+
+@contextmanager
+def track_drivers() -> Iterator[list]:
+    """
+    Junta en una lista los drivers que se presten dentro del bloque (en este
+    hilo), para que el watchdog sepa qué Chrome matar si el escenario se cuelga.
+    """
+    drivers: list = []
+    token = _tracked.set(drivers)
+    try:
+        yield drivers
+    finally:
+        _tracked.reset(token)
+
+
+def install_pool(pool: DriverPool) -> None:
+    """Usa `pool` como pool del proceso (main.py corriendo escenarios en proceso)."""
+    global _local_pool
+    with _local_lock:
+        _local_pool = pool
+
+
+def get_pool() -> DriverPool:
+    """Pool del proceso actual (DRIVER_POOL_SIZE sesiones, 1 por defecto)."""
+    global _local_pool
+    with _local_lock:
+        if _local_pool is None:
+            _local_pool = DriverPool(size=int(os.getenv("DRIVER_POOL_SIZE", "1")))
+            atexit.register(_local_pool.close)
+        return _local_pool
+
+
+@contextmanager
+def lease_driver(download_dir: Path | None = None, profile: str | None = None) -> Iterator[webdriver.Remote]:
+    """
+    Sesión para un escenario: la prestada por main.py si existe (main.py ya
+    la eligió del perfil que declara el script), si no una del pool local
+    con el perfil `profile` (ver core.profiles). Con BROWSER_CONTEXTS=1 el
+    escenario trabaja en un contexto de navegador nuevo que se descarta al
+    devolver la sesión (ver core.contexts).
+    """
+    trace_file = os.getenv(TRACE_FILE_ENV)
+    if trace_file and current_trace() is None:
+        # Escenario suelto o en subproceso: la traza se escribe al devolver la sesión
+        with tracing(Path(trace_file).parent.name) as trace:
+            try:
+                with lease_driver(download_dir, profile) as driver:
+                    yield driver
+            finally:
+                trace.write(Path(trace_file))
+        return
+
+    info = os.getenv(SESSION_ENV)
+    if info:
+        t0 = time.perf_counter()
+        driver = attach_session(info)
+        # main.py la lanzó con el perfil que declara el script (lo necesita core.contexts.prepare_tab)
+        driver.wd_profile = get_profile(profile).name
+        instrument(driver)
+        if download_dir is not None:
+            set_download_dir(driver, download_dir)
+        print(f"[pool] sesión de main.py tomada en {time.perf_counter() - t0:.2f}s", flush=True)
+        try:
+            with _isolated(driver, download_dir):
+                yield driver
+        finally:
+            driver.quit()
+        return
+
+    with get_pool().lease(download_dir, profile) as driver:
+        instrument(driver)
+        tracked = _tracked.get()
+        if tracked is not None:
+            tracked.append(driver)
+        try:
+            with _isolated(driver, download_dir):
+                yield driver
+        finally:
+            if tracked is not None:
+                tracked.remove(driver)
+
+
+@contextmanager
+def _isolated(driver: webdriver.Remote, download_dir: Path | None) -> Iterator[None]:
+    """Con BROWSER_CONTEXTS=1 el escenario corre en un contexto de navegador propio (core.contexts)."""
+    from core.contexts import contexts_enabled, isolated_context  # core.contexts importa este módulo
+
+    if not contexts_enabled():
+        yield
+        return
+    with isolated_context(driver, download_dir):
+        yield
@@ -0,0 +1,106 @@
+"""
+Log de eventos estructurado de la corrida (JSONL).
+
+Cada línea es un objeto {"ts": <epoch>, "event": "<tipo>", ...}. Sirve para
+calcular duraciones por fase/escenario después de la corrida sin parsear el
+texto de log(). La escritura va con buffer y es thread-safe.
+
+Si no hay un EventLog instalado (p. ej. un script corrido suelto), emit()
+no hace nada. Los eventos emitidos desde un escenario (dentro de
+scenario_tag) llevan su nombre en "scenario".
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+from core import tracing
+from core.streams import current_scenario
+
+
+class EventLog:
+    def __init__(self, path: Path, flush_every: int = 200) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.flush_every = flush_every
+        self._f = path.open("a", encoding="utf-8", buffering=64 * 1024)
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def emit(self, event: str, **fields: Any) -> None:
+        if "scenario" not in fields:
+            scenario = current_scenario()
+            if scenario is not None:
+                fields["scenario"] = scenario
+        record = {"ts": round(time.time(), 6), "event": event, **fields}
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            if self._f.closed:
+                return
+            self._f.write(line + "\n")
+            self._pending += 1
+            if self._pending >= self.flush_every:
+                self._f.flush()
+                self._pending = 0
+
+    @contextmanager
+    def phase(self, name: str, **fields: Any) -> Iterator[None]:
+        """Emite phase_start / phase_end (con duración y si terminó con error)."""
+        self.emit("phase_start", phase=name, **fields)
+        t0 = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.emit("phase_end", phase=name, duration=round(time.perf_counter() - t0, 6), ok=ok, **fields)
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._f.closed:
+                self._f.close()
+
+
+_current: EventLog | None = None
+
+
+def install(log: EventLog | None) -> None:
+    global _current
+    _current = log
+
+
+def emit(event: str, **fields: Any) -> None:
+    if _current is not None:
+        _current.emit(event, **fields)
+
+
+@contextmanager
+def phase(name: str, **fields: Any) -> Iterator[None]:
+    if _current is None:
+        yield
+        return
+    with _current.phase(name, **fields):
+        yield
+
+
+@contextmanager
+def step(name: str, **fields: Any) -> Iterator[None]:
+    """
+    Paso con nombre dentro de un escenario ("abrir", "login", ...). Emite un
+    evento "step" con la duración (bench.py lo usa para el tiempo por paso)
+    y lo agrega a la traza de comandos si hay una activa.
+    """
+    start = time.time()
+    t0 = time.perf_counter()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        duration = time.perf_counter() - t0
+        tracing.add_span(name, "step", start, duration, ok=ok)
+        emit("step", step=name, duration=round(duration, 6), ok=ok, **fields)
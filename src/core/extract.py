@@ -0,0 +1,199 @@
+"""
+Extracción masiva de DOM: un subárbol completo en una sola pasada.
+
+Buscar valores con XPath `normalize-space(.)` recorre todo el documento en
+cada búsqueda, y leer celda por celda (.text) es un viaje a chromedriver por
+celda. Aquí la página serializa el subárbol de una vez, en columnas
+(listas paralelas, sin un objeto por celda), y lo devuelve como un único
+string JSON (selenium no tiene que recorrer decenas de miles de valores).
+El resultado es un DataFrame de pandas; las búsquedas por texto se hacen con
+TextIndex, del lado de Python.
+
+    table = extract_table(driver, (By.CSS_SELECTOR, "#large-table"))
+    idx = TextIndex(table)
+    idx.first("12.1")            # (fila, columna)
+
+- Tablas: una columna del DataFrame por columna de la tabla (encabezados del
+  <thead> o de una primera fila de <th>). Sin colspan/rowspan: las filas
+  cortas se completan con None.
+- Cualquier otro elemento (listas anidadas, el <body> de un frame...): una
+  fila por elemento con texto propio (sus nodos de texto directos): tag,
+  text, depth (profundidad bajo la raíz) y parent (fila del ancestro más
+  cercano con texto, -1 si no tiene).
+- Textos normalizados como normalize-space(): espacios colapsados y sin
+  bordes. Se usa textContent (no innerText): no fuerza layout, pero incluye
+  texto oculto.
+
+Para un frame: driver.switch_to.frame(...) y extract(driver, (By.TAG_NAME, "body")).
+"""
+from __future__ import annotations
+
+import json
+from collections import defaultdict
+from typing import Iterable
+
+import pandas as pd
+from selenium.common.exceptions import NoSuchElementException
+
+from core.waits import _normalize
+
+
+# arguments: using, value, mode ("auto" | "table" | "tree"). Devuelve JSON (string) o null.
+_EXTRACT_JS = r"""
+const [using, value, mode] = arguments;
+
+function findRoot() {
+  switch (using) {
+    case "css selector": return document.querySelector(value);
+    case "xpath":
+      return document.evaluate(value, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    case "tag name": return document.getElementsByTagName(value)[0] || null;
+    default: throw new Error("locator no soportado: " + using);
+  }
+}
+const norm = s => s.replace(/\s+/g, " ").trim();
+
+function table(root) {
+  const rows = Array.from(root.rows);
+  let headers = [];
+  let start = 0;
+  if (root.tHead && root.tHead.rows.length) {
+    headers = Array.from(root.tHead.rows[0].cells, c => norm(c.textContent));
+    start = rows.indexOf(root.tHead.rows[root.tHead.rows.length - 1]) + 1;
+  } else if (rows.length && Array.from(rows[0].cells).every(c => c.tagName === "TH")) {
+    headers = Array.from(rows[0].cells, c => norm(c.textContent));
+    start = 1;
+  }
+  const body = rows.slice(start);
+  let width = headers.length;
+  for (const r of body) width = Math.max(width, r.cells.length);
+  const columns = [];
+  for (let i = 0; i < width; i++) columns.push(new Array(body.length).fill(null));
+  body.forEach((r, j) => {
+    const cells = r.cells;
+    for (let i = 0; i < cells.length; i++) columns[i][j] = norm(cells[i].textContent);
+  });
+  return {kind: "table", headers, columns};
+}
+
+const SKIP = new Set(["SCRIPT", "STYLE", "NOSCRIPT", "TEMPLATE"]);
+
+function ownText(el) {
+  let s = "";
+  for (const n of el.childNodes) if (n.nodeType === 3) s += n.nodeValue;
+  return norm(s);
+}
+
+function tree(root) {
+  const tag = [], text = [], depth = [], parent = [];
+  // Recorrido en orden de documento; por cada elemento: su profundidad y la fila más cercana hacia arriba
+  const info = new Map();
+  const walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT, {
+    acceptNode: n => SKIP.has(n.tagName) ? NodeFilter.FILTER_REJECT : NodeFilter.FILTER_ACCEPT,
+  });
+  for (let n = walker.currentNode; n; n = walker.nextNode()) {
+    const up = n === root ? {depth: -1, row: -1} : info.get(n.parentElement);
+    const me = {depth: up.depth + 1, row: up.row};
+    const t = ownText(n);
+    if (t) {
+      me.row = tag.length;
+      tag.push(n.tagName.toLowerCase());
+      text.push(t);
+      depth.push(me.depth);
+      parent.push(up.row);
+    }
+    info.set(n, me);
+  }
+  return {kind: "tree", columns: {tag, text, depth, parent}};
+}
+
+const root = findRoot();
+if (!root) return null;
+const asTable = mode === "table" || (mode === "auto" && root.tagName === "TABLE");
+return JSON.stringify(asTable ? table(root) : tree(root));
+"""
+
+
+TREE_COLUMNS = ["tag", "text", "depth", "parent"]
+
+
+def _fetch(driver, locator: tuple[str, str], mode: str) -> dict:
+    using, value = _normalize(locator)
+    raw = driver.execute_script(_EXTRACT_JS, using, value, mode)
+    if raw is None:
+        raise NoSuchElementException(f"No existe el elemento a extraer: {locator!r}")
+    return json.loads(raw)
+
+
+def _unique(headers: list[str], width: int) -> list[str]:
+    """Encabezados únicos y no vacíos (c<i> para los que faltan)."""
+    out, seen = [], set()
+    for i in range(width):
+        name = headers[i] if i < len(headers) and headers[i] else f"c{i + 1}"
+        base, k = name, 2
+        while name in seen:
+            name, k = f"{base}_{k}", k + 1
+        seen.add(name)
+        out.append(name)
+    return out
+
+
+def _to_frame(data: dict) -> pd.DataFrame:
+    if data["kind"] == "table":
+        columns = data["columns"]
+        names = _unique(data["headers"], len(columns))
+        return pd.DataFrame(dict(zip(names, columns)), columns=names)
+    return pd.DataFrame(data["columns"], columns=TREE_COLUMNS)
+
+
+def extract(driver, locator: tuple[str, str], mode: str = "auto") -> pd.DataFrame:
+    """
+    Subárbol del primer elemento de `locator` como DataFrame (un solo
+    execute_script). mode: "table", "tree" o "auto" (table si es <table>).
+    """
+    frame = _to_frame(_fetch(driver, locator, mode))
+    frame.attrs["source"] = f"{locator[0]}={locator[1]}"
+    return frame
+
+
+def extract_table(driver, locator: tuple[str, str]) -> pd.DataFrame:
+    return extract(driver, locator, "table")
+
+
+def extract_tree(driver, locator: tuple[str, str]) -> pd.DataFrame:
+    return extract(driver, locator, "tree")
+
+
+class TextIndex:
+    """
+    Índice texto -> posiciones [(fila, columna)] sobre un DataFrame extraído.
+    Para un árbol se indexa solo la columna "text"; para una tabla, todas.
+    """
+
+    def __init__(self, frame: pd.DataFrame, columns: Iterable[str] | None = None) -> None:
+        if columns is None:
+            columns = ["text"] if list(frame.columns) == TREE_COLUMNS else frame.columns
+        self.frame = frame
+        self._index: dict[str, list[tuple[int, str]]] = defaultdict(list)
+        for col in columns:
+            for row, value in zip(frame.index, frame[col].tolist()):
+                if isinstance(value, str):
+                    self._index[value].append((row, col))
+
+    def __contains__(self, text: str) -> bool:
+        return text in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def find(self, text: str) -> list[tuple[int, str]]:
+        return list(self._index.get(text, ()))
+
+    def first(self, text: str) -> tuple[int, str] | None:
+        hits = self._index.get(text)
+        return hits[0] if hits else None
+
+    def rows(self, text: str) -> pd.DataFrame:
+        """Filas del DataFrame donde aparece el texto."""
+        hits = sorted({row for row, _ in self._index.get(text, ())})
+        return self.frame.loc[hits]
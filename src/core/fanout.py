@@ -0,0 +1,363 @@
+"""
+Escenarios parametrizados: un dataset repartido entre K pestañas de un solo Chrome.
+
+Cada fila del dataset (config/datasets/*.yml o *.csv) es un caso. La tarea
+de una fila es un generador que hace `yield` cada vez que tiene que esperar
+a la página; mientras esa pestaña carga, el scheduler atiende a las demás
+(WebDriver maneja una pestaña a la vez, pero Chrome carga todas a la vez):
+
+    def check(driver, row):
+        yield goto(site_url("/dropdown"))                  # navega sin bloquear
+        dd = yield until(EC.element_to_be_clickable((By.ID, "dropdown")))
+        Select(dd).select_by_value(row["value"])           # comandos normales entre yields
+        return Select(dd).first_selected_option.text       # -> RowResult.value
+
+    report = fan_out(driver, load_dataset("dropdown"), check, tabs=4)
+    report.failed, report.describe()
+
+- goto(url): navega la pestaña; sigue cuando cargó el documento nuevo.
+- submit(locator): click por JS en algo que navega (un submit); igual que goto.
+- until(condición): una condición de core.waits / expected_conditions;
+  el yield devuelve su valor.
+
+Con isolate=True cada fila corre en una pestaña de un contexto de
+navegador nuevo (core.contexts): cookies y sesión no se cruzan entre filas
+(p. ej. combinaciones de login). Una espera bloqueante (EventWait.until)
+dentro de la tarea funciona, pero frena a todas las pestañas.
+"""
+from __future__ import annotations
+
+import csv
+import inspect
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Generator, Iterable, Iterator
+
+import yaml
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    StaleElementReferenceException,
+    WebDriverException,
+)
+
+from core import events, tracing
+from core.contexts import BrowserContext, dispose_context, new_context_tab, prepare_tab
+from core.paths import BASE_DIR
+
+
+DATASETS_DIR = BASE_DIR / "config" / "datasets"
+
+TABS_ENV = "FANOUT_TABS"
+DEFAULT_TABS = 4
+
+# Cuánto puede esperar un yield (s) antes de dar la fila por fallida
+STEP_TIMEOUT = 30.0
+
+# Pausa cuando ninguna pestaña avanzó en una vuelta
+POLL = 0.02
+
+_NAV_START_JS = "window.__fanoutPending = true; location.assign(arguments[0]);"
+_CLICK_START_JS = "window.__fanoutPending = true; arguments[0].click();"
+# El documento viejo todavía tiene la marca; el nuevo no, y cuando termina de cargar sigue la fila
+_NAV_DONE_JS = "return window.__fanoutPending === undefined && document.readyState === 'complete';"
+
+Task = Callable[[Any, dict], Any]
+
+# Columnas que agrega FanoutReport.sheet_rows() después de las del dataset
+RESULT_HEADER = ["Estado", "Resultado", "Error", "Pestaña", "Duración (s)"]
+
+
+# =========================
+# Datasets
+# =========================
+def load_dataset(name: str | Path) -> list[dict]:
+    """
+    Filas de un dataset: una ruta, o un nombre de config/datasets/ (con o sin
+    extensión). YAML: lista de filas o {"rows": [...]}. CSV: con encabezado
+    (los valores quedan como texto).
+    """
+    path = Path(name)
+    if not path.is_file():
+        candidates = [DATASETS_DIR / path.name] + [DATASETS_DIR / f"{path.name}{ext}" for ext in (".yml", ".yaml", ".csv")]
+        path = next((p for p in candidates if p.is_file()), None)
+        if path is None:
+            raise FileNotFoundError(f"No existe el dataset {name!r} en {DATASETS_DIR}")
+
+    if path.suffix.lower() == ".csv":
+        with path.open("r", encoding="utf-8-sig", newline="") as f:
+            return [dict(row) for row in csv.DictReader(f)]
+
+    with path.open("r", encoding="utf-8") as f:
+        data = yaml.safe_load(f) or []
+    rows = data.get("rows", []) if isinstance(data, dict) else data
+    if not isinstance(rows, list) or not all(isinstance(r, dict) for r in rows):
+        raise ValueError(f"{path.name}: se espera una lista de filas (clave: valor)")
+    return rows
+
+
+# =========================
+# Pasos
+# =========================
+class Step:
+    """Algo que la tarea espera: start() al hacer yield, poll() hasta que devuelva (True, valor)."""
+
+    def __init__(self, name: str, poll: Callable[[Any], tuple[bool, Any]],
+                 start: Callable[[Any], None] | None = None, timeout: float | None = None) -> None:
+        self.name = name
+        self.poll = poll
+        self.start = start or (lambda driver: None)
+        self.timeout = timeout
+
+    def __repr__(self) -> str:
+        return f"Step({self.name})"
+
+
+def _navigated(driver) -> tuple[bool, Any]:
+    return bool(driver.execute_script(_NAV_DONE_JS)), None
+
+
+def goto(url: str, timeout: float | None = None) -> Step:
+    return Step(f"goto {url}", _navigated, lambda driver: driver.execute_script(_NAV_START_JS, url), timeout)
+
+
+def submit(locator: tuple[str, str], timeout: float | None = None) -> Step:
+    def start(driver) -> None:
+        driver.execute_script(_CLICK_START_JS, driver.find_element(*locator))
+    return Step(f"submit {locator[1]}", _navigated, start, timeout)
+
+
+def until(condition: Callable[[Any], Any], timeout: float | None = None) -> Step:
+    def poll(driver) -> tuple[bool, Any]:
+        value = condition(driver)
+        return bool(value), value
+    return Step(repr(condition), poll, timeout=timeout)
+
+
+# =========================
+# Scheduler
+# =========================
+@dataclass
+class RowResult:
+    index: int
+    row: dict
+    ok: bool = False
+    value: Any = None
+    error: str = ""
+    tab: int = 0
+    duration: float = 0.0
+
+
+@dataclass
+class FanoutReport:
+    results: list[RowResult] = field(default_factory=list)
+    tabs: int = 1
+    duration: float = 0.0
+
+    @property
+    def failed(self) -> list[RowResult]:
+        return [r for r in self.results if not r.ok]
+
+    @property
+    def throughput(self) -> float:
+        """Filas por segundo."""
+        return len(self.results) / self.duration if self.duration > 0 else 0.0
+
+    def describe(self) -> str:
+        return (f"{len(self.results)} fila(s) en {self.tabs} pestaña(s): {len(self.failed)} con error, "
+                f"{self.duration:.2f}s ({self.throughput:.1f} filas/s)")
+
+    def sheet_rows(self, columns: list[str]) -> Iterator[list[Any]]:
+        """Para results_sheet(): las `columns` de cada fila del dataset + RESULT_HEADER."""
+        for r in self.results:
+            yield [r.row.get(c) for c in columns] + [
+                "OK" if r.ok else "FAIL", r.value, r.error, r.tab + 1, round(r.duration, 3),
+            ]
+
+
+@dataclass
+class _Slot:
+    index: int
+    handle: str
+    ctx: BrowserContext | None = None
+    gen: Generator | None = None
+    step: Step | None = None
+    deadline: float = 0.0
+    result: RowResult | None = None
+    start: float = 0.0  # epoch, para la traza
+    t0: float = 0.0
+
+
+class _Scheduler:
+    def __init__(self, driver, task: Task, tabs: int, isolate: bool, timeout: float) -> None:
+        self.driver = driver
+        self.task = task
+        self.isolate = isolate
+        self.timeout = timeout
+        self.home = driver.current_window_handle
+        self.current = self.home
+        self.slots: list[_Slot] = []
+        if isolate:
+            # Las pestañas se crean por fila (contexto nuevo); la de la sesión queda aparte
+            self.slots = [_Slot(i, "") for i in range(tabs)]
+        else:
+            self.slots = [_Slot(0, self.home)]
+            for i in range(1, tabs):
+                driver.switch_to.new_window("tab")
+                self.slots.append(_Slot(i, driver.current_window_handle))
+                self.current = driver.current_window_handle
+                prepare_tab(driver)
+            self._switch(self.home)
+
+    def _switch(self, handle: str) -> None:
+        if handle != self.current:
+            self.driver.switch_to.window(handle)
+            self.current = handle
+
+    def run(self, rows: list[dict]) -> list[RowResult]:
+        pending = deque(enumerate(rows))
+        results: list[RowResult] = []
+        while True:
+            progressed = False
+            for slot in self.slots:
+                if slot.result is None:
+                    if pending:
+                        self._start_row(slot, *pending.popleft())
+                        progressed = True
+                elif self._poll(slot):
+                    progressed = True
+                if slot.result is not None and slot.gen is None:
+                    results.append(self._finish(slot))
+            if not pending and all(s.result is None for s in self.slots):
+                break
+            if not progressed:
+                time.sleep(POLL)
+        return sorted(results, key=lambda r: r.index)
+
+    def _start_row(self, slot: _Slot, index: int, row: dict) -> None:
+        slot.result = RowResult(index, row, tab=slot.index)
+        slot.start = time.time()
+        slot.t0 = time.perf_counter()
+        try:
+            if self.isolate:
+                self._fresh_context(slot)
+            self._switch(slot.handle)
+            out = self.task(self.driver, row)
+        except Exception as e:  # noqa: BLE001 - se informa por fila
+            self._fail(slot, e)
+            return
+        if inspect.isgenerator(out):
+            slot.gen = out
+            self._advance(slot, None)
+        else:
+            slot.result.ok, slot.result.value = True, out
+
+    def _fresh_context(self, slot: _Slot) -> None:
+        if slot.ctx is not None:
+            self._switch(self.home)
+            dispose_context(self.driver, slot.ctx)
+            slot.ctx = None
+        slot.ctx = new_context_tab(self.driver)
+        slot.handle = slot.ctx.target_id
+        self._switch(slot.handle)
+        prepare_tab(self.driver)
+
+    def _advance(self, slot: _Slot, value: Any) -> None:
+        """Sigue la tarea hasta su próximo yield (o hasta que termine)."""
+        try:
+            step = slot.gen.send(value)
+            if not isinstance(step, Step):
+                raise TypeError(f"La tarea hizo yield de {step!r}; se espera goto(), submit() o until()")
+            step.start(self.driver)
+        except StopIteration as stop:
+            slot.gen = None
+            slot.result.ok, slot.result.value = True, stop.value
+            return
+        except Exception as e:  # noqa: BLE001 - se informa por fila
+            self._fail(slot, e)
+            return
+        slot.step = step
+        slot.deadline = time.monotonic() + (step.timeout or self.timeout)
+
+    def _poll(self, slot: _Slot) -> bool:
+        """True si la pestaña avanzó (su paso se cumplió o la fila terminó)."""
+        if slot.gen is None:
+            return False
+        try:
+            self._switch(slot.handle)
+            ready, value = slot.step.poll(self.driver)
+        except (NoSuchElementException, StaleElementReferenceException):
+            ready, value = False, None
+        except WebDriverException as e:
+            # Documento a medio cambiar: se vuelve a preguntar en la próxima vuelta
+            if "unloaded" not in (e.msg or "") and "execution context" not in (e.msg or ""):
+                self._fail(slot, e)
+                return True
+            ready, value = False, None
+        if ready:
+            self._advance(slot, value)
+            return True
+        if time.monotonic() > slot.deadline:
+            self._fail(slot, TimeoutError(f"{slot.step.name}: sin cumplirse en {slot.step.timeout or self.timeout:g}s"))
+            return True
+        return False
+
+    def _fail(self, slot: _Slot, error: BaseException) -> None:
+        if slot.gen is not None:
+            gen, slot.gen = slot.gen, None
+            try:
+                gen.close()
+            except Exception:  # noqa: BLE001 - el error de la fila es el primero
+                pass
+        slot.result.ok = False
+        slot.result.error = f"{type(error).__name__}: {str(error).splitlines()[0] if str(error) else ''}"
+
+    def _finish(self, slot: _Slot) -> RowResult:
+        result, slot.result, slot.step = slot.result, None, None
+        result.duration = time.perf_counter() - slot.t0
+        tracing.add_span("fanoutRow", "step", slot.start, result.duration,
+                         row=result.index, tab=result.tab, ok=result.ok)
+        events.emit("fanout_row", row=result.index, tab=result.tab, ok=result.ok,
+                    duration=round(result.duration, 6), error=result.error)
+        return result
+
+    def close(self) -> None:
+        """Cierra las pestañas (o contextos) extra y deja la sesión en su pestaña original."""
+        for slot in self.slots:
+            if self.isolate:
+                if slot.ctx is not None:
+                    self._switch(self.home)
+                    dispose_context(self.driver, slot.ctx)
+            elif slot.handle != self.home:
+                self._switch(slot.handle)
+                self.driver.close()
+                self.current = ""
+        self._switch(self.home)
+
+
+def tab_count(rows: int, tabs: int | None = None) -> int:
+    """Pestañas a usar: `tabs` o FANOUT_TABS (default 4), nunca más que filas."""
+    wanted = tabs or int(os.getenv(TABS_ENV) or DEFAULT_TABS)
+    return max(1, min(wanted, rows))
+
+
+def fan_out(driver, rows: Iterable[dict], task: Task, tabs: int | None = None, isolate: bool = False,
+            timeout: float = STEP_TIMEOUT) -> FanoutReport:
+    """
+    Corre task(driver, fila) para cada fila, hasta `tabs` a la vez (una por
+    pestaña). Los errores quedan por fila en el reporte (no se lanzan).
+    """
+    rows = list(rows)
+    report = FanoutReport(tabs=tab_count(len(rows), tabs))
+    if not rows:
+        return report
+    t0 = time.perf_counter()
+    scheduler = _Scheduler(driver, task, report.tabs, isolate, timeout)
+    try:
+        report.results = scheduler.run(rows)
+    finally:
+        scheduler.close()
+    report.duration = time.perf_counter() - t0
+    return report
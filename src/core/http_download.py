@@ -0,0 +1,206 @@
+"""
+Descargas directas por HTTP con la sesión del navegador.
+
+Hacer click en Chrome y esperar el archivo en disco es lento y de a uno.
+Para bajar archivos cuyo URL ya se conoce alcanza con la misma sesión:
+cookies, User-Agent y headers extra (los de set_extra_headers, p. ej. Basic
+Auth) se copian del driver a un requests.Session con pool de conexiones.
+
+    session = session_from_driver(driver)
+    results = fetch_all(session, urls, download_dir, workers=4)
+    results[0].path, results[0].sha256
+
+Cada archivo se escribe en streaming a un temporal propio (con el sha256
+calculado al vuelo) y se renombra al terminar: el nombre final nunca existe
+a medias. En un mismo lote, los nombres repetidos no se pisan: el segundo
+some-file.txt queda como some-file_2.txt.
+
+DOWNLOAD_MODE elige el camino en los escenarios de descarga:
+- "http" (default): solo requests.
+- "browser": click en Chrome, como antes.
+- "both": requests + un click en Chrome para verificar que el archivo del
+  navegador tiene el mismo sha256.
+
+Por defecto se baja solo el primer archivo de la lista; con DOWNLOAD_ALL=1
+el camino HTTP baja todos a la vez con fetch_all (el click sigue siendo
+solo sobre el primero).
+"""
+from __future__ import annotations
+
+import contextvars
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from core import events, tracing
+from core.driver_pool import extra_headers
+
+
+DOWNLOAD_MODE_ENV = "DOWNLOAD_MODE"
+DOWNLOAD_MODES = ("http", "browser", "both")
+DOWNLOAD_ALL_ENV = "DOWNLOAD_ALL"
+
+CHUNK = 1024 * 1024
+TIMEOUT = (10, 60)  # conexión, lectura (s)
+
+_FILENAME_RE = re.compile(r"filename\*?=(?:UTF-8'')?\"?([^\";]+)\"?", re.IGNORECASE)
+
+
+def download_mode() -> str:
+    mode = (os.getenv(DOWNLOAD_MODE_ENV) or "http").strip().lower()
+    if mode not in DOWNLOAD_MODES:
+        raise ValueError(f"{DOWNLOAD_MODE_ENV}={mode!r} no es válido (usa {', '.join(DOWNLOAD_MODES)})")
+    return mode
+
+
+def download_all() -> bool:
+    """DOWNLOAD_ALL=1: el camino HTTP baja todos los archivos listados, no solo el primero."""
+    return (os.getenv(DOWNLOAD_ALL_ENV) or "").strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass
+class Fetched:
+    url: str
+    path: Path | None = None
+    bytes: int = 0
+    sha256: str = ""
+    status: int = 0
+    duration: float = 0.0
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return not self.error
+
+    @property
+    def throughput(self) -> float:
+        return self.bytes / self.duration if self.duration > 0 else 0.0
+
+    def describe(self) -> str:
+        if self.error:
+            return f"{self.url}: ERROR {self.error}"
+        return (f"{self.path.name}: {self.bytes / 1024:.1f} KB en {self.duration:.2f}s "
+                f"({self.throughput / 1_048_576:.2f} MB/s) sha256={self.sha256[:12]}")
+
+
+def session_from_driver(driver, workers: int = 4, retries: int = 2) -> requests.Session:
+    """requests.Session con las cookies, el User-Agent y los headers extra del driver."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4, pool_maxsize=max(workers, 1),
+        max_retries=Retry(total=retries, backoff_factor=0.3, status_forcelist=(502, 503, 504),
+                          allowed_methods=frozenset({"GET", "HEAD"})),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    session.headers["User-Agent"] = driver.execute_script("return navigator.userAgent")
+    session.headers.update(extra_headers(driver))
+    for c in driver.get_cookies():
+        session.cookies.set(c["name"], c["value"], domain=c.get("domain", ""), path=c.get("path", "/"))
+    return session
+
+
+def _clean(name: str) -> str:
+    return re.sub(r"[\\/:*?\"<>|]+", "_", name).strip()
+
+
+def url_filename(url: str) -> str:
+    """Último tramo del URL como nombre de archivo ("" si el URL no tiene uno)."""
+    return _clean(unquote(Path(urlparse(url).path).name))
+
+
+def filename_for(response: requests.Response) -> str:
+    """Nombre de Content-Disposition o, si no viene, el último tramo del URL."""
+    m = _FILENAME_RE.search(response.headers.get("Content-Disposition", ""))
+    name = _clean(unquote(m.group(1))) if m else url_filename(response.url)
+    return name or "download.bin"
+
+
+class UniqueNames:
+    """Nombres ya tomados en un lote de descargas (se comparte entre hilos)."""
+
+    def __init__(self) -> None:
+        self._taken: set[str] = set()
+        self._lock = threading.Lock()
+
+    def reserve(self, name: str) -> str:
+        """`name`, o name_2.ext, name_3.ext, ... si otra descarga del lote ya lo tomó."""
+        stem, suffix = Path(name).stem, Path(name).suffix
+        with self._lock:
+            candidate, n = name, 2
+            while candidate.lower() in self._taken:
+                candidate, n = f"{stem}_{n}{suffix}", n + 1
+            self._taken.add(candidate.lower())
+            return candidate
+
+
+def fetch(session: requests.Session, url: str, dest_dir: Path, name: str | None = None,
+          names: UniqueNames | None = None) -> Fetched:
+    """
+    Baja `url` a dest_dir en streaming. Los errores quedan en Fetched.error (no lanza).
+    Sin `name` y con `names`, el nombre de la respuesta se reserva en el lote
+    (no pisa otra descarga).
+    """
+    start = time.time()
+    t0 = time.perf_counter()
+    result = Fetched(url)
+    part: Path | None = None
+    try:
+        with session.get(url, stream=True, timeout=TIMEOUT) as r:
+            result.status = r.status_code
+            r.raise_for_status()
+            dest_dir.mkdir(parents=True, exist_ok=True)
+            if name is None:
+                name = filename_for(r) if names is None else names.reserve(filename_for(r))
+            target = dest_dir / name
+            fd, tmp = tempfile.mkstemp(dir=dest_dir, prefix=f".{target.name}.", suffix=".part")
+            part = Path(tmp)
+            h = hashlib.sha256()
+            with os.fdopen(fd, "wb") as f:
+                for chunk in r.iter_content(CHUNK):
+                    f.write(chunk)
+                    h.update(chunk)
+                    result.bytes += len(chunk)
+            os.replace(part, target)
+            part = None
+            result.path = target
+            result.sha256 = h.hexdigest()
+    except (requests.RequestException, OSError) as e:
+        result.error = f"{type(e).__name__}: {e}"
+    finally:
+        if part is not None:
+            part.unlink(missing_ok=True)
+        result.duration = time.perf_counter() - t0
+        tracing.add_span("httpGet", "command", start, result.duration,
+                         url=url[:200], bytes_in=result.bytes, status=result.status, ok=result.ok)
+    events.emit("http_download", url=url, bytes=result.bytes, duration=round(result.duration, 6),
+                status=result.status, ok=result.ok)
+    return result
+
+
+def fetch_all(session: requests.Session, urls: list[str], dest_dir: Path, workers: int = 4) -> list[Fetched]:
+    """Varios archivos a la vez (mismo orden que `urls`); los nombres repetidos quedan como name_2.ext."""
+    # Nombres reservados antes de lanzar, en el orden de `urls` (los URL sin
+    # nombre reservan el de la respuesta al llegar)
+    names = UniqueNames()
+    targets = [names.reserve(n) if (n := url_filename(u)) else None for u in urls]
+    if workers <= 1 or len(urls) <= 1:
+        return [fetch(session, u, dest_dir, t, names) for u, t in zip(urls, targets)]
+    with ThreadPoolExecutor(max_workers=min(workers, len(urls)), thread_name_prefix="http-dl") as pool:
+        # Cada hilo con el contexto del escenario (traza, etiqueta de eventos)
+        futures = [pool.submit(contextvars.copy_context().run, fetch, session, u, dest_dir, t, names)
+                   for u, t in zip(urls, targets)]
+        return [f.result() for f in futures]
+
@@ -0,0 +1,340 @@
+"""
+Carga sintética con los flujos de los escenarios.
+
+Los escenarios (login/logout de 08, descargas de 06, ...) se repiten con
+una mezcla ponderada durante un tiempo fijo, contra el staging propio o la
+réplica local (core.site_standin):
+
+    tasks = [scenario_task(sc, weight=3), http_task("http:download")]
+    stats = LoadRunner(tasks, duration=60, concurrency=4, http_workers=8).run()
+
+- Lazo cerrado (default): `concurrency` hilos de navegador y `http_workers`
+  hilos HTTP; cada uno corre una tarea tras otra, sin pausa.
+- Tasa de llegada (rate > 0): llegan `rate` iteraciones por segundo
+  (Poisson) y esperan un hilo libre de su tipo. La latencia se mide desde
+  la llegada: si el sistema no da abasto, la cola aparece en los números.
+
+Las sesiones de navegador salen del pool instalado (install_pool). Las
+tareas "http:*" repiten los flujos de descarga sin navegador, con un
+requests.Session por hilo.
+
+Cada iteración emite "load_iteration" y los pasos de los escenarios sus
+eventos "step" de siempre; load_report() arma con el log throughput y
+percentiles por paso en ventanas de tiempo.
+"""
+from __future__ import annotations
+
+import math
+import random
+import re
+import shutil
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+from urllib.parse import urljoin
+
+import requests
+
+from core import events
+from core.events import step
+from core.http_download import TIMEOUT, fetch
+from core.paths import downloads_dir, use_output_dir
+from core.registry import Scenario
+from core.site import site_url
+from core.stats import Summary
+from core.streams import scenario_tag
+
+
+BROWSER, HTTP = "browser", "http"
+
+# Links de descarga en las páginas /download y /download_secure
+_HREF_RE = re.compile(r"href=[\"']([^\"']*/download(?:_secure)?/[^\"']+)[\"']")
+
+# Basic Auth de /download_secure (las mismas de 13_secure_file_downloader.py)
+SECURE_AUTH = ("admin", "admin")
+
+
+@dataclass
+class LoadTask:
+    name: str
+    run: Callable[[], None]
+    kind: str = BROWSER
+    weight: float = 1.0
+
+
+# =========================
+# Flujos HTTP (sin navegador)
+# =========================
+_local = threading.local()
+
+
+def _session() -> requests.Session:
+    """Un requests.Session por hilo: conexiones keep-alive, como un cliente real."""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = requests.Session()
+    return session
+
+
+def _download_flow(path: str, auth: tuple[str, str] | None = None) -> Callable[[], None]:
+    def flow() -> None:
+        session = _session()
+        with step("abrir"):
+            r = session.get(site_url(path), auth=auth, timeout=TIMEOUT)
+            r.raise_for_status()
+        urls = [urljoin(r.url, href) for href in _HREF_RE.findall(r.text)]
+        if not urls:
+            raise RuntimeError(f"{path}: no hay links de descarga")
+        with step("descargar"):
+            session.auth = auth
+            try:
+                failed = [f for f in (fetch(session, u, downloads_dir()) for u in urls) if not f.ok]
+            finally:
+                session.auth = None
+        if failed:
+            raise RuntimeError("Descargas fallidas: " + "; ".join(f.describe() for f in failed))
+    return flow
+
+
+HTTP_FLOWS: dict[str, Callable[[], None]] = {
+    "http:download": _download_flow("/download"),
+    "http:download_secure": _download_flow("/download_secure", SECURE_AUTH),
+}
+
+
+def http_task(name: str, weight: float = 1.0) -> LoadTask:
+    try:
+        flow = HTTP_FLOWS[name]
+    except KeyError:
+        raise ValueError(f"Flujo HTTP desconocido: {name!r} (usa {', '.join(HTTP_FLOWS)})") from None
+    return LoadTask(name, flow, HTTP, weight)
+
+
+def scenario_task(scenario: Scenario, weight: float = 1.0) -> LoadTask:
+    return LoadTask(scenario.name, scenario.run, BROWSER, weight)
+
+
+# =========================
+# Ejecución
+# =========================
+@dataclass
+class LoadStats:
+    started: float = 0.0  # epoch del arranque (t=0 de las ventanas)
+    duration: float = 0.0
+    iterations: int = 0
+    errors: int = 0
+    dropped: int = 0  # llegadas que no llegaron a empezar antes del final
+    per_task: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+    def describe(self) -> str:
+        rate = self.iterations / self.duration if self.duration > 0 else 0.0
+        return (f"{self.iterations} iteraciones en {self.duration:.1f}s ({rate:.2f}/s), "
+                f"errores={self.errors}, sin empezar={self.dropped}")
+
+
+class LoadRunner:
+    """
+    concurrency: hilos de navegador (conviene igual al tamaño del pool).
+    http_workers: hilos para las tareas "http:*".
+    rate: llegadas por segundo (0 = lazo cerrado).
+    out_dir: carpeta de salida; cada iteración usa una subcarpeta que se
+    borra al terminar, salvo keep_outputs.
+    """
+
+    def __init__(self, tasks: list[LoadTask], duration: float, concurrency: int = 1, http_workers: int = 0,
+                 rate: float = 0.0, out_dir: Path | None = None, keep_outputs: bool = False,
+                 seed: int | None = None) -> None:
+        if not tasks:
+            raise ValueError("No hay tareas en la mezcla")
+        self.workers = {BROWSER: concurrency, HTTP: http_workers}
+        for kind in (BROWSER, HTTP):
+            if any(t.kind == kind for t in tasks) and self.workers[kind] < 1:
+                raise ValueError(f"La mezcla tiene tareas '{kind}' pero ningún hilo para correrlas")
+        self.tasks = tasks
+        self.duration = duration
+        self.rate = rate
+        self.out_dir = Path(out_dir) if out_dir else None
+        self.keep_outputs = keep_outputs
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._seq = 0
+        self.stats = LoadStats()
+
+    def _pick(self, tasks: list[LoadTask]) -> LoadTask:
+        with self._rng_lock:
+            return self._rng.choices(tasks, weights=[t.weight for t in tasks])[0]
+
+    def _execute(self, task: LoadTask, arrival: float) -> None:
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+        start = time.time()
+        t0 = time.perf_counter()
+        error = ""
+        iter_dir = self.out_dir / Path(task.name.replace(":", "_")).stem / f"{seq:06d}" if self.out_dir else None
+        try:
+            with scenario_tag(task.name):
+                if iter_dir is not None:
+                    with use_output_dir(iter_dir):
+                        task.run()
+                else:
+                    task.run()
+        except (Exception, SystemExit) as e:  # un sys.exit() del escenario también es un error de la iteración
+            text = str(e).splitlines()[0] if str(e) else ""
+            error = f"{type(e).__name__}: {text}"
+        finally:
+            if iter_dir is not None and not self.keep_outputs:
+                shutil.rmtree(iter_dir, ignore_errors=True)
+        service = time.perf_counter() - t0
+        with self._lock:
+            self.stats.iterations += 1
+            self.stats.per_task[task.name] += 1
+            if error:
+                self.stats.errors += 1
+        events.emit("load_iteration", scenario=task.name, kind=task.kind, queued=round(max(0.0, start - arrival), 6),
+                    service=round(service, 6), latency=round(start - arrival + service, 6), ok=not error, error=error)
+
+    def _closed_loop(self, kind: str, deadline: float) -> None:
+        tasks = [t for t in self.tasks if t.kind == kind]
+        while time.time() < deadline:
+            self._execute(self._pick(tasks), time.time())
+
+    def _open_loop(self, deadline: float) -> None:
+        executors = {kind: ThreadPoolExecutor(max_workers=n, thread_name_prefix=f"load-{kind}")
+                     for kind, n in self.workers.items() if n > 0}
+        pending: list[Future] = []
+        try:
+            next_at = time.time()
+            while True:
+                with self._rng_lock:
+                    next_at += self._rng.expovariate(self.rate)
+                if next_at >= deadline:
+                    break
+                time.sleep(max(0.0, next_at - time.time()))
+                task = self._pick(self.tasks)
+                pending.append(executors[task.kind].submit(self._execute, task, next_at))
+                pending = [f for f in pending if not f.done()]
+            # Lo que sigue en cola al final no se empieza: cuenta como no atendido
+            self.stats.dropped += sum(1 for f in pending if f.cancel())
+        finally:
+            for ex in executors.values():
+                ex.shutdown(wait=True)
+
+    def run(self) -> LoadStats:
+        self.stats = LoadStats(started=time.time())
+        deadline = self.stats.started + self.duration
+        events.emit("load_start", duration=self.duration, rate=self.rate,
+                    concurrency=self.workers[BROWSER], http_workers=self.workers[HTTP],
+                    mix={t.name: t.weight for t in self.tasks})
+        if self.rate > 0:
+            self._open_loop(deadline)
+        else:
+            threads = [
+                threading.Thread(target=self._closed_loop, args=(kind, deadline), name=f"load-{kind}-{i}")
+                for kind, n in self.workers.items()
+                if any(t.kind == kind for t in self.tasks)
+                for i in range(n)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        self.stats.duration = time.time() - self.stats.started
+        if self.out_dir is not None and not self.keep_outputs:
+            shutil.rmtree(self.out_dir, ignore_errors=True)
+        events.emit("load_end", iterations=self.stats.iterations, errors=self.stats.errors,
+                    dropped=self.stats.dropped, duration=round(self.stats.duration, 6))
+        return self.stats
+
+
+# =========================
+# Reporte
+# =========================
+@dataclass
+class Window:
+    start: float  # segundos desde el arranque
+    length: float
+    samples: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+    def rate(self, key: str) -> float:
+        return len(self.samples.get(key, ())) / self.length if self.length > 0 else 0.0
+
+
+@dataclass
+class LoadReport:
+    window: float
+    windows: list[Window]
+    keys: list[str]  # por escenario: "<escenario> · <paso>" y al final "<escenario> iteración"
+
+    def total(self, key: str) -> Summary:
+        return Summary.of(v for w in self.windows for v in w.samples.get(key, ()))
+
+    def errors(self, key: str) -> int:
+        return sum(w.errors.get(key, 0) for w in self.windows)
+
+    def to_dict(self) -> dict:
+        return {
+            "window": self.window,
+            "keys": {k: {"total": self.total(k), "errors": self.errors(k)} for k in self.keys},
+            "windows": [
+                {"start": w.start, "rate": {k: round(w.rate(k), 4) for k in w.samples},
+                 "latency": {k: Summary.of(v) for k, v in w.samples.items()}, "errors": dict(w.errors)}
+                for w in self.windows
+            ],
+        }
+
+    def render(self) -> list[str]:
+        """Por cada iteración/paso: el total y una línea por ventana (throughput y percentiles)."""
+        span = sum(w.length for w in self.windows)
+        lines = []
+        for key in self.keys:
+            total = self.total(key)
+            err = self.errors(key)
+            lines.append(f"{key}: n={total.n} {total.n / span if span else 0:.2f}/s  "
+                         f"{total.fmt('ms', 1000, 0)}" + (f"  errores={err}" if err else ""))
+            for w in self.windows:
+                s = Summary.of(w.samples.get(key, ()))
+                lines.append(f"  {w.start:6g}s  {w.rate(key):6.2f}/s  " + (
+                    s.fmt("ms", 1000, 0) if s.n else "-") + (f"  errores={w.errors[key]}" if w.errors.get(key) else ""))
+        return lines
+
+
+def load_report(records: list[dict], window: float = 5.0) -> LoadReport:
+    """
+    Agrupa el log de eventos de una corrida de carga en ventanas de `window`
+    segundos (por el momento en que terminó cada iteración/paso). Lo que
+    termina después del plazo (iteraciones en curso) va a la última ventana,
+    que se alarga lo necesario.
+    """
+    begin = next((r for r in records if r["event"] == "load_start"), None)
+    if begin is None:
+        return LoadReport(window, [], [])
+    start = begin["ts"]
+    end = next((r["ts"] for r in records if r["event"] == "load_end"), max(r["ts"] for r in records))
+    count = max(1, math.ceil(begin["duration"] / window))
+    windows = [Window(i * window, window) for i in range(count)]
+    windows[-1].length = max(window, end - start - (count - 1) * window)
+    keys: dict[tuple[str, bool], dict[str, None]] = defaultdict(dict)
+
+    for r in records:
+        ev = r["event"]
+        if ev not in ("load_iteration", "step") or "scenario" not in r or r["ts"] < start:
+            continue
+        if ev == "load_iteration":
+            key, value, ok = f"{r['scenario']} iteración", r["latency"], r["ok"]
+        else:
+            key, value, ok = f"{r['scenario']} · {r['step']}", r["duration"], r["ok"]
+        keys[r["scenario"], ev == "load_iteration"].setdefault(key)
+        w = windows[min(count - 1, int((r["ts"] - start) // window))]
+        w.samples[key].append(value)
+        if not ok:
+            w.errors[key] += 1
+    scenarios = list(dict.fromkeys(scenario for scenario, _ in keys))
+    ordered = [k for sc in scenarios for last in (False, True) for k in keys.get((sc, last), ())]
+    return LoadReport(window, windows, ordered)
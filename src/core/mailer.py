@@ -0,0 +1,220 @@
+"""
+Envío SMTP con conexión reutilizada, grupos en paralelo y reintentos.
+
+Antes cada mensaje abría su propia conexión (connect + STARTTLS + login).
+Ahora cada grupo de destinatarios usa una sola conexión autenticada para
+todas sus partes, y los grupos independientes se envían a la vez.
+
+Grupos: MAIL_TO separa grupos con ";" y destinatarios de un mismo grupo
+con ",". Cada grupo recibe su propio juego de mensajes:
+
+    MAIL_TO="jefe@x.com, qa@x.com; cliente@y.com"   -> 2 grupos
+
+Errores 4xx (transitorios) y desconexiones se reintentan con backoff
+exponencial; los 5xx fallan de inmediato.
+"""
+from __future__ import annotations
+
+import os
+import random
+import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from email.message import EmailMessage
+from email.utils import getaddresses
+from typing import Callable, Iterable
+
+from core import events
+
+
+@dataclass
+class SmtpSettings:
+    host: str
+    port: int = 587
+    user: str = ""
+    password: str = ""
+    starttls: bool = True
+    timeout: float = 60.0
+    retries: int = 4
+    backoff: float = 1.0  # segundos del primer reintento; se duplica en cada uno
+
+    @classmethod
+    def from_env(cls) -> "SmtpSettings":
+        host = os.getenv("SMTP_HOST", "").strip()
+        user = os.getenv("SMTP_USER", "").strip()
+        password = os.getenv("SMTP_PASS", "").strip()
+        if not host or not user or not password:
+            raise RuntimeError("Faltan SMTP_HOST/SMTP_USER/SMTP_PASS en variables de entorno.")
+        return cls(
+            host=host,
+            port=int(os.getenv("SMTP_PORT", "587").strip()),
+            user=user,
+            password=password,
+            # Solo para servidores locales/de prueba sin TLS
+            starttls=os.getenv("SMTP_STARTTLS", "1").strip().lower() not in ("0", "false", "no"),
+            retries=int(os.getenv("SMTP_RETRIES", "4").strip()),
+        )
+
+
+def recipient_groups(mail_to: str) -> list[str]:
+    """'a, b; c' -> ['a, b', 'c'] (grupos vacíos se descartan)."""
+    return [g.strip() for g in mail_to.split(";") if g.strip()]
+
+
+def is_transient(exc: BaseException) -> bool:
+    if isinstance(exc, (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)):
+        return True
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in exc.recipients.values())
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return 400 <= exc.smtp_code < 500
+    return False
+
+
+@dataclass
+class DeliveryReport:
+    group: str
+    sent: int = 0
+    bytes: int = 0
+    attempts: int = 0
+    connects: int = 0
+    seconds: float = 0.0
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return not self.error
+
+    def describe(self) -> str:
+        status = "OK" if self.ok else f"FALLÓ ({self.error})"
+        return (
+            f"{self.group}: {status}, {self.sent} mensaje(s), {self.bytes / 1_048_576:.1f} MB, "
+            f"{self.attempts - self.sent} reintento(s), {self.connects} conexión(es), {self.seconds:.1f}s"
+        )
+
+
+class Mailer:
+    """
+    Una conexión SMTP autenticada, reutilizada entre mensajes.
+    Se reconecta sola si el servidor corta. No es thread-safe: una por hilo.
+    """
+
+    def __init__(self, settings: SmtpSettings, report: Callable[[str], None] | None = print) -> None:
+        self.settings = settings
+        self.report = report
+        self._smtp: smtplib.SMTP | None = None
+        self.connects = 0
+        self.bytes_sent = 0
+        self.attempts = 0
+
+    def _report(self, msg: str) -> None:
+        if self.report:
+            self.report(f"[smtp] {msg}")
+
+    def _connect(self) -> smtplib.SMTP:
+        s = self.settings
+        server = smtplib.SMTP(s.host, s.port, timeout=s.timeout)
+        try:
+            server.ehlo()
+            if s.starttls:
+                server.starttls()
+                server.ehlo()
+            server.login(s.user, s.password)
+        except BaseException:
+            server.close()
+            raise
+        self.connects += 1
+        return server
+
+    def _drop(self) -> None:
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                self._smtp.close()
+            self._smtp = None
+
+    def send(self, msg: EmailMessage) -> int:
+        """Envía con reintentos. Retorna la cantidad de intentos que usó este mensaje."""
+        s = self.settings
+        data = msg.as_bytes()
+        attempt = 0
+        while True:
+            attempt += 1
+            self.attempts += 1
+            t0 = time.perf_counter()
+            try:
+                if self._smtp is None:
+                    self._smtp = self._connect()
+                # sendmail con bytes: se serializa una sola vez (send_message lo haría por intento)
+                self._smtp.sendmail(msg["From"], _addresses(msg), data)
+                self.bytes_sent += len(data)
+                events.emit("smtp_send", to=msg["To"], bytes=len(data), attempt=attempt,
+                            duration=round(time.perf_counter() - t0, 4))
+                return attempt
+            except Exception as e:
+                if self._smtp is not None and (
+                    isinstance(e, (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError))
+                    or self._smtp.sock is None  # smtplib cierra solo ante un 421
+                ):
+                    # La conexión quedó inservible; el siguiente intento abre otra
+                    self._smtp.close()
+                    self._smtp = None
+                if not is_transient(e) or attempt > s.retries:
+                    raise
+                delay = s.backoff * (2 ** (attempt - 1)) * random.uniform(0.8, 1.2)
+                self._report(f"{type(e).__name__}: {e} — reintento {attempt}/{s.retries} en {delay:.1f}s")
+                events.emit("smtp_retry", to=msg["To"], attempt=attempt, error=str(e)[:200], delay=round(delay, 3))
+                time.sleep(delay)
+
+    def close(self) -> None:
+        self._drop()
+
+    def __enter__(self) -> "Mailer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _addresses(msg: EmailMessage) -> list[str]:
+    fields = [v for k in ("To", "Cc", "Bcc") for v in msg.get_all(k, [])]
+    return [addr for _, addr in getaddresses(fields) if addr]
+
+
+def deliver(groups: Iterable[str], messages_for: Callable[[str], Iterable[EmailMessage]],
+            settings: SmtpSettings, workers: int = 4,
+            report: Callable[[str], None] | None = print) -> list[DeliveryReport]:
+    """
+    Envía a cada grupo los mensajes que genere `messages_for(grupo)`, una
+    conexión por grupo y hasta `workers` grupos a la vez. Los mensajes se
+    generan de a uno (solo uno por grupo en memoria). Nunca lanza: los
+    errores quedan en cada DeliveryReport.
+    """
+    groups = list(groups)
+
+    def _one(group: str) -> DeliveryReport:
+        rep = DeliveryReport(group)
+        t0 = time.perf_counter()
+        mailer = Mailer(settings, report=report)
+        try:
+            for msg in messages_for(group):
+                mailer.send(msg)
+                rep.sent += 1
+        except Exception as e:
+            rep.error = f"{type(e).__name__}: {e}"
+        finally:
+            mailer.close()
+            rep.connects = mailer.connects
+            rep.bytes = mailer.bytes_sent
+            rep.attempts = mailer.attempts
+            rep.seconds = time.perf_counter() - t0
+        if report:
+            report(f"[smtp] {rep.describe()}")
+        return rep
+
+    if not groups:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(groups))), thread_name_prefix="smtp") as ex:
+        return list(ex.map(_one, groups))
@@ -0,0 +1,83 @@
+"""
+Manifiesto de artefactos por escenario.
+
+Cada escenario registra lo que produce (screenshots, descargas, xlsx, pdf)
+en <carpeta del escenario>/manifest.jsonl. main.py arma el correo leyendo
+los manifiestos de la corrida en vez de recorrer todo outputs/.
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from core.paths import outputs_dir
+
+
+MANIFEST_NAME = "manifest.jsonl"
+
+_lock = threading.Lock()
+
+
+@dataclass
+class Artifact:
+    path: Path
+    kind: str
+    bytes: int
+    scenario_dir: Path
+
+
+def register_artifact(path: Path, kind: str = "evidence") -> Path:
+    """
+    Anota `path` en el manifiesto de la carpeta de salida actual.
+    kind: "evidence" (screenshots, reportes) o "download".
+    Retorna `path` para poder encadenar.
+    """
+    path = Path(path)
+    out = outputs_dir()
+    try:
+        rel = path.resolve().relative_to(out.resolve()).as_posix()
+    except ValueError:
+        rel = str(path.resolve())
+    record = {
+        "path": rel,
+        "kind": kind,
+        "bytes": path.stat().st_size if path.exists() else 0,
+        "ts": round(time.time(), 3),
+    }
+    with _lock, (out / MANIFEST_NAME).open("a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return path
+
+
+def read_manifest(scenario_dir: Path) -> list[Artifact]:
+    """Artefactos registrados en una carpeta (los que ya no existen se omiten)."""
+    manifest = scenario_dir / MANIFEST_NAME
+    if not manifest.exists():
+        return []
+    seen: dict[Path, Artifact] = {}
+    with manifest.open("r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            rec = json.loads(line)
+            p = Path(rec["path"])
+            if not p.is_absolute():
+                p = scenario_dir / p
+            if not p.exists():
+                continue
+            # Si se registró dos veces, vale el último tamaño
+            seen[p] = Artifact(p, rec.get("kind", "evidence"), p.stat().st_size, scenario_dir)
+    return list(seen.values())
+
+
+def collect_run_artifacts(run_dir: Path) -> list[Artifact]:
+    """Artefactos de todos los escenarios de una corrida (un nivel: run_dir/<escenario>/)."""
+    artifacts: list[Artifact] = []
+    if not run_dir.exists():
+        return artifacts
+    for d in sorted(p for p in run_dir.iterdir() if p.is_dir()):
+        artifacts.extend(read_manifest(d))
+    return artifacts
@@ -0,0 +1,170 @@
+"""
+Empaquetado de adjuntos para el correo.
+
+Antes cada adjunto se leía entero a memoria y el EmailMessage completo se
+armaba en RAM (y se volvía a serializar al enviar). Ahora los artefactos se
+escriben de a uno, en streaming, a zips en disco:
+
+- PNG: se recomprimen sin pérdida (Pillow optimize) y se guardan sin deflate.
+- Archivos idénticos (mismo sha256) van una sola vez.
+- Los zips se cortan en partes de a lo más `part_bytes`; cada parte se manda
+  en un correo aparte, así la memoria al enviar depende del tope y no del
+  tamaño de outputs/.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from PIL import Image
+
+
+CHUNK = 1 << 20
+
+# ~25 MB es el límite típico de adjuntos; base64 agrega un 33%
+DEFAULT_PART_BYTES = 18 * 1_048_576
+
+# Cabeceras locales + directorio central por entrada (aprox., con nombre largo)
+ENTRY_OVERHEAD = 512
+
+# Formatos ya comprimidos: deflate no gana nada y gasta CPU
+STORED_EXTS = {".png", ".jpg", ".jpeg", ".webp", ".gif", ".zip", ".gz", ".xlsx", ".pdf"}
+
+
+@dataclass
+class Part:
+    path: Path
+    files: list[str] = field(default_factory=list)
+
+
+@dataclass
+class PackageReport:
+    parts: list[Part] = field(default_factory=list)
+    duplicates: list[tuple[str, str]] = field(default_factory=list)  # (repetido, original)
+    oversized: list[str] = field(default_factory=list)
+    bytes_in: int = 0
+    png_saved: int = 0
+
+    @property
+    def bytes_out(self) -> int:
+        return sum(p.path.stat().st_size for p in self.parts if p.path.exists())
+
+    def describe(self) -> str:
+        return (
+            f"{sum(len(p.files) for p in self.parts)} archivos en {len(self.parts)} parte(s), "
+            f"{len(self.duplicates)} duplicados omitidos, "
+            f"{self.bytes_in / 1_048_576:.1f} MB → {self.bytes_out / 1_048_576:.1f} MB "
+            f"(PNG: -{self.png_saved / 1_048_576:.1f} MB)"
+        )
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def optimize_png(src: Path, tmp_dir: Path) -> Path | None:
+    """
+    Recomprime un PNG sin pérdida. Retorna el archivo temporal si quedó más
+    chico (el llamador lo borra) o None si no convenía o no se pudo.
+    """
+    fd, tmp = tempfile.mkstemp(suffix=".png", dir=tmp_dir)
+    os.close(fd)
+    tmp_path = Path(tmp)
+    try:
+        with Image.open(src) as im:
+            # Mismo modo y metadatos de transparencia: solo cambia la compresión
+            im.save(tmp_path, format="PNG", optimize=True)
+        if tmp_path.stat().st_size < src.stat().st_size:
+            return tmp_path
+    except Exception:
+        pass
+    tmp_path.unlink(missing_ok=True)
+    return None
+
+
+class _PartWriter:
+    def __init__(self, dest_dir: Path, prefix: str, part_bytes: int) -> None:
+        self.dest_dir = dest_dir
+        self.prefix = prefix
+        self.part_bytes = part_bytes
+        self.parts: list[Part] = []
+        self._zip: zipfile.ZipFile | None = None
+        self._size = 0
+
+    def _open_next(self) -> None:
+        self.close()
+        part = Part(self.dest_dir / f"{self.prefix}_parte{len(self.parts) + 1:02d}.zip")
+        self.parts.append(part)
+        self._zip = zipfile.ZipFile(part.path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6)
+        self._size = 0
+
+    def add(self, src: Path, arcname: str, stored: bool) -> None:
+        # Cota superior: deflate nunca queda mucho más grande que el original
+        estimate = src.stat().st_size + ENTRY_OVERHEAD
+        if self._zip is None or (self.parts[-1].files and self._size + estimate > self.part_bytes):
+            self._open_next()
+        compression = zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED
+        # ZipFile.write copia en bloques: nunca tiene el archivo entero en memoria
+        self._zip.write(src, arcname, compress_type=compression)
+        self._size += estimate
+        self.parts[-1].files.append(arcname)
+
+    def close(self) -> None:
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+
+
+def package_artifacts(files: list[Path], root: Path, dest_dir: Path,
+                      part_bytes: int = DEFAULT_PART_BYTES, prefix: str = "evidencias",
+                      optimize_pngs: bool = True) -> PackageReport:
+    """
+    Empaqueta `files` (rutas dentro de `root`, que define los nombres en el
+    zip) en dest_dir/<prefix>_parteNN.zip.
+    """
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    report = PackageReport()
+    writer = _PartWriter(dest_dir, prefix, part_bytes)
+    seen: dict[str, str] = {}  # sha256 -> arcname
+
+    try:
+        for f in files:
+            try:
+                arcname = f.resolve().relative_to(root.resolve()).as_posix()
+            except ValueError:
+                arcname = f.name
+            size = f.stat().st_size
+            report.bytes_in += size
+
+            digest = file_sha256(f)
+            if digest in seen:
+                report.duplicates.append((arcname, seen[digest]))
+                continue
+            seen[digest] = arcname
+
+            ext = f.suffix.lower()
+            src = f
+            optimized = optimize_png(f, dest_dir) if optimize_pngs and ext == ".png" else None
+            if optimized is not None:
+                report.png_saved += size - optimized.stat().st_size
+                src = optimized
+            try:
+                if src.stat().st_size + ENTRY_OVERHEAD > part_bytes:
+                    report.oversized.append(arcname)
+                writer.add(src, arcname, stored=ext in STORED_EXTS)
+            finally:
+                if optimized is not None:
+                    optimized.unlink(missing_ok=True)
+    finally:
+        writer.close()
+
+    report.parts = writer.parts
+    return report
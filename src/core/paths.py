@@ -0,0 +1,58 @@
+"""
+Rutas de salida de los escenarios.
+
+main.py le asigna a cada escenario su propia carpeta: por OUTPUT_DIR si
+corre en un subproceso, o con use_output_dir() si corre dentro del mismo
+intérprete (una por hilo, así varios escenarios en paralelo no se pisan).
+Si el script se corre suelto, se usa outputs/ en la raíz del proyecto.
+"""
+from __future__ import annotations
+
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+_output_dir: ContextVar[Path | None] = ContextVar("output_dir", default=None)
+
+
+def outputs_dir() -> Path:
+    p = _output_dir.get() or Path(os.getenv("OUTPUT_DIR") or BASE_DIR / "outputs")
+    p.mkdir(parents=True, exist_ok=True)
+    return p
+
+
+def downloads_dir() -> Path:
+    p = outputs_dir() / "downloads"
+    p.mkdir(parents=True, exist_ok=True)
+    return p
+
+
+@contextmanager
+def use_output_dir(path: Path) -> Iterator[Path]:
+    """Carpeta de salida para el escenario que corre en este hilo."""
+    token = _output_dir.set(Path(path))
+    try:
+        yield Path(path)
+    finally:
+        _output_dir.reset(token)
+
+
+def new_run_dir(root: Path) -> Path:
+    """Carpeta nueva para una corrida de main.py: <root>/runs/<fecha_hora>[_N]/."""
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    runs = root / "runs"
+    runs.mkdir(parents=True, exist_ok=True)
+    n = 0
+    while True:
+        p = runs / (ts if n == 0 else f"{ts}_{n}")
+        try:
+            p.mkdir()
+            return p
+        except FileExistsError:
+            n += 1
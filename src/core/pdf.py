@@ -0,0 +1,152 @@
+"""
+PDF de texto en streaming (sin librerías externas).
+
+TextPdf escribe el texto línea por línea en tantas páginas como haga falta:
+cada página se comprime (FlateDecode) y se escribe al llenarse, y el xref se
+arma con los offsets a medida que salen los objetos. En memoria queda solo
+la página actual (más un offset y un número por página ya escrita).
+
+    with TextPdf(out_path) as pdf:
+        for line in lines:
+            pdf.write_line(line)
+
+    lines_to_pdf(lines, out_path)        # lo mismo, de un iterable
+    make_simple_pdf(text, out_path)      # de un texto multilínea
+
+Helvetica 12 en carta, WinAnsiEncoding (acentos y ñ; lo que no entra en
+cp1252 sale como "?"). Las líneas más largas que el ancho se cortan en
+varias.
+"""
+from __future__ import annotations
+
+import zlib
+from pathlib import Path
+from typing import BinaryIO, Iterable
+
+PAGE_W, PAGE_H = 612, 792
+MARGIN_X, TOP_Y = 50, 760
+FONT_SIZE = 12
+LINE_H = 14
+
+# Líneas por página (mismo alto útil que la versión de una página)
+LINES_PER_PAGE = 55
+
+# Caracteres por línea antes de cortar (Helvetica 12 ≈ 6 pt por carácter promedio en 512 pt)
+WRAP = 90
+
+# Objetos fijos; las páginas empiezan en FIRST_PAGE_OBJ (contenido, página, contenido, ...)
+CATALOG_OBJ, PAGES_OBJ, FONT_OBJ = 1, 2, 3
+FIRST_PAGE_OBJ = 4
+
+
+def _esc(s: str) -> str:
+    # Escapar caracteres especiales de PDF strings
+    return s.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+class TextPdf:
+    def __init__(self, out_path: Path, compress: bool = True, lines_per_page: int = LINES_PER_PAGE,
+                 wrap: int = WRAP) -> None:
+        self.out_path = Path(out_path)
+        self.compress = compress
+        self.lines_per_page = lines_per_page
+        self.wrap = wrap
+        self.pages = 0
+        self.lines = 0
+        self._page: list[str] = []
+        self._offsets: dict[int, int] = {}
+        self._next_obj = FIRST_PAGE_OBJ
+        self.out_path.parent.mkdir(parents=True, exist_ok=True)
+        self._f: BinaryIO = self.out_path.open("wb")
+        self._f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._obj(FONT_OBJ, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+
+    def __enter__(self) -> "TextPdf":
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._f.close()
+
+    def _obj(self, num: int, body: bytes, stream: bytes | None = None) -> None:
+        self._offsets[num] = self._f.tell()
+        self._f.write(f"{num} 0 obj\n".encode())
+        self._f.write(body)
+        if stream is not None:
+            self._f.write(b"\nstream\n")
+            self._f.write(stream)
+            self._f.write(b"\nendstream")
+        self._f.write(b"\nendobj\n")
+
+    def write_line(self, line: str) -> None:
+        line = line.rstrip("\r\n").replace("\t", "    ")
+        chunks = [line[i:i + self.wrap] for i in range(0, len(line), self.wrap)] or [""]
+        for chunk in chunks:
+            self._page.append(chunk)
+            self.lines += 1
+            if len(self._page) >= self.lines_per_page:
+                self._flush_page()
+
+    def write_lines(self, lines: Iterable[str]) -> None:
+        for line in lines:
+            self.write_line(line)
+
+    def _flush_page(self) -> None:
+        # Construir el stream de texto (posición inicial y salto de línea)
+        content = [f"BT /F1 {FONT_SIZE} Tf {MARGIN_X} {TOP_Y} Td {LINE_H} TL"]
+        for i, line in enumerate(self._page):
+            content.append(f"({_esc(line)}) Tj" if i == 0 else f"T* ({_esc(line)}) Tj")
+        content.append("ET")
+        data = "\n".join(content).encode("cp1252", errors="replace")
+        self._page = []
+
+        if self.compress:
+            data = zlib.compress(data, 6)
+            header = f"<< /Length {len(data)} /Filter /FlateDecode >>".encode()
+        else:
+            header = f"<< /Length {len(data)} >>".encode()
+        content_obj, page_obj = self._next_obj, self._next_obj + 1
+        self._next_obj += 2
+        self._obj(content_obj, header, data)
+        self._obj(page_obj, (
+            f"<< /Type /Page /Parent {PAGES_OBJ} 0 R /MediaBox [0 0 {PAGE_W} {PAGE_H}] "
+            f"/Resources << /Font << /F1 {FONT_OBJ} 0 R >> >> /Contents {content_obj} 0 R >>"
+        ).encode())
+        self.pages += 1
+
+    def close(self) -> Path:
+        if self._f.closed:
+            return self.out_path
+        if self._page or self.pages == 0:
+            self._flush_page()
+
+        # Las páginas son los objetos FIRST_PAGE_OBJ + 1, + 3, ...
+        kids = " ".join(f"{FIRST_PAGE_OBJ + 2 * i + 1} 0 R" for i in range(self.pages))
+        self._obj(PAGES_OBJ, f"<< /Type /Pages /Kids [{kids}] /Count {self.pages} >>".encode())
+        self._obj(CATALOG_OBJ, f"<< /Type /Catalog /Pages {PAGES_OBJ} 0 R >>".encode())
+
+        # Escribir xref (en orden de número de objeto, aunque se escribieron en otro orden)
+        size = self._next_obj
+        xref_pos = self._f.tell()
+        self._f.write(f"xref\n0 {size}\n".encode())
+        self._f.write(b"0000000000 65535 f \n")
+        for num in range(1, size):
+            self._f.write(f"{self._offsets[num]:010d} 00000 n \n".encode())
+        self._f.write(f"trailer\n<< /Size {size} /Root {CATALOG_OBJ} 0 R >>\n".encode())
+        self._f.write(f"startxref\n{xref_pos}\n%%EOF\n".encode())
+        self._f.close()
+        return self.out_path
+
+
+def lines_to_pdf(lines: Iterable[str], out_path: Path, compress: bool = True) -> int:
+    """Todas las líneas del iterable, en las páginas que hagan falta. Retorna cuántas escribió."""
+    with TextPdf(out_path, compress=compress) as pdf:
+        pdf.write_lines(lines)
+    return pdf.lines
+
+
+def make_simple_pdf(text: str, out_path: Path) -> None:
+    """PDF a partir de un texto multilínea (\\n, \\r\\n o \\r)."""
+    lines_to_pdf(text.replace("\r\n", "\n").replace("\r", "\n").split("\n"), out_path)
@@ -0,0 +1,117 @@
+"""
+Perfiles de navegador con nombre.
+
+Antes todas las sesiones salían con --start-maximized y cargaban cada
+imagen, fuente y video, aunque el escenario solo leyera texto. Cada
+escenario declara el perfil que necesita y lo pide al pool:
+
+    PROFILE = "throughput"
+
+    with lease_driver(profile=PROFILE) as driver:
+        ...
+
+- "evidence" (default): ventana maximizada y la página completa, para
+  screenshots que se vean como en el navegador.
+- "throughput": headless con viewport fijo, sin imágenes/fuentes/media
+  (Network.setBlockedURLs), sin trackers y sin el tráfico de fondo de Chrome.
+
+BROWSER_PROFILE fuerza un perfil para todos los escenarios (p. ej.
+BROWSER_PROFILE=evidence para ver en pantalla lo que hace un escenario
+"throughput"). main.py lee el PROFILE de cada script sin importarlo
+(declared_profile) para prestarle al subproceso una sesión del perfil correcto.
+"""
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+from selenium.webdriver.chrome.options import Options
+
+
+PROFILE_ENV = "BROWSER_PROFILE"
+DEFAULT_PROFILE = "evidence"
+
+# Patrones de Network.setBlockedURLs ("*" = cualquier cosa)
+BLOCKED_IMAGES = ("*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico")
+BLOCKED_FONTS = ("*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot")
+BLOCKED_MEDIA = ("*.mp4", "*.webm", "*.mp3", "*.ogg")
+BLOCKED_TRACKERS = ("*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*")
+
+# Tráfico propio de Chrome que no tiene nada que ver con la página
+QUIET_ARGS = (
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-extensions",
+    "--no-first-run",
+    "--mute-audio",
+)
+
+_PROFILE_RE = re.compile(r"^PROFILE\s*=\s*[\"'](\w+)[\"']", re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class Profile:
+    name: str
+    headless: bool = False
+    window_size: tuple[int, int] | None = None  # None = maximizada
+    blocked_urls: tuple[str, ...] = ()
+    args: tuple[str, ...] = ()
+
+    def options(self) -> Options:
+        """Opciones de Chrome del perfil (las comunes a todos más las propias)."""
+        opts = Options()
+        if self.headless:
+            opts.add_argument("--headless=new")
+        if self.window_size:
+            opts.add_argument(f"--window-size={self.window_size[0]},{self.window_size[1]}")
+        else:
+            opts.add_argument("--start-maximized")
+        for arg in self.args:
+            opts.add_argument(arg)
+        opts.add_experimental_option("prefs", {
+            "download.prompt_for_download": False,
+            "safebrowsing.enabled": True,
+        })
+        if os.getenv("CHROME_BIN"):
+            opts.binary_location = os.environ["CHROME_BIN"]
+        return opts
+
+    def prepare(self, driver) -> None:
+        """Lo que se configura por CDP en la sesión ya lanzada (y otra vez tras cada reset)."""
+        if self.blocked_urls:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(self.blocked_urls)})
+
+
+PROFILES: dict[str, Profile] = {
+    "evidence": Profile("evidence"),
+    "throughput": Profile(
+        "throughput",
+        headless=True,
+        window_size=(1366, 768),
+        blocked_urls=BLOCKED_IMAGES + BLOCKED_FONTS + BLOCKED_MEDIA + BLOCKED_TRACKERS,
+        args=QUIET_ARGS + ("--blink-settings=imagesEnabled=false",),
+    ),
+}
+
+
+def get_profile(name: str | None = None) -> Profile:
+    """Perfil `name` (o el default); BROWSER_PROFILE, si está, manda sobre lo que pida el escenario."""
+    name = (os.getenv(PROFILE_ENV) or name or DEFAULT_PROFILE).strip().lower()
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Perfil de navegador desconocido: {name!r} (usa {', '.join(PROFILES)})") from None
+
+
+def declared_profile(script_path: Path) -> str | None:
+    """PROFILE = "..." declarado a nivel de módulo en el script (sin importarlo)."""
+    try:
+        m = _PROFILE_RE.search(Path(script_path).read_text(encoding="utf-8"))
+    except OSError:
+        return None
+    return m.group(1) if m else None
@@ -0,0 +1,74 @@
+"""
+Registro de escenarios de src/.
+
+Cada src/NN_*.py expone `main()` y solo se ejecuta solo bajo
+`if __name__ == "__main__"`, así que se puede importar sin lanzar nada.
+main.py los descubre aquí y los corre dentro del mismo intérprete, sin
+pagar un python nuevo + imports de selenium/openpyxl/yaml por escenario.
+"""
+from __future__ import annotations
+
+import importlib.util
+import re
+import sys
+from pathlib import Path
+from types import ModuleType
+from typing import Callable
+
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+
+# 01_add_remove_elements.py, 05.2_dynamic_loading_2.py, ...
+SCENARIO_RE = re.compile(r"^\d+(\.\d+)?_\w+\.py$")
+
+
+class Scenario:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.name = path.name
+        self._module: ModuleType | None = None
+
+    def __repr__(self) -> str:
+        return f"Scenario({self.name!r})"
+
+    @property
+    def module_name(self) -> str:
+        # Los nombres empiezan con dígitos (y 05.2 tiene punto): no son importables tal cual
+        return "scenario_" + self.path.stem.replace(".", "_")
+
+    def load(self) -> ModuleType:
+        """Importa el módulo una sola vez (no corre el escenario)."""
+        if self._module is None:
+            spec = importlib.util.spec_from_file_location(self.module_name, self.path)
+            if spec is None or spec.loader is None:
+                raise ImportError(f"No se pudo cargar {self.path}")
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[self.module_name] = module
+            try:
+                spec.loader.exec_module(module)
+            except BaseException:
+                sys.modules.pop(self.module_name, None)
+                raise
+            self._module = module
+        return self._module
+
+    @property
+    def entry(self) -> Callable[[], None] | None:
+        """main() del escenario, o None si el script no lo expone (p. ej. vacío)."""
+        fn = getattr(self.load(), "main", None)
+        return fn if callable(fn) else None
+
+    def run(self) -> None:
+        entry = self.entry
+        if entry is None:
+            raise RuntimeError(f"{self.name} no expone main()")
+        entry()
+
+
+def discover(src_dir: Path = SRC_DIR) -> dict[str, Scenario]:
+    """{nombre_archivo: Scenario} para cada src/NN_*.py, ordenado por nombre."""
+    return {
+        p.name: Scenario(p)
+        for p in sorted(src_dir.iterdir())
+        if p.is_file() and SCENARIO_RE.match(p.name)
+    }
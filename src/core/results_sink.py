@@ -0,0 +1,272 @@
+"""
+Resultados tabulares de los escenarios en un solo libro por corrida.
+
+Cada escenario arma sus filas con results_sheet() y estas van a un spool
+JSONL en <carpeta del escenario>/results/<hoja>.jsonl, escrito y volcado
+de a poco (memoria constante aunque se extraigan miles de filas, y sin
+costo de openpyxl dentro del escenario):
+
+    with results_sheet("BOTTOM", header=["Texto (BOTTOM)"]) as sheet:
+        sheet.append([bottom_text])
+        sheet.write_frame(df)          # DataFrames grandes, por bloques
+
+Al final de la corrida main.py junta todos los spools con merge_results():
+un .xlsx en modo write-only (una hoja por escenario), o CSV / Parquet con
+--results-format. Si el escenario corre suelto (sin main.py), al cerrar
+la hoja se arma el libro en su propia carpeta, solo con las hojas de esta
+invocación (los spools de corridas sueltas anteriores se descartan).
+"""
+from __future__ import annotations
+
+import csv
+import json
+import os
+import re
+import shutil
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from core.manifest import register_artifact
+from core.paths import outputs_dir
+
+
+RESULTS_DIR = "results"
+RESULTS_NAME = "resultados"
+FORMATS = ("xlsx", "csv", "parquet")
+
+# main.py la define: la corrida junta los resultados al final (los escenarios no)
+RESULTS_MANAGED_ENV = "RESULTS_MANAGED"
+
+# Filas por volcado del spool / por row group de Parquet
+FLUSH_ROWS = 1000
+
+# Excel: hasta 31 caracteres y sin []:*?/\
+_BAD_TITLE = re.compile(r"[\[\]:*?/\\]")
+
+
+def _cell(value: Any) -> Any:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    try:  # numpy / pandas escalares
+        return value.item()
+    except (AttributeError, ValueError):
+        return str(value)
+
+
+class Sheet:
+    def __init__(self, path: Path, header: list[str] | None = None) -> None:
+        self.path = path
+        self.rows = 0
+        self._pending = 0
+        new = not path.exists() or path.stat().st_size == 0
+        self._f = path.open("a", encoding="utf-8")
+        if header and new:
+            self._write({"header": [str(h) for h in header]})
+
+    def _write(self, record: dict) -> None:
+        self._f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._pending += 1
+        if self._pending >= FLUSH_ROWS:
+            self._f.flush()
+            self._pending = 0
+
+    def append(self, row: Iterable[Any]) -> None:
+        self._write({"row": [_cell(v) for v in row]})
+        self.rows += 1
+
+    def extend(self, rows: Iterable[Iterable[Any]]) -> None:
+        for row in rows:
+            self.append(row)
+
+    def write_frame(self, frame, index: bool = False) -> None:
+        """Filas de un DataFrame (sin copiarlo entero a listas de Python)."""
+        for row in frame.itertuples(index=index, name=None):
+            self.append(row)
+
+    def close(self) -> None:
+        self._f.close()
+
+
+# Carpetas de spools sueltas (sin main.py) ya empezadas por este proceso
+_standalone_dirs: set[Path] = set()
+_standalone_lock = threading.Lock()
+
+
+def _spool_name(name: str) -> str:
+    return re.sub(r"[^\w.&-]+", "_", name).strip("_") or "hoja"
+
+
+@contextmanager
+def results_sheet(name: str, header: list[str] | None = None) -> Iterator[Sheet]:
+    """Hoja `name` de la carpeta de salida actual (si ya existe en esta corrida, se agregan filas)."""
+    managed = bool(os.getenv(RESULTS_MANAGED_ENV))
+    spool_dir = outputs_dir() / RESULTS_DIR
+    if not managed:
+        # Suelto, outputs/ es la misma carpeta en cada invocación: la primera
+        # hoja de este proceso descarta los spools que dejaron las anteriores
+        with _standalone_lock:
+            if spool_dir not in _standalone_dirs:
+                shutil.rmtree(spool_dir, ignore_errors=True)
+                _standalone_dirs.add(spool_dir)
+    spool_dir.mkdir(parents=True, exist_ok=True)
+    path = spool_dir / f"{_spool_name(name)}.jsonl"
+    sheet = Sheet(path, header)
+    # El título original se guarda al lado (el nombre del archivo va saneado)
+    title_file = path.with_suffix(".title")
+    if not title_file.exists():
+        title_file.write_text(name, encoding="utf-8")
+    try:
+        yield sheet
+    finally:
+        sheet.close()
+    if not managed:
+        for p in merge_spools(_dir_spools(spool_dir), outputs_dir()):
+            register_artifact(p)
+
+
+# =========================
+# Merge
+# =========================
+def _dir_spools(d: Path, prefix: str = "") -> list[tuple[str, Path]]:
+    """(título, spool) de una carpeta results/."""
+    out = []
+    if not d.is_dir():
+        return out
+    for spool in sorted(d.glob("*.jsonl")):
+        title_file = spool.with_suffix(".title")
+        name = title_file.read_text(encoding="utf-8") if title_file.exists() else spool.stem
+        out.append((f"{prefix} {name}".strip(), spool))
+    return out
+
+
+def _spools(root: Path) -> list[tuple[str, Path]]:
+    """(título, spool) de root/results/ y de cada root/<escenario>/results/."""
+    out = _dir_spools(root / RESULTS_DIR)
+    for d in sorted(p for p in root.iterdir() if p.is_dir()):
+        out.extend(_dir_spools(d / RESULTS_DIR, d.name.split("_", 1)[0]))
+    return out
+
+
+def _read(spool: Path) -> Iterator[tuple[str, list[Any]]]:
+    with spool.open("r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            rec = json.loads(line)
+            if "header" in rec:
+                yield "header", rec["header"]
+            else:
+                yield "row", rec["row"]
+
+
+def _titles(names: list[str]) -> list[str]:
+    out, seen = [], set()
+    for name in names:
+        base = _BAD_TITLE.sub("_", name)[:31] or "hoja"
+        title, k = base, 2
+        while title.lower() in seen:
+            suffix = f" ({k})"
+            title, k = base[:31 - len(suffix)] + suffix, k + 1
+        seen.add(title.lower())
+        out.append(title)
+    return out
+
+
+def merge_results(root: Path, dest_dir: Path, fmt: str = "xlsx") -> list[Path]:
+    """
+    Junta los spools de `root` en dest_dir/resultados.<fmt> (CSV: una carpeta
+    con un archivo por hoja). Retorna lo escrito; [] si no hay resultados.
+    """
+    return merge_spools(_spools(root), dest_dir, fmt)
+
+
+def merge_spools(spools: list[tuple[str, Path]], dest_dir: Path, fmt: str = "xlsx") -> list[Path]:
+    """Los spools (título, ruta) en dest_dir/resultados.<fmt>."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato de resultados no soportado: {fmt} (usa {', '.join(FORMATS)})")
+    if not spools:
+        return []
+    titles = _titles([t for t, _ in spools])
+    sheets = list(zip(titles, (s for _, s in spools)))
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    if fmt == "xlsx":
+        return [_write_xlsx(sheets, dest_dir / f"{RESULTS_NAME}.xlsx")]
+    if fmt == "csv":
+        return _write_csv(sheets, dest_dir / RESULTS_NAME)
+    return _write_parquet(sheets, dest_dir / RESULTS_NAME)
+
+
+def _write_xlsx(sheets: list[tuple[str, Path]], path: Path) -> Path:
+    from openpyxl import Workbook
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+    # write_only: las filas van a disco a medida que se agregan, no quedan en memoria
+    wb = Workbook(write_only=True)
+    for title, spool in sheets:
+        ws = wb.create_sheet(title)
+        for _, row in _read(spool):
+            ws.append([ILLEGAL_CHARACTERS_RE.sub("", v) if isinstance(v, str) else v for v in row])
+    wb.save(str(path))
+    return path
+
+
+def _write_csv(sheets: list[tuple[str, Path]], folder: Path) -> list[Path]:
+    folder.mkdir(parents=True, exist_ok=True)
+    out = []
+    for title, spool in sheets:
+        path = folder / f"{title}.csv"
+        # utf-8-sig: Excel lo abre con los acentos bien
+        with path.open("w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(f)
+            for _, row in _read(spool):
+                writer.writerow(row)
+        out.append(path)
+    return out
+
+
+def _write_parquet(sheets: list[tuple[str, Path]], folder: Path) -> list[Path]:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("--results-format parquet requiere pyarrow (pip install pyarrow)") from e
+
+    folder.mkdir(parents=True, exist_ok=True)
+    out = []
+    for title, spool in sheets:
+        path = folder / f"{title}.parquet"
+        header: list[str] | None = None
+        batch: list[list[Any]] = []
+        writer = None
+        schema = None
+
+        def flush() -> None:
+            nonlocal writer, schema
+            if not batch:
+                return
+            width = max(len(header or []), *(len(r) for r in batch))
+            names = list(header or []) + [f"c{i + 1}" for i in range(len(header or []), width)]
+            # Texto en todas las columnas: los escenarios mezclan tipos por columna
+            cols = {n: [None if i >= len(r) or r[i] is None else str(r[i]) for r in batch]
+                    for i, n in enumerate(names)}
+            if schema is None:
+                schema = pa.schema([(n, pa.string()) for n in names])
+                writer = pq.ParquetWriter(str(path), schema)
+            table = pa.table({n: cols.get(n, [None] * len(batch)) for n in schema.names}, schema=schema)
+            writer.write_table(table)
+            batch.clear()
+
+        for kind, row in _read(spool):
+            if kind == "header":
+                header = row
+                continue
+            batch.append(row)
+            if len(batch) >= FLUSH_ROWS:
+                flush()
+        flush()
+        if writer is not None:
+            writer.close()
+            out.append(path)
+    return out
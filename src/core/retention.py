@@ -0,0 +1,191 @@
+"""
+Retención de outputs/: borra corridas viejas según edad, cantidad y tamaño.
+
+Para no recorrer todo outputs/ en cada corrida se mantiene un índice en
+outputs/runs/index.json con el tamaño de cada corrida (se calcula una sola
+vez, al terminar la corrida). La limpieza trabaja sobre el índice y solo
+toca disco para borrar.
+
+Los archivos sueltos del formato anterior (outputs/*.png, outputs/downloads/)
+se revisan incrementalmente: como mucho `legacy_batch` por corrida,
+retomando donde quedó la vez anterior.
+"""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import yaml
+
+from core.paths import BASE_DIR
+
+
+RETENTION_FILE = BASE_DIR / "config" / "retention.yml"
+INDEX_NAME = "index.json"
+
+DAY = 86_400
+
+# Corridas fuera del índice que se miden por llamada (medir = recorrer la carpeta)
+RECONCILE_LIMIT = 10
+
+
+@dataclass
+class RetentionPolicy:
+    max_age_days: float = 14
+    max_runs: int = 30
+    max_bytes: int = 2_000_000_000
+    legacy_max_age_days: float = 14
+    legacy_batch: int = 500
+
+    @classmethod
+    def load(cls, path: Path = RETENTION_FILE) -> "RetentionPolicy":
+        if not path.exists():
+            return cls()
+        with path.open("r", encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+        known = {k: v for k, v in data.items() if k in cls.__dataclass_fields__}
+        return cls(**known)
+
+
+@dataclass
+class RetentionReport:
+    runs_deleted: list[str] = field(default_factory=list)
+    bytes_freed: int = 0
+    legacy_deleted: int = 0
+    runs_kept: int = 0
+    bytes_kept: int = 0
+
+    def describe(self) -> str:
+        return (
+            f"{len(self.runs_deleted)} corridas borradas, {self.legacy_deleted} archivos sueltos borrados, "
+            f"{self.bytes_freed / 1_048_576:.1f} MB liberados; quedan {self.runs_kept} corridas "
+            f"({self.bytes_kept / 1_048_576:.1f} MB)"
+        )
+
+
+def dir_size(path: Path) -> int:
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.stat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+class RunIndex:
+    """outputs/runs/index.json: {"runs": {id: {"created": epoch, "bytes": n}}, "legacy_cursor": {...}}"""
+
+    def __init__(self, runs_dir: Path) -> None:
+        self.runs_dir = runs_dir
+        self.path = runs_dir / INDEX_NAME
+        self.runs: dict[str, dict] = {}
+        self.legacy_cursor: dict[str, str] = {}
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                self.runs = data.get("runs", {})
+                self.legacy_cursor = data.get("legacy_cursor", {})
+            except (OSError, ValueError):
+                # Índice corrupto: se reconstruye con las corridas que haya
+                self.runs = {}
+
+    def save(self) -> None:
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps({"runs": self.runs, "legacy_cursor": self.legacy_cursor}, indent=1),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self.path)
+
+    def record(self, run_dir: Path) -> None:
+        self.runs[run_dir.name] = {"created": run_dir.stat().st_mtime, "bytes": dir_size(run_dir)}
+
+    def reconcile(self, limit: int) -> None:
+        """
+        Agrega corridas que no están en el índice (p. ej. una corrida que se cayó)
+        y quita las que ya no existen. Mide como mucho `limit` corridas nuevas.
+        """
+        on_disk = {e.name for e in os.scandir(self.runs_dir) if e.is_dir()}
+        for run_id in list(self.runs):
+            if run_id not in on_disk:
+                del self.runs[run_id]
+        for run_id in sorted(on_disk - set(self.runs))[:limit]:
+            self.record(self.runs_dir / run_id)
+
+
+def _sweep_legacy(outputs: Path, index: RunIndex, policy: RetentionPolicy,
+                  now: float, report: RetentionReport) -> None:
+    """Borra archivos sueltos viejos de outputs/ y outputs/downloads/, de a `legacy_batch`."""
+    budget = policy.legacy_batch
+    cutoff = now - policy.legacy_max_age_days * DAY
+    for folder in (outputs, outputs / "downloads"):
+        if budget <= 0 or not folder.is_dir():
+            continue
+        key = folder.relative_to(outputs).as_posix()
+        cursor = index.legacy_cursor.get(key, "")
+        names = sorted(e.name for e in os.scandir(folder) if e.is_file())
+        pending = [n for n in names if n > cursor][:budget]
+        for name in pending:
+            p = folder / name
+            try:
+                st = p.stat()
+                if st.st_mtime < cutoff:
+                    p.unlink()
+                    report.legacy_deleted += 1
+                    report.bytes_freed += st.st_size
+            except OSError:
+                pass
+        budget -= len(pending)
+        # Al llegar al final se vuelve a empezar en la próxima corrida
+        index.legacy_cursor[key] = pending[-1] if len(pending) and pending[-1] != names[-1] else ""
+
+
+def apply_retention(outputs: Path, current_run: Path | None = None,
+                    policy: RetentionPolicy | None = None, now: float | None = None) -> RetentionReport:
+    """
+    Registra la corrida actual en el índice y borra corridas hasta cumplir
+    la política. Pensado para llamarse una vez al final de main.py.
+    """
+    policy = policy or RetentionPolicy.load()
+    now = time.time() if now is None else now
+    runs_dir = outputs / "runs"
+    runs_dir.mkdir(parents=True, exist_ok=True)
+    report = RetentionReport()
+
+    index = RunIndex(runs_dir)
+    if current_run is not None and current_run.exists():
+        index.record(current_run)
+    index.reconcile(limit=RECONCILE_LIMIT)
+
+    # De la más vieja a la más nueva
+    ordered = sorted(index.runs.items(), key=lambda kv: kv[1]["created"])
+    total = sum(info["bytes"] for _, info in ordered)
+    count = len(ordered)
+    cutoff = now - policy.max_age_days * DAY
+
+    for run_id, info in ordered:
+        if current_run is not None and run_id == current_run.name:
+            continue
+        too_old = info["created"] < cutoff
+        if not (too_old or count > policy.max_runs or total > policy.max_bytes):
+            # Lo que sigue es más nuevo: solo podría sobrar por cantidad/tamaño, y ya no sobra
+            break
+        shutil.rmtree(runs_dir / run_id, ignore_errors=True)
+        del index.runs[run_id]
+        report.runs_deleted.append(run_id)
+        report.bytes_freed += info["bytes"]
+        total -= info["bytes"]
+        count -= 1
+
+    _sweep_legacy(outputs, index, policy, now, report)
+
+    index.save()
+    report.runs_kept = len(index.runs)
+    report.bytes_kept = sum(info["bytes"] for info in index.runs.values())
+    return report
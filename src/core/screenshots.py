@@ -0,0 +1,212 @@
+"""
+Screenshots de evidencia escritos en segundo plano.
+
+driver.save_screenshot() bloquea el escenario mientras el PNG llega en
+base64, se decodifica y se escribe. Aquí el escenario solo pide la captura
+(un comando de WebDriver) y un hilo aparte la decodifica, la recorta al
+elemento si se pidió, la achica, la recodifica (JPEG/WebP con Pillow) y la
+escribe; el escenario sigue mientras tanto:
+
+    with evidence() as shots:
+        path = shots.capture(driver, stamp("login_ok", "png"))
+        shots.capture(driver, stamp("flash", "png"), element=flash)  # solo el elemento
+    # al salir del bloque los archivos ya están escritos y registrados
+
+capture() retorna enseguida la ruta final (la extensión cambia según el
+formato). Los errores de escritura se lanzan al salir del bloque.
+
+Por defecto la evidencia queda como antes: PNG de Chrome sin achicar. La
+recodificación se activa con variables de entorno:
+- SCREENSHOT_FORMAT: "png" (default, PNG tal cual llega de Chrome), "jpeg" o "webp".
+- SCREENSHOT_QUALITY: calidad JPEG/WebP (default 80).
+- SCREENSHOT_MAX_WIDTH: ancho máximo en px; 0 = sin achicar (default).
+Sin Pillow se guarda el PNG original (con extensión .png), sin recortes ni
+recodificación.
+"""
+from __future__ import annotations
+
+import atexit
+import base64
+import contextvars
+import importlib.util
+import io
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+from core import events, tracing
+from core.manifest import register_artifact
+
+
+FORMAT_ENV = "SCREENSHOT_FORMAT"
+QUALITY_ENV = "SCREENSHOT_QUALITY"
+MAX_WIDTH_ENV = "SCREENSHOT_MAX_WIDTH"
+
+FORMATS = {"png": ".png", "jpeg": ".jpg", "webp": ".webp"}
+
+# Margen alrededor del elemento en los recortes (px CSS)
+CROP_MARGIN = 8
+
+_RECT_JS = """
+const el = arguments[0];
+el.scrollIntoView({block: 'nearest', inline: 'nearest'});
+const r = el.getBoundingClientRect();
+return [r.left, r.top, r.width, r.height, window.devicePixelRatio || 1];
+"""
+
+
+@dataclass
+class ShotOptions:
+    format: str = "png"
+    quality: int = 80
+    max_width: int = 0
+
+    @classmethod
+    def from_env(cls) -> "ShotOptions":
+        fmt = (os.getenv(FORMAT_ENV) or "png").strip().lower()
+        fmt = "jpeg" if fmt == "jpg" else fmt
+        if fmt not in FORMATS:
+            raise ValueError(f"{FORMAT_ENV}={fmt!r} no es válido (usa {', '.join(FORMATS)})")
+        return cls(fmt, int(os.getenv(QUALITY_ENV) or 80), int(os.getenv(MAX_WIDTH_ENV) or 0))
+
+
+@dataclass
+class _Job:
+    png_b64: str
+    path: Path
+    options: ShotOptions
+    clip: tuple[float, float, float, float, float] | None
+    context: contextvars.Context
+    future: Future
+
+
+def has_pillow() -> bool:
+    return importlib.util.find_spec("PIL") is not None
+
+
+def encode(png: bytes, options: ShotOptions, clip: tuple[float, ...] | None = None) -> bytes:
+    """PNG de Chrome -> bytes finales (recorte, achicado y formato). Sin Pillow, el PNG tal cual."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return png
+    if options.format == "png" and clip is None and not options.max_width:
+        return png
+
+    with Image.open(io.BytesIO(png)) as img:
+        img.load()
+        if clip is not None:
+            x, y, w, h, ratio = clip
+            m = CROP_MARGIN
+            box = (max(0, int((x - m) * ratio)), max(0, int((y - m) * ratio)),
+                   min(img.width, int((x + w + m) * ratio)), min(img.height, int((y + h + m) * ratio)))
+            if box[2] > box[0] and box[3] > box[1]:
+                img = img.crop(box)
+        if options.max_width and img.width > options.max_width:
+            img = img.resize((options.max_width, max(1, round(img.height * options.max_width / img.width))),
+                             Image.LANCZOS)
+        out = io.BytesIO()
+        if options.format == "jpeg":
+            img.convert("RGB").save(out, "JPEG", quality=options.quality, optimize=True)
+        elif options.format == "webp":
+            img.save(out, "WEBP", quality=options.quality, method=4)
+        else:
+            img.save(out, "PNG", optimize=True)
+        return out.getvalue()
+
+
+class _Writer:
+    """Un hilo por proceso que decodifica y escribe las capturas en orden de llegada."""
+
+    def __init__(self) -> None:
+        self._queue: queue.Queue[_Job] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, job: _Job) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="screenshot-writer", daemon=True)
+                self._thread.start()
+        self._queue.put(job)
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                # En el contexto del escenario: carpeta de salida, traza y etiqueta de eventos
+                job.context.run(self._write, job)
+                job.future.set_result(job.path)
+            except Exception as e:  # noqa: BLE001 - se lanza en el hilo del escenario
+                job.future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+    @staticmethod
+    def _write(job: _Job) -> None:
+        start = time.time()
+        t0 = time.perf_counter()
+        png = base64.b64decode(job.png_b64)
+        data = encode(png, job.options, job.clip)
+        job.path.parent.mkdir(parents=True, exist_ok=True)
+        part = job.path.with_name(job.path.name + ".part")
+        part.write_bytes(data)
+        os.replace(part, job.path)
+        register_artifact(job.path)
+        duration = time.perf_counter() - t0
+        tracing.add_span("screenshotWrite", "command", start, duration,
+                         path=job.path.name, bytes_in=len(png), bytes_out=len(data))
+        events.emit("screenshot", path=job.path.name, png_bytes=len(png), bytes=len(data),
+                    duration=round(duration, 6))
+
+    def drain(self) -> None:
+        self._queue.join()
+
+
+_writer = _Writer()
+atexit.register(_writer.drain)
+
+
+class Evidence:
+    def __init__(self, options: ShotOptions | None = None) -> None:
+        self.options = options or ShotOptions.from_env()
+        self._pending: list[Future] = []
+
+    def capture(self, driver, path: Path, element=None) -> Path:
+        """
+        Pide la captura (pantalla visible, o solo `element`) y la deja en cola.
+        Retorna la ruta con la que quedará escrita.
+        """
+        clip = tuple(driver.execute_script(_RECT_JS, element)) if element is not None else None
+        png_b64 = driver.get_screenshot_as_base64()
+        # Sin Pillow encode() deja el PNG tal cual: la extensión tiene que decirlo
+        fmt = self.options.format if has_pillow() else "png"
+        path = Path(path).with_suffix(FORMATS[fmt])
+        future: Future = Future()
+        _writer.submit(_Job(png_b64, path, self.options, clip, contextvars.copy_context(), future))
+        self._pending.append(future)
+        return path
+
+    def wait(self) -> list[Path]:
+        """Espera las capturas pendientes; lanza el primer error de escritura."""
+        pending, self._pending = self._pending, []
+        return [f.result() for f in pending]
+
+
+@contextmanager
+def evidence(options: ShotOptions | None = None) -> Iterator[Evidence]:
+    shots = Evidence(options)
+    try:
+        yield shots
+    except BaseException:
+        # Que terminen de escribirse, sin tapar el error original con uno de escritura
+        for f in shots._pending:
+            f.exception()
+        raise
+    shots.wait()
@@ -0,0 +1,24 @@
+"""
+URL base del sitio bajo prueba.
+
+Por defecto el sitio público; con BASE_URL apunta a otro (p. ej. la réplica
+local de core.site_standin, para medir sin la latencia de internet):
+
+    BASE_URL=http://127.0.0.1:8000 python main.py
+"""
+from __future__ import annotations
+
+import os
+
+
+BASE_URL_ENV = "BASE_URL"
+DEFAULT_BASE_URL = "https://the-internet.herokuapp.com"
+
+
+def base_url() -> str:
+    return (os.getenv(BASE_URL_ENV, "").strip() or DEFAULT_BASE_URL).rstrip("/")
+
+
+def site_url(path: str) -> str:
+    """site_url("/checkboxes") -> "<BASE_URL>/checkboxes" (se lee en cada llamada)."""
+    return base_url() + "/" + path.lstrip("/")
@@ -0,0 +1,478 @@
+"""
+Réplica local de las páginas de the-internet.herokuapp.com que usan los escenarios.
+
+Sirve para medir el pipeline sin la latencia variable del sitio público:
+cada respuesta espera `latency` segundos (± `jitter`), y las cargas
+dinámicas tardan `dynamic_delay`. Los escenarios la usan con BASE_URL:
+
+    with SiteStandIn(latency=0.05) as site:
+        os.environ["BASE_URL"] = site.base_url
+
+o desde la línea de comandos: python bench.py scenarios --serve
+
+Páginas: add_remove_elements, checkboxes, context_menu, dropdown,
+dynamic_loading/1 y /2, download, download_secure (Basic Auth admin/admin),
+login (tomsmith / SuperSecretPassword!), nested_frames, large, windows y
+notification_message_rendered. Solo lo que leen los escenarios, no el
+sitio completo. Cada página pide además una hoja de estilos, una fuente y
+una imagen (ASSET_KB cada una), como el sitio real: es lo que el perfil
+"throughput" deja de cargar.
+"""
+from __future__ import annotations
+
+import base64
+import io
+import random
+import struct
+import threading
+import time
+import zipfile
+import zlib
+from functools import lru_cache
+from http import HTTPStatus
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+
+LOGIN_USER = "tomsmith"
+LOGIN_PASS = "SuperSecretPassword!"
+SECURE_USER = "admin"
+SECURE_PASS = "admin"
+
+DOWNLOADS = {
+    "some-file.txt": b"Archivo de prueba del sitio local.\n",
+    "data.json": b'{"ok": true, "items": [1, 2, 3]}\n',
+}
+
+LARGE_SIZE = 50
+
+ASSET_KB = 64
+
+_ASSETS_HEAD = "<link rel='stylesheet' href='/css/app.css'>"
+_FORK_ME = "<img src='/img/forkme_right_green.png' alt='Fork me on GitHub' style='position:absolute;top:0;right:0'>"
+
+
+def _page(title: str, body: str, head: str = "") -> str:
+    return (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+        f"<title>{title}</title>{_ASSETS_HEAD}{head}</head>"
+        f"<body>{_FORK_ME}<div id='content' class='large-10 columns large-centered'>{body}</div></body></html>"
+    )
+
+
+@lru_cache(maxsize=1)
+def _asset_css() -> bytes:
+    return (
+        "@font-face { font-family: 'SiteFont'; src: url('/fonts/site.woff') format('woff'); }\n"
+        "body { font-family: 'SiteFont', Helvetica, Arial, sans-serif; margin: 0; }\n"
+        "#content { padding: 20px; }\n"
+    ).encode()
+
+
+@lru_cache(maxsize=1)
+def _asset_png() -> bytes:
+    """PNG válido de ~ASSET_KB con ruido (no se comprime)."""
+    rnd = random.Random(0)
+    width = 128
+    height = max(1, ASSET_KB * 1024 // (width * 3))
+    raw = b"".join(b"\x00" + rnd.randbytes(width * 3) for _ in range(height))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", ihdr) + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b"")
+
+
+@lru_cache(maxsize=1)
+def _asset_font() -> bytes:
+    # Solo cuenta el peso: Chrome la rechaza y usa la fuente de respaldo
+    return b"wOFF" + random.Random(1).randbytes(ASSET_KB * 1024 - 4)
+
+
+def _flash(message: str, kind: str = "success") -> str:
+    return f"<div id='flash' class='flash {kind}'>{message}<a class='close' href='#'>×</a></div>"
+
+
+@lru_cache(maxsize=1)
+def _secure_zip() -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("testFile/DemoFile.txt", "Demo file\n" + "\n".join(f"Línea {i}" for i in range(1, 21)) + "\n")
+        z.writestr("testFile/readme.md", "# testFile\n")
+    return buf.getvalue()
+
+
+@lru_cache(maxsize=1)
+def _large_html() -> str:
+    # Lista anidada (profunda) + tabla de LARGE_SIZE x LARGE_SIZE
+    n = LARGE_SIZE
+    siblings = []
+    for r in range(1, n + 1):
+        siblings.append("<ul>" + "".join(f"<li class='parent'>{r}.{c}</li>" for c in range(1, 4)) + "<li>")
+    siblings.append("</li></ul>" * n)
+    head = "<tr>" + "".join(f"<th>{c}</th>" for c in range(1, n + 1)) + "</tr>"
+    rows = "".join(
+        f"<tr class='row-{r}'>" + "".join(f"<td>{r}.{c}</td>" for c in range(1, n + 1)) + "</tr>"
+        for r in range(1, n + 1)
+    )
+    body = (
+        "<h3>Large &amp; Deep DOM</h3>"
+        f"<div id='siblings'>{''.join(siblings)}</div>"
+        f"<table id='large-table'><thead>{head}</thead><tbody>{rows}</tbody></table>"
+    )
+    return _page("Large & Deep DOM", body)
+
+
+def _downloads_list(prefix: str, names: list[str]) -> str:
+    links = "".join(f"<a href='{prefix}/{quote(n)}'>{n}</a><br>" for n in names)
+    return f"<div class='example'><h3>File Downloader</h3>{links}</div>"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_Server"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002
+        pass
+
+    # ---------- respuesta ----------
+    def _delay(self) -> None:
+        srv = self.server
+        if srv.latency or srv.jitter:
+            time.sleep(max(0.0, srv.latency + srv.rng_uniform(-srv.jitter, srv.jitter)))
+
+    def send(self, body: bytes | str, status: int = 200, ctype: str = "text/html; charset=utf-8",
+             headers: dict[str, str] | None = None) -> None:
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        self._delay()
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "no-store")
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(data)
+
+    def redirect(self, location: str, cookies: dict[str, str] | None = None) -> None:
+        self._delay()
+        self.send_response(HTTPStatus.FOUND)
+        self.send_header("Location", location)
+        for k, v in (cookies or {}).items():
+            self.send_header("Set-Cookie", f"{k}={quote(v)}; Path=/")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def cookies(self) -> dict[str, str]:
+        jar = SimpleCookie(self.headers.get("Cookie", ""))
+        return {k: unquote(m.value) for k, m in jar.items()}
+
+    def take_flash(self) -> tuple[str, dict[str, str]]:
+        """Mensaje flash pendiente (cookie) y el header para borrarlo."""
+        msg = self.cookies().get("flash", "")
+        clear = {"Set-Cookie": "flash=; Path=/; Max-Age=0"} if msg else {}
+        return msg, clear
+
+    def authorized(self) -> bool:
+        expected = base64.b64encode(f"{SECURE_USER}:{SECURE_PASS}".encode()).decode()
+        return self.headers.get("Authorization", "") == f"Basic {expected}"
+
+    # ---------- rutas ----------
+    def do_HEAD(self) -> None:
+        self.do_GET()
+
+    def do_GET(self) -> None:
+        path = urlsplit(self.path).path.rstrip("/") or "/"
+        handler = ROUTES.get(path)
+        if handler is not None:
+            return handler(self)
+        if path.startswith("/download/"):
+            return self.file(unquote(path[len("/download/"):]))
+        if path.startswith("/download_secure/"):
+            if not self.authorized():
+                return self.unauthorized()
+            return self.file(unquote(path[len("/download_secure/"):]), secure=True)
+        self.send(_page("Not Found", "<h1>Not Found</h1>"), status=404)
+
+    def do_POST(self) -> None:
+        path = urlsplit(self.path).path
+        length = int(self.headers.get("Content-Length", "0") or 0)
+        form = parse_qs(self.rfile.read(length).decode("utf-8")) if length else {}
+        if path == "/authenticate":
+            user = form.get("username", [""])[0]
+            password = form.get("password", [""])[0]
+            if user == LOGIN_USER and password == LOGIN_PASS:
+                return self.redirect("/secure", {"session": "ok", "flash": "You logged into a secure area!"})
+            msg = "Your username is invalid!" if user != LOGIN_USER else "Your password is invalid!"
+            return self.redirect("/login", {"flash": msg})
+        self.send(_page("Not Found", "<h1>Not Found</h1>"), status=404)
+
+    def unauthorized(self) -> None:
+        self.send("Not authorized", status=401, ctype="text/plain",
+                  headers={"WWW-Authenticate": 'Basic realm="Restricted Area"'})
+
+    def file(self, name: str, secure: bool = False) -> None:
+        data = _secure_zip() if secure and name == "testFile.zip" else DOWNLOADS.get(name)
+        if data is None:
+            return self.send(_page("Not Found", "<h1>Not Found</h1>"), status=404)
+        self.send(data, ctype="application/octet-stream",
+                  headers={"Content-Disposition": f'attachment; filename="{name}"'})
+
+    def asset(self, data: bytes, ctype: str) -> None:
+        self.send(data, ctype=ctype)
+
+    def home(self) -> None:
+        links = "".join(f"<li><a href='{p}'>{p.strip('/')}</a></li>" for p in ROUTES
+                        if p != "/" and p not in ASSET_ROUTES)
+        self.send(_page("The Internet (local)", f"<h1>Welcome to the-internet</h1><ul>{links}</ul>"))
+
+    def add_remove(self) -> None:
+        script = (
+            "<script>"
+            "function addElement(){var b=document.createElement('button');"
+            "b.className='added-manually';b.textContent='Delete';b.setAttribute('onclick','deleteElement()');"
+            "document.getElementById('elements').appendChild(b);}"
+            "function deleteElement(){var e=document.getElementsByClassName('added-manually');"
+            "if(e.length){e[e.length-1].remove();}}"
+            "</script>"
+        )
+        body = (
+            "<div class='example'><h3>Add/Remove Elements</h3>"
+            "<button onclick='addElement()'>Add Element</button>"
+            "<div id='elements'></div></div>"
+        )
+        self.send(_page("Add/Remove Elements", body, head=script))
+
+    def checkboxes(self) -> None:
+        body = (
+            "<div class='example'><h3>Checkboxes</h3><form id='checkboxes'>"
+            "<input type='checkbox'> checkbox 1<br><input type='checkbox' checked> checkbox 2"
+            "</form></div>"
+        )
+        self.send(_page("Checkboxes", body))
+
+    def context_menu(self) -> None:
+        body = (
+            "<div class='example'><h3>Context Menu</h3>"
+            "<div id='hot-spot' style='border-style:dashed;border-width:1px;width:250px;height:150px' "
+            "oncontextmenu=\"displayMessage();return false;\"></div></div>"
+        )
+        script = "<script>function displayMessage(){alert('You selected a context menu');}</script>"
+        self.send(_page("Context Menu", body, head=script))
+
+    def dropdown(self) -> None:
+        body = (
+            "<div class='example'><h3>Dropdown List</h3><select id='dropdown'>"
+            "<option value='' disabled selected>Please select an option</option>"
+            "<option value='1'>Option 1</option><option value='2'>Option 2</option>"
+            "</select></div>"
+        )
+        self.send(_page("Dropdown", body))
+
+    def dynamic_loading(self, example: int) -> None:
+        delay_ms = int(self.server.dynamic_delay * 1000)
+        if example == 1:
+            # El elemento existe pero está oculto
+            finish = "<div id='finish' style='display:none'><h4>Hello World!</h4></div>"
+            reveal = "document.getElementById('finish').style.display='block';"
+        else:
+            # El elemento se crea recién al terminar
+            finish = ""
+            reveal = (
+                "var f=document.createElement('div');f.id='finish';"
+                "f.innerHTML='<h4>Hello World!</h4>';document.getElementById('content').appendChild(f);"
+            )
+        script = (
+            "<script>function start(){"
+            "document.getElementById('start').style.display='none';"
+            "document.getElementById('loading').style.display='block';"
+            f"setTimeout(function(){{document.getElementById('loading').style.display='none';{reveal}}},{delay_ms});"
+            "}</script>"
+        )
+        body = (
+            f"<div class='example'><h3>Dynamically Loaded Page Elements</h3><h4>Example {example}</h4>"
+            f"{finish}<div id='start'><button onclick='start()'>Start</button></div>"
+            "<div id='loading' style='display:none'>Loading... </div></div>"
+        )
+        self.send(_page("Dynamic Loading", body, head=script))
+
+    def download(self) -> None:
+        self.send(_page("File Downloader", _downloads_list("/download", list(DOWNLOADS))))
+
+    def download_secure(self) -> None:
+        if not self.authorized():
+            return self.unauthorized()
+        names = ["testFile.zip", *DOWNLOADS]
+        self.send(_page("Secure File Downloader", _downloads_list("/download_secure", names)))
+
+    def login(self) -> None:
+        msg, clear = self.take_flash()
+        kind = "success" if "logged out" in msg else "error"
+        body = (
+            (_flash(msg, kind) if msg else "")
+            + "<div class='example'><h2>Login Page</h2>"
+            "<form name='login' id='login' action='/authenticate' method='post'>"
+            "<label for='username'>Username</label><input type='text' name='username' id='username'>"
+            "<label for='password'>Password</label><input type='password' name='password' id='password'>"
+            "<button class='radius' type='submit'><i class='fa fa-2x fa-sign-in'> Login</i></button>"
+            "</form></div>"
+        )
+        self.send(_page("Login Page", body), headers=clear)
+
+    def secure(self) -> None:
+        if self.cookies().get("session") != "ok":
+            return self.redirect("/login", {"flash": "You must login to view the secure area!"})
+        msg, clear = self.take_flash()
+        body = (
+            (_flash(msg) if msg else "")
+            + "<div class='example'><h2>Secure Area</h2>"
+            "<a class='button secondary radius' href='/logout'><i class='icon-2x icon-signout'> Logout</i></a>"
+            "</div>"
+        )
+        self.send(_page("Secure Area", body), headers=clear)
+
+    def logout(self) -> None:
+        self.redirect("/login", {"session": "", "flash": "You logged out of the secure area!"})
+
+    def nested_frames(self) -> None:
+        html = (
+            "<!DOCTYPE html><html><head><title>Frames</title></head>"
+            "<frameset frameborder='1' rows='50%,50%'>"
+            "<frame src='/frame_top' scrolling='no' name='frame-top'>"
+            "<frame src='/frame_bottom' scrolling='no' name='frame-bottom'>"
+            "</frameset></html>"
+        )
+        self.send(html)
+
+    def frame_top(self) -> None:
+        html = (
+            "<html><frameset frameborder='1' name='frameset-middle' cols='33%,33%,33%'>"
+            "<frame src='/frame_left' scrolling='no' name='frame-left'>"
+            "<frame src='/frame_middle' scrolling='no' name='frame-middle'>"
+            "<frame src='/frame_right' scrolling='no' name='frame-right'>"
+            "</frameset></html>"
+        )
+        self.send(html)
+
+    def frame_named(self, name: str) -> None:
+        inner = f"<div id='content'>{name}</div>" if name == "MIDDLE" else name
+        self.send(f"<html><head></head><body>{inner}</body></html>")
+
+    def large(self) -> None:
+        self.send(_large_html())
+
+    def windows(self) -> None:
+        body = (
+            "<div class='example'><h3>Opening a new window</h3>"
+            "<a href='/windows/new' target='_blank'>Click Here</a></div>"
+        )
+        self.send(_page("The Internet", body))
+
+    def windows_new(self) -> None:
+        self.send("<html><head><title>New Window</title></head>"
+                  "<body><div class='example'><h3>New Window</h3></div></body></html>")
+
+    def notification_rendered(self) -> None:
+        msg, clear = self.take_flash()
+        body = (
+            (_flash(msg, "notice") if msg else "")
+            + "<div class='example'><h3>Notification Message</h3>"
+            "<p>The message displayed above the heading is a notification message.</p>"
+            "<a href='/notification_message'>Click here</a></div>"
+        )
+        self.send(_page("Notification Message", body), headers=clear)
+
+    def notification(self) -> None:
+        ok = self.server.rng_uniform(0, 1) < self.server.success_rate
+        msg = "Action successful" if ok else "Action unsuccesful, please try again"
+        self.redirect("/notification_message_rendered", {"flash": msg})
+
+
+ROUTES = {
+    "/": _Handler.home,
+    "/add_remove_elements": _Handler.add_remove,
+    "/checkboxes": _Handler.checkboxes,
+    "/context_menu": _Handler.context_menu,
+    "/dropdown": _Handler.dropdown,
+    "/dynamic_loading/1": lambda h: h.dynamic_loading(1),
+    "/dynamic_loading/2": lambda h: h.dynamic_loading(2),
+    "/download": _Handler.download,
+    "/download_secure": _Handler.download_secure,
+    "/login": _Handler.login,
+    "/secure": _Handler.secure,
+    "/logout": _Handler.logout,
+    "/nested_frames": _Handler.nested_frames,
+    "/frame_top": _Handler.frame_top,
+    "/frame_left": lambda h: h.frame_named("LEFT"),
+    "/frame_middle": lambda h: h.frame_named("MIDDLE"),
+    "/frame_right": lambda h: h.frame_named("RIGHT"),
+    "/frame_bottom": lambda h: h.frame_named("BOTTOM"),
+    "/large": _Handler.large,
+    "/windows": _Handler.windows,
+    "/windows/new": _Handler.windows_new,
+    "/notification_message_rendered": _Handler.notification_rendered,
+    "/notification_message": _Handler.notification,
+}
+
+ASSET_ROUTES = {
+    "/css/app.css": lambda h: h.asset(_asset_css(), "text/css"),
+    "/img/forkme_right_green.png": lambda h: h.asset(_asset_png(), "image/png"),
+    "/fonts/site.woff": lambda h: h.asset(_asset_font(), "font/woff"),
+}
+ROUTES.update(ASSET_ROUTES)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, latency: float, jitter: float, dynamic_delay: float,
+                 success_rate: float, seed: int | None) -> None:
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.jitter = jitter
+        self.dynamic_delay = dynamic_delay
+        self.success_rate = success_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def rng_uniform(self, a: float, b: float) -> float:
+        with self._lock:
+            return self._rng.uniform(a, b)
+
+
+class SiteStandIn:
+    """
+    latency/jitter: segundos por respuesta. dynamic_delay: lo que tarda el
+    "Loading..." de dynamic_loading (5 s en el sitio real). success_rate:
+    probabilidad de "Action successful" en notification_message.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 jitter: float = 0.0, dynamic_delay: float = 5.0, success_rate: float = 0.5,
+                 seed: int | None = None) -> None:
+        self._server = _Server((host, port), latency, jitter, dynamic_delay, success_rate, seed)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "SiteStandIn":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="site-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "SiteStandIn":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
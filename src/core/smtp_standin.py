@@ -0,0 +1,209 @@
+"""
+Servidor SMTP local de prueba (sin TLS), para medir envío y reintentos sin red.
+
+Implementa lo que usa smtplib: EHLO/HELO, AUTH PLAIN/LOGIN, MAIL, RCPT,
+DATA, RSET, NOOP y QUIT. Acepta cualquier usuario/clave. Permite inyectar
+fallas para ejercitar los reintentos de core.mailer:
+
+- fail_rate: probabilidad de responder 451 (transitorio) al terminar DATA.
+- drop_rate: probabilidad de cortar la conexión al terminar DATA, sin responder.
+- latency:   segundos de espera antes de cada respuesta.
+
+Uso:
+
+    with SmtpStandIn(fail_rate=0.1) as server:
+        host, port = server.address
+        ...
+        print(server.stats)
+
+o desde la línea de comandos: python bench.py smtp --serve
+"""
+from __future__ import annotations
+
+import base64
+import random
+import socketserver
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+
+@dataclass
+class StandInStats:
+    connections: int = 0
+    messages: int = 0
+    bytes: int = 0
+    rejected: int = 0
+    dropped: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, **deltas: int) -> None:
+        with self._lock:
+            for name, value in deltas.items():
+                setattr(self, name, getattr(self, name) + value)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "_Server"
+
+    def reply(self, line: str) -> None:
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+        self.wfile.flush()
+
+    def readline(self) -> bytes:
+        return self.rfile.readline(65_536)
+
+    def handle(self) -> None:
+        srv = self.server
+        srv.stats.add(connections=1)
+        self.reply("220 localhost SMTP stand-in")
+        sender: str | None = None
+        rcpts: list[str] = []
+        while True:
+            raw = self.readline()
+            if not raw:
+                return
+            line = raw.decode("utf-8", "replace").rstrip("\r\n")
+            verb, _, arg = line.partition(" ")
+            verb = verb.upper()
+
+            if verb == "EHLO":
+                self.wfile.write(b"250-localhost\r\n250-AUTH PLAIN LOGIN\r\n250-8BITMIME\r\n")
+                self.reply("250 SIZE 104857600")
+            elif verb == "HELO":
+                self.reply("250 localhost")
+            elif verb == "AUTH":
+                mech, _, initial = arg.partition(" ")
+                if mech.upper() == "LOGIN":
+                    self.reply("334 " + base64.b64encode(b"Username:").decode())
+                    self.readline()
+                    self.reply("334 " + base64.b64encode(b"Password:").decode())
+                    self.readline()
+                elif mech.upper() == "PLAIN" and not initial:
+                    self.reply("334 ")
+                    self.readline()
+                self.reply("235 2.7.0 Authentication successful")
+            elif verb == "MAIL":
+                sender, rcpts = arg, []
+                self.reply("250 2.1.0 OK")
+            elif verb == "RCPT":
+                if sender is None:
+                    self.reply("503 5.5.1 MAIL first")
+                else:
+                    rcpts.append(arg)
+                    self.reply("250 2.1.5 OK")
+            elif verb == "DATA":
+                if not rcpts:
+                    self.reply("503 5.5.1 RCPT first")
+                    continue
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                size = self._read_data()
+                if size < 0:
+                    return
+                roll = srv.rng_random()
+                if roll < srv.drop_rate:
+                    srv.stats.add(dropped=1)
+                    return  # cortar sin responder
+                if roll < srv.drop_rate + srv.fail_rate:
+                    srv.stats.add(rejected=1)
+                    self.reply("451 4.3.0 Temporary failure, try again")
+                else:
+                    srv.stats.add(messages=1, bytes=size)
+                    self.reply("250 2.0.0 Queued")
+                sender, rcpts = None, []
+            elif verb == "RSET":
+                sender, rcpts = None, []
+                self.reply("250 2.0.0 OK")
+            elif verb == "NOOP":
+                self.reply("250 2.0.0 OK")
+            elif verb == "QUIT":
+                self.reply("221 2.0.0 Bye")
+                return
+            else:
+                self.reply("502 5.5.2 Command not implemented")
+
+    def _read_data(self) -> int:
+        """Lee el cuerpo hasta '.' (sin guardarlo en memoria). -1 si se cortó."""
+        size = 0
+        out = None
+        if self.server.save_dir is not None:
+            n = self.server.next_message_id()
+            out = (self.server.save_dir / f"msg_{n:06d}.eml").open("wb")
+        try:
+            while True:
+                raw = self.readline()
+                if not raw:
+                    return -1
+                if raw in (b".\r\n", b".\n"):
+                    return size
+                if raw.startswith(b".."):
+                    raw = raw[1:]
+                size += len(raw)
+                if out is not None:
+                    out.write(raw)
+        finally:
+            if out is not None:
+                out.close()
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, latency: float, fail_rate: float, drop_rate: float,
+                 seed: int | None, save_dir: Path | None) -> None:
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.drop_rate = drop_rate
+        self.save_dir = save_dir
+        self.stats = StandInStats()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._msg_id = 0
+
+    def rng_random(self) -> float:
+        with self._lock:
+            return self._rng.random()
+
+    def next_message_id(self) -> int:
+        with self._lock:
+            self._msg_id += 1
+            return self._msg_id
+
+
+class SmtpStandIn:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 fail_rate: float = 0.0, drop_rate: float = 0.0, seed: int | None = None,
+                 save_dir: Path | None = None) -> None:
+        if save_dir is not None:
+            save_dir.mkdir(parents=True, exist_ok=True)
+        self._server = _Server((host, port), latency, fail_rate, drop_rate, seed, save_dir)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def address(self) -> tuple[str, int]:
+        host, port = self._server.server_address[:2]
+        return host, port
+
+    @property
+    def stats(self) -> StandInStats:
+        return self._server.stats
+
+    def start(self) -> "SmtpStandIn":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="smtp-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "SmtpStandIn":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
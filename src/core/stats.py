@@ -0,0 +1,37 @@
+"""Percentiles y resúmenes de duraciones para reportes de benchmarks."""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Iterable
+
+
+def percentile(values: Iterable[float], p: float) -> float:
+    """Percentil por rango más cercano (p en 0..100). 0.0 si no hay datos."""
+    data = sorted(values)
+    if not data:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(data)))
+    return data[min(rank, len(data)) - 1]
+
+
+@dataclass
+class Summary:
+    n: int
+    p50: float
+    p95: float
+    max: float
+    mean: float
+
+    @classmethod
+    def of(cls, values: Iterable[float]) -> "Summary":
+        data = sorted(values)
+        if not data:
+            return cls(0, 0.0, 0.0, 0.0, 0.0)
+        return cls(len(data), percentile(data, 50), percentile(data, 95), data[-1], sum(data) / len(data))
+
+    def fmt(self, unit: str = "s", scale: float = 1.0, digits: int = 2) -> str:
+        if not self.n:
+            return "-"
+        f = lambda v: f"{v * scale:.{digits}f}{unit}"  # noqa: E731
+        return f"p50={f(self.p50)} p95={f(self.p95)} max={f(self.max)}"
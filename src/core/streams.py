@@ -0,0 +1,102 @@
+"""
+Salida de escenarios etiquetada por nombre.
+
+Con varios escenarios en paralelo (en proceso o en subprocesos) las líneas
+se mezclan; aquí cada línea completa se entrega a un callback junto con el
+nombre del escenario que la produjo, para imprimirla como "[nombre] línea"
+y registrarla en el log de eventos.
+"""
+from __future__ import annotations
+
+import io
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import IO, Callable, Iterator
+
+# on_line(escenario, "stdout" | "stderr", línea_sin_salto)
+LineSink = Callable[[str, str, str], None]
+
+_scenario: ContextVar[str | None] = ContextVar("scenario_tag", default=None)
+
+
+class TaggedStream(io.TextIOBase):
+    """
+    Reemplazo de sys.stdout/sys.stderr. Lo que se escribe dentro de
+    scenario_tag() va línea por línea a `on_line`; el resto pasa directo.
+    """
+
+    def __init__(self, original: IO[str], stream_name: str, on_line: LineSink) -> None:
+        self.original = original
+        self.stream_name = stream_name
+        self.on_line = on_line
+        self._partial = threading.local()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        name = _scenario.get()
+        if name is None:
+            return self.original.write(s)
+        buf = getattr(self._partial, "text", "") + s
+        *lines, rest = buf.split("\n")
+        self._partial.text = rest
+        for line in lines:
+            self.on_line(name, self.stream_name, line)
+        return len(s)
+
+    def flush(self) -> None:
+        self.original.flush()
+
+    def flush_partial(self) -> None:
+        """Entrega la última línea sin salto (al terminar el escenario)."""
+        name = _scenario.get()
+        rest = getattr(self._partial, "text", "")
+        self._partial.text = ""
+        if name is not None and rest:
+            self.on_line(name, self.stream_name, rest)
+
+    @property
+    def encoding(self) -> str:  # type: ignore[override]
+        return getattr(self.original, "encoding", "utf-8")
+
+    def isatty(self) -> bool:
+        return self.original.isatty()
+
+
+def current_scenario() -> str | None:
+    """Escenario que corre en este hilo (dentro de scenario_tag), o None."""
+    return _scenario.get()
+
+
+@contextmanager
+def scenario_tag(name: str, *streams: TaggedStream) -> Iterator[None]:
+    token = _scenario.set(name)
+    try:
+        yield
+    finally:
+        for s in streams:
+            s.flush_partial()
+        _scenario.reset(token)
+
+
+def pump_lines(pipe: IO[str], scenario: str, stream_name: str, on_line: LineSink,
+               tail: deque | None = None) -> threading.Thread:
+    """
+    Lee un pipe de subproceso línea por línea en un hilo aparte (así stdout y
+    stderr no se bloquean entre sí). Si se pasa `tail`, guarda ahí las últimas
+    líneas para el texto de error sin retener toda la salida en memoria.
+    """
+    def _run() -> None:
+        with pipe:
+            for raw in pipe:
+                line = raw.rstrip("\r\n")
+                if tail is not None:
+                    tail.append(line)
+                on_line(scenario, stream_name, line)
+
+    t = threading.Thread(target=_run, name=f"pump-{scenario}-{stream_name}", daemon=True)
+    t.start()
+    return t
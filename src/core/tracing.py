@@ -0,0 +1,309 @@
+"""
+Trazas de comandos WebDriver por escenario.
+
+Cada comando que un escenario manda a chromedriver (get, findElement,
+screenshot, executeScript, ...) queda registrado con su duración y el
+tamaño aproximado de lo que se envió/recibió. También se registran los
+WebDriverWait.until (con los comandos de su polling adentro) y los pasos
+de events.step().
+
+- Por escenario: trace.json en formato "Trace Event" de Chrome (abrir en
+  chrome://tracing o https://ui.perfetto.dev).
+- Por corrida: histogramas de latencia por comando (CommandStats).
+
+Solo se registra dentro de `tracing(nombre)`; fuera de ahí el costo es
+leer una ContextVar por comando.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from selenium.webdriver.support.wait import WebDriverWait
+
+from core.stats import Summary
+
+
+TRACE_NAME = "trace.json"
+
+# Con esta variable, lease_driver() traza el escenario aunque corra suelto
+# o en un subproceso, y escribe la traza ahí al terminar
+TRACE_FILE_ENV = "WD_TRACE_FILE"
+
+
+@dataclass
+class Span:
+    name: str
+    cat: str  # "command" | "wait" | "step"
+    start: float  # epoch (s)
+    duration: float  # s
+    tid: int
+    args: dict[str, Any] = field(default_factory=dict)
+
+
+class Trace:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def to_chrome(self) -> dict:
+        """Formato Trace Event (JSON Object Format), tiempos en microsegundos."""
+        pid = os.getpid()
+        tids = sorted({s.tid for s in self.spans})
+        meta = [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": self.name}}]
+        meta += [{"name": "thread_name", "ph": "M", "pid": pid, "tid": t, "args": {"name": f"hilo {i}"}}
+                 for i, t in enumerate(tids)]
+        events = [
+            {
+                "name": s.name, "cat": s.cat, "ph": "X", "pid": pid, "tid": s.tid,
+                "ts": round(s.start * 1e6), "dur": max(1, round(s.duration * 1e6)), "args": s.args,
+            }
+            for s in sorted(self.spans, key=lambda s: s.start)
+        ]
+        return {"traceEvents": meta + events, "displayTimeUnit": "ms", "otherData": {"scenario": self.name}}
+
+    def write(self, path: Path) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_chrome(), ensure_ascii=False, default=str), encoding="utf-8")
+        return path
+
+
+_trace: ContextVar[Trace | None] = ContextVar("wd_trace", default=None)
+
+
+def current_trace() -> Trace | None:
+    return _trace.get()
+
+
+@contextmanager
+def tracing(name: str) -> Iterator[Trace]:
+    """Traza lo que ocurra en este hilo dentro del bloque."""
+    trace = Trace(name)
+    token = _trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _trace.reset(token)
+
+
+def add_span(name: str, cat: str, start: float, duration: float, **args: Any) -> None:
+    trace = _trace.get()
+    if trace is not None:
+        trace.add(Span(name, cat, start, duration, threading.get_ident(), args))
+
+
+# =========================
+# Instrumentación
+# =========================
+def _size(value: Any) -> int:
+    """Tamaño aproximado en bytes de un payload JSON (sin serializar strings grandes)."""
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _describe(command: str, params: dict | None) -> dict[str, Any]:
+    """Lo útil para leer la traza: URL, selector o script (recortado)."""
+    params = params or {}
+    args: dict[str, Any] = {}
+    if "url" in params:
+        args["url"] = str(params["url"])[:200]
+    if "using" in params:
+        args["selector"] = f"{params['using']}={str(params.get('value', ''))[:120]}"
+    if "script" in params:
+        args["script"] = " ".join(str(params["script"]).split())[:120]
+    if "cmd" in params:  # executeCdpCommand
+        args["cdp"] = params["cmd"]
+    return args
+
+
+def instrument(driver) -> None:
+    """
+    Envuelve el command_executor del driver (una sola vez). Los comandos se
+    registran en la traza activa del hilo que los manda.
+    """
+    executor = driver.command_executor
+    if getattr(executor, "_wd_traced", False):
+        return
+    original = executor.execute
+
+    def execute(command: str, params: dict | None = None):
+        trace = _trace.get()
+        if trace is None:
+            return original(command, params)
+        start = time.time()
+        t0 = time.perf_counter()
+        ok = False
+        response = None
+        try:
+            response = original(command, params)
+            ok = True
+            return response
+        finally:
+            args = _describe(command, params)
+            args.update(
+                bytes_out=_size({k: v for k, v in (params or {}).items() if k != "sessionId"}),
+                bytes_in=_size(response.get("value")) if isinstance(response, dict) else 0,
+                ok=ok,
+            )
+            trace.add(Span(command, "command", start, time.perf_counter() - t0, threading.get_ident(), args))
+
+    executor.execute = execute
+    executor._wd_traced = True
+    _instrument_waits()
+
+
+_waits_lock = threading.Lock()
+_waits_done = False
+
+
+def _condition_name(method: Any) -> str:
+    # EC.element_to_be_clickable(...) es un closure: "element_to_be_clickable.<locals>._predicate"
+    qual = getattr(method, "__qualname__", None) or type(method).__name__
+    return qual.split(".<locals>")[0]
+
+
+def _instrument_waits() -> None:
+    """WebDriverWait.until/until_not como spans "wait" (solo con traza activa)."""
+    global _waits_done
+    with _waits_lock:
+        if _waits_done:
+            return
+        _waits_done = True
+
+    def wrap(original):
+        def traced(self, method, message: str = ""):
+            if _trace.get() is None:
+                return original(self, method, message)
+            start = time.time()
+            t0 = time.perf_counter()
+            ok = False
+            try:
+                result = original(self, method, message)
+                ok = True
+                return result
+            finally:
+                add_span(f"{original.__name__}({_condition_name(method)})", "wait", start,
+                         time.perf_counter() - t0, timeout=self._timeout, poll=self._poll, ok=ok)
+        traced.__name__ = original.__name__
+        traced.__wrapped__ = original
+        return traced
+
+    WebDriverWait.until = wrap(WebDriverWait.until)
+    WebDriverWait.until_not = wrap(WebDriverWait.until_not)
+
+
+# =========================
+# Agregados
+# =========================
+BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+
+@dataclass
+class CommandStats:
+    name: str
+    durations: list[float] = field(default_factory=list)
+    bytes_in: int = 0
+    bytes_out: int = 0
+
+    @property
+    def total(self) -> float:
+        return sum(self.durations)
+
+    def histogram(self) -> list[int]:
+        """Cantidad por bucket: <=1ms, <=2ms, ..., <=5000ms, >5000ms."""
+        counts = [0] * (len(BUCKETS_MS) + 1)
+        for d in self.durations:
+            ms = d * 1000
+            i = next((i for i, b in enumerate(BUCKETS_MS) if ms <= b), len(BUCKETS_MS))
+            counts[i] += 1
+        return counts
+
+    def to_dict(self) -> dict:
+        s = Summary.of(self.durations)
+        return {
+            "name": self.name, "count": s.n, "total_s": round(self.total, 6),
+            "p50_ms": round(s.p50 * 1000, 3), "p95_ms": round(s.p95 * 1000, 3), "max_ms": round(s.max * 1000, 3),
+            "bytes_in": self.bytes_in, "bytes_out": self.bytes_out,
+            "histogram": dict(zip([f"<={b}ms" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"], self.histogram())),
+        }
+
+
+def read_trace(path: Path) -> list[dict]:
+    """Eventos "X" de un trace.json."""
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return [e for e in data.get("traceEvents", []) if e.get("ph") == "X"]
+
+
+def command_stats(trace_events: Iterable[dict], cats: tuple[str, ...] = ("command", "wait")) -> list[CommandStats]:
+    """Agrupa por nombre (comandos y waits), ordenado por tiempo total descendente."""
+    by_name: dict[str, CommandStats] = defaultdict(lambda: CommandStats(""))
+    for e in trace_events:
+        if e.get("cat") not in cats:
+            continue
+        name = e["name"]
+        st = by_name[name]
+        st.name = name
+        st.durations.append(e["dur"] / 1e6)
+        args = e.get("args", {})
+        st.bytes_in += args.get("bytes_in", 0)
+        st.bytes_out += args.get("bytes_out", 0)
+    return sorted(by_name.values(), key=lambda s: s.total, reverse=True)
+
+
+def collect_run_traces(run_dir: Path) -> dict[str, list[dict]]:
+    """{carpeta_escenario: eventos} para cada run_dir/<escenario>/trace.json."""
+    out = {}
+    for p in sorted(run_dir.glob(f"*/{TRACE_NAME}")):
+        try:
+            out[p.parent.name] = read_trace(p)
+        except (OSError, ValueError):
+            continue
+    return out
+
+
+def render_table(stats: list[CommandStats], limit: int = 12) -> list[str]:
+    lines = []
+    for st in stats[:limit]:
+        s = Summary.of(st.durations)
+        lines.append(
+            f"{st.name:<40} n={s.n:<5} total={st.total:7.2f}s  "
+            f"p50={s.p50 * 1000:7.1f}ms p95={s.p95 * 1000:7.1f}ms max={s.max * 1000:7.1f}ms  "
+            f"in={st.bytes_in / 1024:8.1f}KB"
+        )
+    return lines
+
+
+def write_run_report(run_dir: Path, path: Path) -> list[str]:
+    """
+    Junta los trace.json de la corrida en un JSON de histogramas (total y por
+    escenario) y retorna el resumen en texto para el log.
+    """
+    traces = collect_run_traces(run_dir)
+    everything = [e for evs in traces.values() for e in evs]
+    report = {
+        "all": [s.to_dict() for s in command_stats(everything)],
+        "scenarios": {name: [s.to_dict() for s in command_stats(evs)] for name, evs in traces.items()},
+    }
+    path.write_text(json.dumps(report, ensure_ascii=False, indent=1), encoding="utf-8")
+    return render_table(command_stats(everything))
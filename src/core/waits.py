@@ -0,0 +1,270 @@
+"""
+Esperas por eventos del DOM en vez de polling cada 0,5 s.
+
+WebDriverWait pregunta la condición cada poll_frequency (0,5 s por
+defecto): cada pregunta es un viaje a chromedriver y, cuando la condición
+ya se cumple, se pierde hasta medio segundo. EventWait instala en la página
+un MutationObserver y espera con un solo execute_async_script que vuelve
+apenas la condición se cumple.
+
+Es un reemplazo directo para lo que usan los escenarios:
+
+    from core.waits import EventWait
+    from core import waits as EC
+
+    wait = EventWait(driver, 15)
+    wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, "#finish h4")))
+
+- Condiciones de DOM (presencia, visibilidad, clickable, cantidad de
+  elementos): por eventos, dentro de la página.
+- Condiciones fuera del DOM (alertas, ventanas, archivos, lambdas): polling
+  como antes pero cada FALLBACK_POLL (50 ms).
+
+Las condiciones de aquí también son ECs normales (se pueden pasar a un
+WebDriverWait común).
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Callable
+
+from selenium.common.exceptions import (
+    JavascriptException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+    UnexpectedAlertPresentException,
+    WebDriverException,
+)
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as _ec
+from selenium.webdriver.support.wait import WebDriverWait
+
+from core import tracing
+
+
+# Polling para lo que no se puede observar en la página
+FALLBACK_POLL = 0.05
+
+# Cada execute_async_script espera como mucho esto (el script timeout por
+# defecto de la sesión es 30 s); si no alcanzó, se vuelve a instalar
+SLICE = 10.0
+
+# arguments: using, value, kind, count, timeout_ms, callback
+# Devuelve {ok: true, value} apenas se cumple, o {ok: false} al vencer el slice.
+_OBSERVE_JS = r"""
+const [using, value, kind, count, timeoutMs, done] = arguments;
+
+function findAll() {
+  const doc = document;
+  switch (using) {
+    case "css selector": return Array.from(doc.querySelectorAll(value));
+    case "xpath": {
+      const snap = doc.evaluate(value, doc, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+      const out = [];
+      for (let i = 0; i < snap.snapshotLength; i++) {
+        const n = snap.snapshotItem(i);
+        if (n.nodeType === 1) out.push(n);
+      }
+      return out;
+    }
+    case "link text":
+      return Array.from(doc.querySelectorAll("a")).filter(a => (a.innerText || "").trim() === value);
+    case "partial link text":
+      return Array.from(doc.querySelectorAll("a")).filter(a => (a.innerText || "").includes(value));
+    case "tag name": return Array.from(doc.getElementsByTagName(value));
+    default: return [];
+  }
+}
+
+function visible(el) {
+  if (!el.isConnected) return false;
+  if (el.checkVisibility && !el.checkVisibility({visibilityProperty: true, opacityProperty: true})) return false;
+  const r = el.getBoundingClientRect();
+  return r.width > 0 && r.height > 0;
+}
+
+function check() {
+  const els = findAll();
+  switch (kind) {
+    case "presence": return els.length ? {ok: true, value: els[0]} : null;
+    case "presence_all": return els.length ? {ok: true, value: els} : null;
+    case "visible": return els.length && visible(els[0]) ? {ok: true, value: els[0]} : null;
+    case "visible_all": return els.length && els.every(visible) ? {ok: true, value: els} : null;
+    case "clickable": {
+      const el = els.length && visible(els[0]) && !els[0].matches(":disabled") ? els[0] : null;
+      return el ? {ok: true, value: el} : null;
+    }
+    case "count": return els.length === count ? {ok: true, value: true} : null;
+  }
+  return null;
+}
+
+let finished = false;
+let observer = null, timer = null, backup = null;
+function finish(result) {
+  if (finished) return;
+  finished = true;
+  if (observer) observer.disconnect();
+  clearTimeout(timer);
+  clearInterval(backup);
+  done(result);
+}
+function test() {
+  let r = null;
+  try { r = check(); } catch (e) { r = null; }
+  if (r) finish(r);
+}
+
+test();
+if (!finished) {
+  observer = new MutationObserver(test);
+  observer.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+  // Respaldo dentro de la página (animaciones/CSS que no generan mutaciones): sin viajes a chromedriver
+  backup = setInterval(test, 100);
+  timer = setTimeout(() => finish({ok: false}), timeoutMs);
+}
+"""
+
+
+def _normalize(locator: tuple[str, str]) -> tuple[str, str]:
+    """By.ID / By.NAME / By.CLASS_NAME se traducen a CSS, como hace chromedriver."""
+    by, value = locator
+    if by == By.ID:
+        return By.CSS_SELECTOR, f'[id="{value}"]'
+    if by == By.NAME:
+        return By.CSS_SELECTOR, f'[name="{value}"]'
+    if by == By.CLASS_NAME:
+        return By.CSS_SELECTOR, f".{value}"
+    return by, value
+
+
+def _document_changed(e: WebDriverException) -> bool:
+    """Errores del script por cambio de documento (se reintenta), no de la sesión."""
+    if isinstance(e, UnexpectedAlertPresentException):
+        return False
+    if isinstance(e, (JavascriptException, TimeoutException, StaleElementReferenceException)):
+        return True
+    msg = (e.msg or "").lower()
+    return "unloaded" in msg or "execution context" in msg or "context with specified id" in msg
+
+
+class DomCondition:
+    """
+    Condición que se puede evaluar dentro de la página. Llamada como EC
+    normal (condition(driver)) usa la implementación de selenium.
+    `confirm`: tras el aviso de la página se verifica una vez con selenium
+    (para visibilidad, donde el cálculo en JS es una aproximación).
+    """
+
+    def __init__(self, name: str, locator: tuple[str, str], kind: str,
+                 native: Callable[[Any], Any], count: int = 0, confirm: bool = False) -> None:
+        self.name = name
+        self.locator = locator
+        self.using, self.value = _normalize(locator)
+        self.kind = kind
+        self.count = count
+        self.native = native
+        self.confirm = confirm
+
+    def __call__(self, driver) -> Any:
+        return self.native(driver)
+
+    def __repr__(self) -> str:
+        return f"{self.name}({self.locator!r})"
+
+
+# ---------- Condiciones (mismos nombres que expected_conditions) ----------
+def presence_of_element_located(locator: tuple[str, str]) -> DomCondition:
+    return DomCondition("presence_of_element_located", locator, "presence",
+                        _ec.presence_of_element_located(locator))
+
+
+def presence_of_all_elements_located(locator: tuple[str, str]) -> DomCondition:
+    return DomCondition("presence_of_all_elements_located", locator, "presence_all",
+                        _ec.presence_of_all_elements_located(locator))
+
+
+def visibility_of_element_located(locator: tuple[str, str]) -> DomCondition:
+    return DomCondition("visibility_of_element_located", locator, "visible",
+                        _ec.visibility_of_element_located(locator), confirm=True)
+
+
+def visibility_of_all_elements_located(locator: tuple[str, str]) -> DomCondition:
+    return DomCondition("visibility_of_all_elements_located", locator, "visible_all",
+                        _ec.visibility_of_all_elements_located(locator), confirm=True)
+
+
+def element_to_be_clickable(locator: tuple[str, str]) -> DomCondition:
+    return DomCondition("element_to_be_clickable", locator, "clickable",
+                        _ec.element_to_be_clickable(locator), confirm=True)
+
+
+def number_of_elements_to_be(locator: tuple[str, str], count: int) -> DomCondition:
+    """Exactamente `count` elementos (p. ej. 0 para "ya no existe ninguno")."""
+    def native(driver) -> bool:
+        return len(driver.find_elements(*locator)) == count
+    return DomCondition("number_of_elements_to_be", locator, "count", native, count=count)
+
+
+# Fuera del DOM: se evalúan con polling (FALLBACK_POLL)
+alert_is_present = _ec.alert_is_present
+number_of_windows_to_be = _ec.number_of_windows_to_be
+
+
+class EventWait(WebDriverWait):
+    """
+    WebDriverWait que espera las DomCondition por eventos de la página.
+    Cualquier otra condición (callable) se evalúa con polling cada FALLBACK_POLL.
+    """
+
+    def __init__(self, driver, timeout: float, poll_frequency: float = FALLBACK_POLL,
+                 ignored_exceptions=None) -> None:
+        super().__init__(driver, timeout, poll_frequency=poll_frequency, ignored_exceptions=ignored_exceptions)
+
+    def until(self, method, message: str = ""):
+        if not isinstance(method, DomCondition):
+            return super().until(method, message)
+
+        start = time.time()
+        t0 = time.perf_counter()
+        ok = False
+        try:
+            result = self._until_dom(method, message)
+            ok = True
+            return result
+        finally:
+            tracing.add_span(f"until({method.name})", "wait", start, time.perf_counter() - t0,
+                             timeout=self._timeout, event_driven=True, ok=ok)
+
+    def _until_dom(self, cond: DomCondition, message: str):
+        deadline = time.monotonic() + self._timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutException(message or f"{cond!r} no se cumplió en {self._timeout}s")
+            try:
+                result = self._driver.execute_async_script(
+                    _OBSERVE_JS, cond.using, cond.value, cond.kind, cond.count,
+                    int(min(remaining, SLICE) * 1000),
+                )
+            except WebDriverException as e:
+                if not _document_changed(e):
+                    raise
+                # Navegación a mitad de la espera ("document unloaded"), frame recargándose...:
+                # se vuelve a instalar en el documento nuevo
+                time.sleep(FALLBACK_POLL)
+                continue
+
+            if not result or not result.get("ok"):
+                continue
+            if not cond.confirm:
+                return result["value"]
+            try:
+                value = cond.native(self._driver)
+            except (NoSuchElementException, StaleElementReferenceException):
+                value = False
+            if value:
+                return value
+            # La página y selenium no coinciden (p. ej. opacidad en transición): un poll corto y de nuevo
+            time.sleep(FALLBACK_POLL)
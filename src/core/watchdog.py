@@ -0,0 +1,143 @@
+"""
+Presupuestos de tiempo por escenario y watchdog de procesos.
+
+Un chromedriver colgado o un loop sin fin dejaban el pipeline esperando
+para siempre y procesos de Chrome huérfanos ocupando memoria. Cada
+escenario corre con un presupuesto (config/timeouts.yml); si se pasa, se
+mata el árbol completo de procesos (script, chromedriver y Chrome) y se
+reporta cuánta memoria se liberó.
+
+En proceso (main.py sin --subprocess) matar Chrome solo corta los comandos
+de WebDriver: un escenario trabado en Python puro seguiría corriendo. Por
+eso main.py lo corre en un hilo aparte y, si KILL_GRACE segundos después
+de matar su Chrome no terminó, lo abandona y reporta el timeout igual.
+"""
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable
+
+import psutil
+import yaml
+
+from core.paths import BASE_DIR
+
+
+TIMEOUTS_FILE = BASE_DIR / "config" / "timeouts.yml"
+
+# Mismo código que usa `timeout` de coreutils
+TIMEOUT_EXIT = 124
+
+# Segundos que se espera a un escenario en proceso después de matar su Chrome
+KILL_GRACE = 10.0
+
+
+class Budgets:
+    def __init__(self, default: float = 120.0, per_script: dict[str, float] | None = None) -> None:
+        self.default = default
+        self.per_script = per_script or {}
+
+    @classmethod
+    def load(cls, path: Path = TIMEOUTS_FILE) -> "Budgets":
+        if not path.exists():
+            return cls()
+        with path.open("r", encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+        scenarios = {str(k): float(v) for k, v in (data.get("scenarios") or {}).items()}
+        return cls(default=float(data.get("default", 120.0)), per_script=scenarios)
+
+    def for_script(self, name: str) -> float:
+        return self.per_script.get(name, self.default)
+
+
+@dataclass
+class KillReport:
+    scenario: str
+    budget: float
+    pids: list[int] = field(default_factory=list)
+    rss_freed: int = 0  # bytes
+    abandoned: bool = False  # en proceso: el hilo del escenario seguía corriendo
+
+    def describe(self) -> str:
+        txt = (
+            f"{self.scenario}: excedió {self.budget:g}s, "
+            f"{len(self.pids)} procesos terminados, {self.rss_freed / 1_048_576:.1f} MB liberados"
+        )
+        return txt + (", escenario abandonado (seguía corriendo)" if self.abandoned else "")
+
+
+def process_tree(root_pids: Iterable[int]) -> list[psutil.Process]:
+    """Procesos raíz + todos sus descendientes (sin repetidos)."""
+    seen: dict[int, psutil.Process] = {}
+    for pid in root_pids:
+        try:
+            root = psutil.Process(pid)
+            for p in [root, *root.children(recursive=True)]:
+                seen.setdefault(p.pid, p)
+        except psutil.NoSuchProcess:
+            continue
+    return list(seen.values())
+
+
+def kill_tree(root_pids: Iterable[int]) -> tuple[list[int], int]:
+    """Mata el árbol y retorna (pids_terminados, bytes_de_RSS_liberados)."""
+    procs = process_tree(root_pids)
+    rss = 0
+    for p in procs:
+        try:
+            rss += p.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    # Primero los hijos: así chromedriver no alcanza a relanzar nada
+    for p in reversed(procs):
+        try:
+            p.kill()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    psutil.wait_procs(procs, timeout=5)
+    return [p.pid for p in procs], rss
+
+
+def driver_pids(driver) -> list[int]:
+    """PID de chromedriver de una sesión local (Chrome cuelga de él)."""
+    service = getattr(driver, "service", None)
+    process = getattr(service, "process", None)
+    return [process.pid] if process is not None and process.pid else []
+
+
+class Watchdog:
+    """
+    Timer por escenario. Si vence antes de salir del bloque, mata los
+    procesos que devuelva `pids()` en ese momento y deja el reporte en `.report`.
+    """
+
+    def __init__(self, scenario: str, budget: float, pids: Callable[[], list[int]],
+                 on_kill: Callable[[KillReport], None] | None = None) -> None:
+        self.scenario = scenario
+        self.budget = budget
+        self.pids = pids
+        self.on_kill = on_kill
+        self.report: KillReport | None = None
+        self._timer: threading.Timer | None = None
+
+    def _fire(self) -> None:
+        killed, rss = kill_tree(self.pids())
+        self.report = KillReport(self.scenario, self.budget, killed, rss)
+        if self.on_kill:
+            self.on_kill(self.report)
+
+    def __enter__(self) -> "Watchdog":
+        if self.budget > 0:
+            self._timer = threading.Timer(self.budget, self._fire)
+            self._timer.daemon = True
+            self._timer.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            # Si justo estaba matando, esperar a que termine para tener el reporte completo
+            if self._timer.is_alive():
+                self._timer.join()
@@ -0,0 +1,188 @@
+"""
+Etapa ZIP -> PDF en streaming y en paralelo.
+
+Leer un miembro con z.read() lo carga entero en memoria; con archivos de
+cientos de MB eso es el pico de memoria de la corrida. Aquí cada miembro
+que coincide se lee con ZipFile.open() de a CHUNK bytes (decodificando por
+línea) y se convierte en un proceso aparte, así varios .txt grandes se
+convierten a la vez:
+
+    report = zip_to_pdfs(zip_path, out_dir, patterns=("*.txt",))
+    print(report.describe())        # MB/s y pico de memoria
+    report.results[0].pdf
+
+Si hay un solo miembro o el total es chico (< PARALLEL_MIN_BYTES), se
+convierte en el mismo proceso: lanzar workers cuesta más que convertir.
+"""
+from __future__ import annotations
+
+import io
+import multiprocessing
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from core.pdf import lines_to_pdf
+
+
+CHUNK = 1024 * 1024
+
+# Un renglón sin saltos de línea no puede ocupar más que esto en memoria
+MAX_LINE = 64 * 1024
+
+PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+
+
+def peak_rss() -> int:
+    """Pico de memoria residente del proceso actual, en bytes (0 si no se puede saber)."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:  # Windows
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss)
+
+
+@dataclass
+class MemberResult:
+    member: str
+    pdf: Path | None = None
+    bytes_in: int = 0  # descomprimidos, leídos
+    lines: int = 0
+    duration: float = 0.0
+    peak_rss: int = 0
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return not self.error
+
+
+@dataclass
+class StageReport:
+    zip_path: Path
+    results: list[MemberResult] = field(default_factory=list)
+    duration: float = 0.0
+    workers: int = 1
+    peak_rss: int = 0
+
+    @property
+    def bytes_in(self) -> int:
+        return sum(r.bytes_in for r in self.results)
+
+    @property
+    def throughput(self) -> float:
+        return self.bytes_in / self.duration if self.duration > 0 else 0.0
+
+    @property
+    def failed(self) -> list[MemberResult]:
+        return [r for r in self.results if not r.ok]
+
+    def describe(self) -> str:
+        return (
+            f"{len(self.results)} miembro(s), {self.bytes_in / 1_048_576:.1f} MB en {self.duration:.2f}s "
+            f"({self.throughput / 1_048_576:.1f} MB/s, {self.workers} proceso(s), "
+            f"pico {self.peak_rss / 1_048_576:.0f} MB)"
+        )
+
+
+def select_members(zf: zipfile.ZipFile, patterns: Iterable[str]) -> list[zipfile.ZipInfo]:
+    """Miembros (no carpetas) cuyo nombre coincide con algún patrón (sin distinguir mayúsculas)."""
+    patterns = [p.lower() for p in patterns]
+    return [
+        info for info in zf.infolist()
+        if not info.is_dir() and any(fnmatch(info.filename.lower(), p) for p in patterns)
+    ]
+
+
+class _Counting(io.RawIOBase):
+    """Cuenta los bytes (descomprimidos) que realmente se leyeron del miembro."""
+
+    def __init__(self, raw) -> None:
+        self.raw = raw
+        self.count = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = self.raw.readinto(b)
+        self.count += n or 0
+        return n
+
+
+def iter_member_lines(zf: zipfile.ZipFile, member: str, encoding: str = "utf-8",
+                      counter: _Counting | None = None) -> Iterator[str]:
+    """Líneas del miembro sin el salto final, leyendo de a CHUNK (nunca el archivo entero)."""
+    with zf.open(member) as raw:
+        source = counter or _Counting(raw)
+        source.raw = raw
+        text = io.TextIOWrapper(io.BufferedReader(source, CHUNK), encoding=encoding, errors="replace", newline=None)
+        for line in iter(lambda: text.readline(MAX_LINE), ""):
+            yield line.rstrip("\n")
+
+
+def convert_member(zip_path: Path, member: str, out_path: Path) -> MemberResult:
+    """Un miembro -> un PDF. Corre en un worker: abre el ZIP por su cuenta."""
+    t0 = time.perf_counter()
+    result = MemberResult(member)
+    counter = _Counting(None)
+    try:
+        with zipfile.ZipFile(zip_path) as zf:
+            result.lines = lines_to_pdf(iter_member_lines(zf, member, counter=counter), out_path)
+        result.pdf = out_path
+    except Exception as e:  # noqa: BLE001 - se informa por miembro
+        result.error = f"{type(e).__name__}: {e}"
+    result.bytes_in = counter.count
+    result.duration = time.perf_counter() - t0
+    result.peak_rss = peak_rss()
+    return result
+
+
+def _pdf_names(members: list[str], out_dir: Path, prefix: str) -> list[Path]:
+    """<prefix><nombre del miembro>.pdf, sin repetir (dos carpetas pueden tener el mismo nombre)."""
+    out, seen = [], set()
+    for m in members:
+        stem = Path(m).stem or "miembro"
+        name, k = f"{prefix}{stem}.pdf", 2
+        while name.lower() in seen:
+            name, k = f"{prefix}{stem}_{k}.pdf", k + 1
+        seen.add(name.lower())
+        out.append(out_dir / name)
+    return out
+
+
+def zip_to_pdfs(zip_path: Path, out_dir: Path, patterns: Iterable[str] = ("*.txt",),
+                prefix: str = "", workers: int | None = None) -> StageReport:
+    """Convierte a PDF cada miembro que coincide con `patterns`."""
+    t0 = time.perf_counter()
+    report = StageReport(Path(zip_path))
+    with zipfile.ZipFile(zip_path) as zf:
+        infos = select_members(zf, patterns)
+    members = [i.filename for i in infos]
+    targets = _pdf_names(members, out_dir, prefix)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    total = sum(i.file_size for i in infos)
+    workers = workers or min(len(members), os.cpu_count() or 1)
+    if len(members) <= 1 or workers <= 1 or total < PARALLEL_MIN_BYTES:
+        report.workers = 1
+        report.results = [convert_member(zip_path, m, t) for m, t in zip(members, targets)]
+    else:
+        report.workers = workers
+        # spawn: los escenarios pueden correr en hilos de main.py y fork con hilos vivos no es seguro
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            report.results = list(pool.map(convert_member, [zip_path] * len(members), members, targets))
+
+    report.duration = time.perf_counter() - t0
+    report.peak_rss = max([peak_rss()] + [r.peak_rss for r in report.results])
+    return report